@@ -91,14 +91,132 @@ WSGI_APPLICATION = 'SLB.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+#
+# Pick a profile with the SLB_DB_PROFILE environment variable:
+#   sqlite      plain SQLite, a new connection per request (development default)
+#   sqlite-wal  SQLite in WAL mode with tuned pragmas and persistent connections;
+#               readers no longer wait for writers (duty toggles, registrations)
+#   postgres    PostgreSQL from the SLB_DB_* variables below; set SLB_DB_POOLER=1
+#               when connecting through a transaction-pooling PgBouncer
+# PRAGMAS are run on every new connection by backed/db.py. Compare profiles with
+# `python manage.py benchmark_db`.
+
+SLB_DB_PROFILE = os.environ.get('SLB_DB_PROFILE', 'sqlite')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',     # safe with WAL; only the last commits can be lost on power failure
+    'busy_timeout': 5000,        # ms a writer waits for the lock before "database is locked"
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,    # negative = KiB, i.e. 64 MiB of page cache per connection
+    'temp_store': 'MEMORY',
+}
 
-DATABASES = {
-    'default': {
+DATABASE_PROFILES = {
+    'sqlite': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    'sqlite-wal': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'PRAGMAS': SQLITE_PRAGMAS,
+    },
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('SLB_DB_NAME', 'slb'),
+        'USER': os.environ.get('SLB_DB_USER', 'slb'),
+        'PASSWORD': os.environ.get('SLB_DB_PASSWORD', ''),
+        'HOST': os.environ.get('SLB_DB_HOST', 'localhost'),
+        'PORT': os.environ.get('SLB_DB_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('SLB_DB_CONN_MAX_AGE', 60)),
+        # Server-side cursors don't survive transaction pooling.
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('SLB_DB_POOLER') == '1',
+    },
+}
+
+DATABASES = {
+    'default': DATABASE_PROFILES[SLB_DB_PROFILE],
+}
+
+
+# Caches. 'reference' holds the responses of the company, project and training list
+# endpoints (ReferenceCacheMixin in backed/cache.py) under version keys that signals
+# bump; 'profiles' holds the compact employee profiles served by login and employee/me
+# (get_employee_profile), which saving or deleting an employee evicts. The default file
+# caches are shared by every worker process on the host, so bumps and evictions reach
+# them all. SLB_REFERENCE_CACHE=locmem / SLB_PROFILE_CACHE=locmem keep them in process
+# memory instead, which is only safe with a single worker: other processes serve stale
+# entries until they time out, hence the one minute TIMEOUT. Across hosts, point these
+# aliases at Redis or Memcached. Tests run against LocMemCache (backed/testing.py).
+
+REFERENCE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'reference',
+        'TIMEOUT': 60,
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'reference'),
+        'TIMEOUT': 60 * 60 * 24,
+    },
+}
+
+PROFILE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'profiles',
+        'TIMEOUT': 60,
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'profiles'),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reference': REFERENCE_CACHE_BACKENDS[os.environ.get('SLB_REFERENCE_CACHE', 'file')],
+    'profiles': PROFILE_CACHE_BACKENDS[os.environ.get('SLB_PROFILE_CACHE', 'file')],
+}
+
+TEST_RUNNER = 'backed.testing.TestRunner'
+
+
+# Notification outbox (backed/outbox.py): notifications are queued in-process and
+# written in batches by a worker thread. Set NOTIFICATION_OUTBOX_ASYNC = False to
+# write them synchronously instead (the test runner does this).
+
+NOTIFICATION_OUTBOX_ASYNC = True
+NOTIFICATION_OUTBOX_MAX_SIZE = 10000
+NOTIFICATION_OUTBOX_BATCH_SIZE = 500
+NOTIFICATION_OUTBOX_FLUSH_INTERVAL = 1.0
+
+
+# Profile photo thumbnails (backed/thumbnails.py) are rendered by this many worker
+# threads after upload; 0 renders them inline during the request.
+
+THUMBNAIL_WORKERS = 2
+
+
+# Resumable photo uploads (backed/uploads.py) keep partial files here until they are
+# committed. Keep it outside MEDIA_ROOT so half-uploaded files are never served.
+PHOTO_UPLOAD_TEMP_DIR = os.path.join(BASE_DIR, 'upload_sessions')
+PHOTO_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+PHOTO_UPLOAD_SESSION_TTL = 24 * 60 * 60  # seconds an idle session is kept
+PHOTO_UPLOAD_CHUNK_TIMEOUT = 10 * 60  # seconds before the claim of a request that died mid-chunk lapses
+
+
+# Lifetime in seconds of the signed tokens issued by the employee login
+# (backed/authentication.py). Tokens are signed with SECRET_KEY.
+EMPLOYEE_TOKEN_MAX_AGE = 60 * 60 * 24 * 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -139,6 +257,13 @@ USE_TZ = True
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# Let the web server send media bytes: set MEDIA_ACCEL_REDIRECT_PREFIX to an nginx
+# internal location aliased to MEDIA_ROOT (e.g. '/protected-media/'), or
+# MEDIA_SENDFILE_HEADER to 'X-Sendfile' for Apache/lighttpd. Unset, Django streams
+# the file itself.
+MEDIA_ACCEL_REDIRECT_PREFIX = None
+MEDIA_SENDFILE_HEADER = None
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 
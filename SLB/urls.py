@@ -15,11 +15,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
-from django.conf.urls.static import static
 from django.conf import settings
+from backed.views import MediaFileView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/',include('backed.urls'))
-]+static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('api/',include('backed.urls')),
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', MediaFileView, name='media'),
+]
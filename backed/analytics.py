@@ -0,0 +1,245 @@
+# analytics.py
+"""Vectorised compliance figures for any as-of date ("what will compliance look like on the 1st?").
+
+Training dates are loaded once, chunk by chunk, into NumPy arrays; completion, expiry status and the
+per-company / project / main training rollups for a date are then pure array operations, so a trend over
+many dates costs one load. The figures follow compliance_rollup() and calculate_completion().
+
+NumPy is optional: without it load_trainings() returns TrainingRows, which gives the same figures with a
+Python loop over the rows for each date.
+"""
+from datetime import date
+
+from .compliance import ROLLUP_GROUPS, WARNING_WINDOW
+from .models import EmployeeSubTraining
+
+ANALYTICS_CHUNK_SIZE = 5000
+
+
+def _training_values(queryset):
+    """(employee, start, expiration, validity period, then id and name per rollup group) of each row."""
+    if queryset is None:
+        queryset = EmployeeSubTraining.objects.all()
+    group_fields = [field for fields in ROLLUP_GROUPS.values() for field in fields]
+    return queryset.order_by().values_list(
+        'employee_id', 'start_date', 'expiration_date', 'sub_training__validity_period', *group_fields
+    )
+
+
+class TrainingArrays:
+    """Column arrays of EmployeeSubTraining rows: one element per employee × sub-training."""
+
+    def __init__(self, np, employee, start, expiration, validity_days, groups):
+        self.np = np
+        self.employee = employee            # int64 employee ids
+        self.start = start                  # datetime64[D], NaT when unset
+        self.expiration = expiration        # datetime64[D], NaT for permanent trainings
+        self.validity_days = validity_days  # float64, NaN for permanent trainings
+        self.groups = groups                # group -> (codes into ids/names, ids, names)
+
+    def __len__(self):
+        return len(self.employee)
+
+    @classmethod
+    def load(cls, queryset=None, chunk_size=ANALYTICS_CHUNK_SIZE):
+        import numpy as np
+
+        rows = _training_values(queryset)
+        chunks, names = [], {group: {} for group in ROLLUP_GROUPS}
+        batch = []
+        for row in rows.iterator(chunk_size=chunk_size):
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                chunks.append(cls._chunk_arrays(np, batch, names))
+                batch = []
+        if batch or not chunks:
+            chunks.append(cls._chunk_arrays(np, batch, names))
+
+        columns = [np.concatenate(column) for column in zip(*chunks)]
+        employee, start, expiration, validity_days = columns[:4]
+        groups = {}
+        for group, group_ids in zip(ROLLUP_GROUPS, columns[4:]):
+            ids, codes = np.unique(group_ids, return_inverse=True)
+            groups[group] = (codes.reshape(-1), ids, [names[group][group_id] for group_id in ids.tolist()])
+        return cls(np, employee, start, expiration, validity_days, groups)
+
+    @staticmethod
+    def _chunk_arrays(np, batch, names):
+        arrays = [
+            np.array([row[0] for row in batch], dtype=np.int64),
+            np.array([row[1] for row in batch], dtype='datetime64[D]'),
+            np.array([row[2] for row in batch], dtype='datetime64[D]'),
+            # A missing or zero validity period means a permanent training, as in calculate_completion().
+            np.array([row[3].total_seconds() / 86400 if row[3] else np.nan for row in batch], dtype=np.float64),
+        ]
+        for offset, group in enumerate(ROLLUP_GROUPS):
+            id_index = 4 + offset * 2
+            group_names = names[group]
+            for row in batch:
+                group_names.setdefault(row[id_index], row[id_index + 1])
+            arrays.append(np.array([row[id_index] for row in batch], dtype=np.int64))
+        return arrays
+
+    def completion(self, as_of):
+        """Completion percentage of every row on ``as_of``; NaN where there is no start date."""
+        np = self.np
+        elapsed = (np.datetime64(as_of, 'D') - self.start).astype('timedelta64[D]').astype(np.float64)
+        elapsed[np.isnat(self.start)] = np.nan
+        permanent = np.isnan(self.validity_days) | np.isnat(self.expiration)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            remaining = np.round(np.maximum(0.0, 100.0 - elapsed / self.validity_days * 100.0), 2)
+        return np.where(permanent, 100.0, remaining)
+
+    def status(self, as_of):
+        """Boolean arrays (expiring within the warning window, expired) on ``as_of``."""
+        np = self.np
+        day = np.datetime64(as_of, 'D')
+        horizon = np.datetime64(as_of + WARNING_WINDOW, 'D')
+        # Comparisons with NaT are False, so permanent trainings are neither.
+        expired = self.expiration < day
+        expiring = (self.expiration >= day) & (self.expiration <= horizon)
+        return expiring, expired
+
+    def _group_figures(self, codes, count, completion, expiring, expired):
+        np = self.np
+        known = ~np.isnan(completion)
+        total = np.bincount(codes, minlength=count)
+        completed = np.bincount(codes, weights=np.where(known, completion, 0.0), minlength=count)
+        measured = np.bincount(codes, weights=known, minlength=count)
+        # Distinct employees per group: count unique (group, employee) pairs.
+        pairs = np.unique(np.stack([codes, self.employee]), axis=1)
+        employees = np.bincount(pairs[0], minlength=count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = completed / measured
+        return {
+            'average_completion_percentage': average,
+            'employees': employees,
+            'total_trainings': total,
+            'expiring_trainings': np.bincount(codes, weights=expiring, minlength=count),
+            'expired_trainings': np.bincount(codes, weights=expired, minlength=count),
+        }
+
+    def _figures_row(self, figures, index):
+        average = figures['average_completion_percentage'][index]
+        return {
+            'average_completion_percentage': None if self.np.isnan(average) else round(float(average), 2),
+            'employees': int(figures['employees'][index]),
+            'total_trainings': int(figures['total_trainings'][index]),
+            'expiring_trainings': int(figures['expiring_trainings'][index]),
+            'expired_trainings': int(figures['expired_trainings'][index]),
+        }
+
+    def snapshot(self, as_of=None):
+        """Overall figures and the compliance_rollup() groups as they will (or did) stand on ``as_of``."""
+        np = self.np
+        as_of = as_of or date.today()
+        completion = self.completion(as_of)
+        expiring, expired = self.status(as_of)
+
+        overall = self._group_figures(np.zeros(len(self), dtype=np.int64), 1, completion, expiring, expired)
+        snapshot = {'as_of': as_of, 'overall': self._figures_row(overall, 0)}
+        for group, (codes, ids, names) in self.groups.items():
+            figures = self._group_figures(codes, len(ids), completion, expiring, expired)
+            rows = [
+                {'id': group_id, 'name': name, **self._figures_row(figures, index)}
+                for index, (group_id, name) in enumerate(zip(ids.tolist(), names))
+            ]
+            snapshot[group] = sorted(rows, key=lambda row: (row['name'], row['id']))
+        return snapshot
+
+
+class TrainingRows:
+    """Pure-Python TrainingArrays for when NumPy is not installed: the same figures, a loop per date."""
+
+    def __init__(self, rows, names):
+        self.rows = rows    # (employee id, start, expiration, validity days or None, group ids...)
+        self.names = names  # group -> {id: name}
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, queryset=None, chunk_size=ANALYTICS_CHUNK_SIZE):
+        rows, names = [], {group: {} for group in ROLLUP_GROUPS}
+        for row in _training_values(queryset).iterator(chunk_size=chunk_size):
+            employee_id, start, expiration, validity = row[:4]
+            group_ids = row[4::2]
+            for group, group_id, name in zip(ROLLUP_GROUPS, group_ids, row[5::2]):
+                names[group].setdefault(group_id, name)
+            # A missing or zero validity period means a permanent training, as in calculate_completion().
+            validity_days = validity.total_seconds() / 86400 if validity else None
+            rows.append((employee_id, start, expiration, validity_days, *group_ids))
+        return cls(rows, names)
+
+    def completion(self, as_of):
+        """Completion percentage of every row on ``as_of``; None where there is no start date."""
+        percentages = []
+        for _, start, expiration, validity_days, *_ in self.rows:
+            if validity_days is None or expiration is None:
+                percentages.append(100.0)
+            elif start is None:
+                percentages.append(None)
+            else:
+                percentages.append(round(max(0.0, 100.0 - (as_of - start).days / validity_days * 100.0), 2))
+        return percentages
+
+    def snapshot(self, as_of=None):
+        """Overall figures and the compliance_rollup() groups as they will (or did) stand on ``as_of``."""
+        as_of = as_of or date.today()
+        horizon = as_of + WARNING_WINDOW
+        totals = {}
+        for row, completion in zip(self.rows, self.completion(as_of)):
+            employee_id, expiration = row[0], row[2]
+            for cell in [('overall', None), *zip(ROLLUP_GROUPS, row[4:])]:
+                figures = totals.get(cell)
+                if figures is None:
+                    figures = totals[cell] = self._empty_figures()
+                if completion is not None:
+                    figures['completed'] += completion
+                    figures['measured'] += 1
+                figures['employees'].add(employee_id)
+                figures['total'] += 1
+                if expiration is not None:
+                    figures['expiring'] += as_of <= expiration <= horizon
+                    figures['expired'] += expiration < as_of
+
+        overall = totals.pop(('overall', None), None) or self._empty_figures()
+        snapshot = {'as_of': as_of, 'overall': self._figures_row(overall)}
+        for group in ROLLUP_GROUPS:
+            rows = [
+                {'id': group_id, 'name': self.names[group][group_id], **self._figures_row(figures)}
+                for (cell_group, group_id), figures in totals.items() if cell_group == group
+            ]
+            snapshot[group] = sorted(rows, key=lambda row: (row['name'], row['id']))
+        return snapshot
+
+    @staticmethod
+    def _empty_figures():
+        return {'completed': 0.0, 'measured': 0, 'employees': set(), 'total': 0, 'expiring': 0, 'expired': 0}
+
+    @staticmethod
+    def _figures_row(figures):
+        return {
+            'average_completion_percentage': (
+                round(figures['completed'] / figures['measured'], 2) if figures['measured'] else None
+            ),
+            'employees': len(figures['employees']),
+            'total_trainings': figures['total'],
+            'expiring_trainings': figures['expiring'],
+            'expired_trainings': figures['expired'],
+        }
+
+
+def load_trainings(queryset=None):
+    """TrainingArrays when NumPy is installed, otherwise the slower TrainingRows."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return TrainingRows.load(queryset)
+    return TrainingArrays.load(queryset)
+
+
+def compliance_trend(dates, queryset=None):
+    """One snapshot per date from a single load of the training rows."""
+    trainings = load_trainings(queryset)
+    return [trainings.snapshot(as_of) for as_of in dates]
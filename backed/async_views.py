@@ -0,0 +1,149 @@
+# backed/async_views.py
+"""Async counterparts of the read-heavy endpoints, for serving under ASGI (SLB/asgi.py).
+
+Each view returns the same payload as the DRF view it mirrors and is routed under ``async/``. Rows are
+fetched with Django's async ORM, so a waiting request holds no worker thread of its own.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import Avg, Count, Max
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from .compliance import get_compliance_summary, summary_is_current
+from .filters import EmployeeFilter
+from .models import Employee, EmployeeSubTraining, EmployeeComplianceSummary
+from .pagination import OptionalCursorPagination, NotificationCursorPagination
+from .serializers import EmployeeSerializer, EmployeePercentageSubTrainingSerializer, NotificationSerializer, AveragePercentageSerializer
+from .views import NotificationListView, average_completion_payload, notifications_since
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    # DRF's encoder, so dates, decimals and UUIDs render exactly as in the sync views.
+    return JsonResponse(data, encoder=JSONEncoder, safe=False, status=status)
+
+
+class AsyncListView(View):
+    """Async analogue of generics.ListAPIView: set ``queryset`` and ``serializer_class``; override
+    get_queryset() to narrow the queryset per request.
+    """
+    queryset = None
+    serializer_class = None
+    pagination_class = OptionalCursorPagination
+
+    def get_queryset(self):
+        assert self.queryset is not None, f"{type(self).__name__} should set a `queryset` attribute."
+        return self.queryset.all()
+
+    def get_paginator(self):
+        return self.pagination_class() if self.pagination_class else None
+
+    async def get(self, request, *args, **kwargs):
+        drf_request = Request(request)
+        try:
+            queryset = self.get_queryset()
+        except ValidationError as exc:
+            return json_response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        context = {'request': drf_request}
+
+        paginator = self.get_paginator()
+        if paginator is None or paginator.get_page_size(drf_request) is None:
+            rows = [row async for row in queryset]
+            return json_response(self.serializer_class(rows, many=True, context=context).data)
+
+        # The cursor paginator evaluates the page itself; it runs on the same thread the async ORM uses.
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, drf_request, self)
+        data = self.serializer_class(page, many=True, context=context).data
+        return json_response(paginator.get_paginated_response(data).data)
+
+
+class AsyncFilteredEmployeeListView(AsyncListView):
+    """Employee lists that accept the EmployeeFilter query parameters, like their sync versions."""
+    queryset = Employee.objects.select_related('company', 'project')
+    serializer_class = EmployeeSerializer
+    employee_filter = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(**self.employee_filter)
+        filterset = EmployeeFilter(self.request.GET, queryset=queryset)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return filterset.qs
+
+
+class AsyncEmployeeListView(AsyncListView):
+    queryset = Employee.objects.select_related('company', 'project')
+    serializer_class = EmployeeSerializer
+
+class AsyncAcceptedEmployeeListView(AsyncEmployeeListView):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_accepted=True)
+
+class AsyncNotAcceptedEmployeeListView(AsyncEmployeeListView):
+    def get_queryset(self):
+        return super().get_queryset().filter(is_accepted=False)
+
+class AsyncOnDutyEmployeeListView(AsyncFilteredEmployeeListView):
+    employee_filter = {'on_duty': True}
+
+class AsyncOffDutyEmployeeListView(AsyncFilteredEmployeeListView):
+    employee_filter = {'on_duty': False}
+
+
+class AsyncEmployeeSubTrainingListView(AsyncListView):
+    queryset = EmployeeSubTraining.objects.select_related('employee', 'sub_training__main_training').with_completion()
+    serializer_class = EmployeePercentageSubTrainingSerializer
+
+    def get_queryset(self):
+        return super().get_queryset().filter(employee__id=self.kwargs['employee_id'])
+
+
+class AsyncAverageCompletionPercentageView(View):
+    async def get(self, request, employee_id):
+        summary = await EmployeeComplianceSummary.objects.filter(employee_id=employee_id).afirst()
+        if not summary_is_current(summary):
+            summary = await sync_to_async(get_compliance_summary)(employee_id)
+        data, status_code = average_completion_payload(summary)
+        return json_response(data, status=status_code)
+
+
+class AsyncEmployeeMainTrainingAverageView(View):
+    async def get(self, request, employee_id, main_training_id):
+        totals = await EmployeeSubTraining.objects.filter(
+            employee__id=employee_id,
+            sub_training__main_training__id=main_training_id
+        ).with_completion().aaggregate(
+            count=Count('id'),
+            average_percentage=Avg('completion_percentage'),
+            main_training_name=Max('sub_training__main_training__name'),
+        )
+
+        if not totals['count']:
+            return json_response({'error': 'No sub-trainings found for the given employee and main training'}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = AveragePercentageSerializer(data={
+            'main_training_name': totals['main_training_name'],
+            'average_percentage': round(totals['average_percentage'], 2)
+        })
+        if serializer.is_valid():
+            return json_response(serializer.data)
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncNotificationListView(AsyncListView):
+    queryset = NotificationListView.queryset
+    serializer_class = NotificationSerializer
+    pagination_class = NotificationCursorPagination
+    since_limit = NotificationListView.since_limit
+
+    def get_paginator(self):
+        if 'since_id' in self.request.GET:
+            return None
+        return super().get_paginator()
+
+    def get_queryset(self):
+        since = notifications_since(self.request.GET, self.since_limit)
+        return super().get_queryset() if since is None else since
@@ -0,0 +1,120 @@
+# cache.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+# Reference data (companies, projects, trainings) is cached per endpoint and query string under a
+# version per model. Saving or deleting a row bumps its model's version (see signals.py), which retires
+# every cached response and ETag built from it. Versions and responses share the alias's TIMEOUT, so a
+# process whose cache missed a bump picks up a fresh version within that time.
+REFERENCE_CACHE_ALIAS = 'reference'
+
+
+def reference_cache():
+    return caches[REFERENCE_CACHE_ALIAS if REFERENCE_CACHE_ALIAS in settings.CACHES else 'default']
+
+
+def reference_version_key(model):
+    return f'reference:version:{model._meta.label_lower}'
+
+
+def get_reference_versions(models):
+    store = reference_cache()
+    keys = [reference_version_key(model) for model in models]
+    versions = store.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed from the clock so a cleared cache never reissues an ETag a client already holds.
+            store.add(key, time.time_ns())
+            versions[key] = store.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_reference_version(model):
+    # A fresh clock value rather than incr(): the file backend's incr is a get then a set, so two
+    # processes bumping at once could both write the same number and one bump would be lost.
+    reference_cache().set(reference_version_key(model), time.time_ns())
+
+
+def reference_cache_key(endpoint, versions, query_string=''):
+    digest = hashlib.md5(query_string.encode()).hexdigest()[:12]
+    return f"reference:{endpoint}:{'-'.join(map(str, versions))}:{digest}"
+
+
+def reference_etag(endpoint, versions, query_string=''):
+    return '"' + reference_cache_key(endpoint, versions, query_string).replace(':', '-') + '"'
+
+
+class ReferenceCacheMixin:
+    """Serve a reference-data list view's GETs from the reference cache, with an ETag for conditional GET.
+
+    ``reference_models`` lists every model the response is built from.
+    """
+    reference_models = ()
+
+    def get(self, request, *args, **kwargs):
+        endpoint = type(self).__name__
+        query_string = urlencode(sorted(request.GET.lists()), doseq=True)
+        versions = get_reference_versions(self.reference_models)
+        etag_value = reference_etag(endpoint, versions, query_string)
+        not_modified = get_conditional_response(request, etag=etag_value)
+        if not_modified is not None:
+            return not_modified
+
+        store = reference_cache()
+        key = reference_cache_key(endpoint, versions, query_string)
+        data = store.get(key)
+        if data is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            data = response.data
+            store.set(key, data)
+        response = Response(data)
+        response['ETag'] = etag_value
+        # Clients keep their copy but revalidate; a 304 costs no query.
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+
+# Employee profiles are cached until the employee changes (see signals.py and the CACHES notes in settings).
+PROFILE_CACHE_ALIAS = 'profiles'
+
+
+def profile_cache():
+    return caches[PROFILE_CACHE_ALIAS if PROFILE_CACHE_ALIAS in settings.CACHES else 'default']
+
+
+def employee_profile_key(employee_id):
+    return f'employee-profile:{employee_id}'
+
+
+def get_employee_profile(employee_id, employee=None):
+    """Compact profile of an employee, cached until the employee changes.
+
+    Pass ``employee`` (with company and project selected) when it is already loaded to skip the query.
+    Returns None for an employee that does not exist.
+    """
+    from .models import Employee
+    from .serializers import EmployeeProfileSerializer
+
+    store = profile_cache()
+    key = employee_profile_key(employee_id)
+    profile = store.get(key)
+    if profile is None:
+        if employee is None:
+            employee = Employee.objects.select_related('company', 'project').filter(pk=employee_id).first()
+            if employee is None:
+                return None
+        profile = dict(EmployeeProfileSerializer(employee).data)
+        store.set(key, profile)
+    return profile
+
+
+def invalidate_employee_profiles(employee_ids):
+    profile_cache().delete_many([employee_profile_key(employee_id) for employee_id in employee_ids])
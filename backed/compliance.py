@@ -0,0 +1,272 @@
+# compliance.py
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Employee, EmployeeSubTraining, EmployeeComplianceSummary, ExpirySweep, Notification
+
+WARNING_WINDOW = timedelta(days=30)
+CHUNK_SIZE = 500
+
+
+def _chunks(ids, size=CHUNK_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def refresh_compliance_summaries(employee_ids):
+    """Recompute and store the compliance summary of the given employees."""
+    today = date.today()
+    summaries = []
+    for chunk in _chunks(employee_ids):
+        existing_ids = set(Employee.objects.filter(id__in=chunk).values_list('id', flat=True))
+        if not existing_ids:
+            continue
+
+        totals = {
+            row['employee_id']: row
+            for row in EmployeeSubTraining.objects.filter(employee_id__in=existing_ids).with_completion()
+            .values('employee_id').order_by().annotate(
+                average=Avg('completion_percentage'),
+                total=Count('id'),
+                expired=Count('id', filter=Q(expiration_date__lt=today)),
+                warning=Count('id', filter=Q(expiration_date__gte=today, expiration_date__lte=today + WARNING_WINDOW)),
+            )
+        }
+
+        now = timezone.now()
+        chunk_summaries = []
+        for employee_id in existing_ids:
+            summary = EmployeeComplianceSummary(employee_id=employee_id, as_of=today, updated_at=now)
+            row = totals.get(employee_id)
+            if row:
+                summary.average_completion_percentage = round(row['average'], 2)
+                summary.total_trainings = row['total']
+                summary.expired_trainings = row['expired']
+                summary.warning_trainings = row['warning']
+                summary.valid_trainings = row['total'] - row['expired'] - row['warning']
+            chunk_summaries.append(summary)
+
+        stored_ids = set(
+            EmployeeComplianceSummary.objects.filter(employee_id__in=existing_ids).values_list('employee_id', flat=True)
+        )
+        EmployeeComplianceSummary.objects.bulk_create([s for s in chunk_summaries if s.employee_id not in stored_ids])
+        EmployeeComplianceSummary.objects.bulk_update(
+            [s for s in chunk_summaries if s.employee_id in stored_ids],
+            ['average_completion_percentage', 'total_trainings', 'valid_trainings',
+             'warning_trainings', 'expired_trainings', 'as_of', 'updated_at'],
+        )
+        summaries.extend(chunk_summaries)
+    return summaries
+
+
+def refresh_all_compliance_summaries():
+    employee_ids = Employee.objects.order_by('id').values_list('id', flat=True)
+    return sum(len(refresh_compliance_summaries(chunk)) for chunk in _chunks(employee_ids))
+
+
+def summary_is_current(summary):
+    """Whether a stored summary can be served as is; it is rebuilt when missing or aged past today."""
+    return summary is not None and summary.as_of >= date.today()
+
+
+def get_compliance_summary(employee_id):
+    """Return the stored summary, rebuilding it when it is not current."""
+    summary = EmployeeComplianceSummary.objects.filter(employee_id=employee_id).first()
+    if summary_is_current(summary):
+        return summary
+    summaries = refresh_compliance_summaries([employee_id])
+    return summaries[0] if summaries else None
+
+
+ROLLUP_GROUPS = {
+    'companies': ('employee__company_id', 'employee__company__name'),
+    'projects': ('employee__project_id', 'employee__project__name'),
+    'main_trainings': ('sub_training__main_training_id', 'sub_training__main_training__name'),
+}
+
+
+def filter_trainings(queryset, company=None, project=None, main_training=None):
+    """Apply the validated ComplianceFilterSerializer filters to an EmployeeSubTraining queryset."""
+    if company:
+        queryset = queryset.filter(employee__company_id=company)
+    if project:
+        queryset = queryset.filter(employee__project_id=project)
+    if main_training:
+        queryset = queryset.filter(sub_training__main_training_id=main_training)
+    return queryset
+
+
+def compliance_rollup(queryset=None, today=None):
+    """Average completion, expiring-soon and expired counts per company, project and main training.
+
+    Completion is computed in a single pass grouped by (company, project, main training); the three
+    rollups are sums over those cells. Every employee belongs to one company and project, so distinct
+    employee counts add up across (company, project) cells, which a second, light query over the
+    employee table provides.
+    """
+    today = today or date.today()
+    if queryset is None:
+        queryset = EmployeeSubTraining.objects.all()
+
+    company, project, main_training = ROLLUP_GROUPS.values()
+    cell_fields = (*company, *project, *main_training)
+    cells = queryset.with_completion(today).values(*cell_fields).order_by().annotate(
+        completed=Sum('completion_percentage'),
+        measured=Count('completion_percentage'),
+        employees=Count('employee_id', distinct=True),
+        total=Count('id'),
+        expiring=Count('id', filter=Q(expiration_date__gte=today, expiration_date__lte=today + WARNING_WINDOW)),
+        expired=Count('id', filter=Q(expiration_date__lt=today)),
+    )
+    # Counting employees that have a matching training avoids a COUNT(DISTINCT) over every training row.
+    staff = {
+        (row['company_id'], row['project_id']): row['employees']
+        for row in Employee.objects.filter(id__in=queryset.values('employee_id')).values('company_id', 'project_id')
+        .order_by().annotate(employees=Count('id'))
+    }
+
+    totals = {group: {} for group in ROLLUP_GROUPS}
+    for cell in cells:
+        for group, (id_field, name_field) in ROLLUP_GROUPS.items():
+            figures = totals[group].setdefault(cell[id_field], {
+                'name': cell[name_field], 'completed': 0.0, 'measured': 0, 'employees': 0,
+                'total': 0, 'expiring': 0, 'expired': 0, 'staff': set(),
+            })
+            for key in ('completed', 'measured', 'total', 'expiring', 'expired'):
+                figures[key] += cell[key] or 0
+            if group == 'main_trainings':
+                figures['employees'] += cell['employees']
+            else:
+                figures['staff'].add((cell[company[0]], cell[project[0]]))
+
+    rollup = {}
+    for group, figures_by_id in totals.items():
+        rows = []
+        for group_id, figures in figures_by_id.items():
+            if group != 'main_trainings':
+                figures['employees'] = sum(staff[cell] for cell in figures['staff'])
+            rows.append({
+                'id': group_id,
+                'name': figures['name'],
+                'average_completion_percentage': (
+                    round(figures['completed'] / figures['measured'], 2) if figures['measured'] else None
+                ),
+                'employees': figures['employees'],
+                'total_trainings': figures['total'],
+                'expiring_trainings': figures['expiring'],
+                'expired_trainings': figures['expired'],
+            })
+        rollup[group] = sorted(rows, key=lambda row: (row['name'], row['id']))
+    return rollup
+
+
+EXPIRY_INTERVALS = {'week': TruncWeek, 'month': TruncMonth}
+
+
+def _bucket_start(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _next_bucket(bucket, interval):
+    if interval == 'week':
+        return bucket + timedelta(days=7)
+    return (bucket + timedelta(days=32)).replace(day=1)
+
+
+def expiry_counts(queryset, start, end, interval='week'):
+    """Trainings expiring between ``start`` and ``end`` (inclusive), counted per bucket and main training.
+
+    A single GROUP BY over the expiration_date index range.
+    """
+    id_field, name_field = ROLLUP_GROUPS['main_trainings']
+    return queryset.filter(expiration_date__gte=start, expiration_date__lte=end).annotate(
+        bucket=EXPIRY_INTERVALS[interval]('expiration_date'),
+    ).values('bucket', id_field, name_field).order_by('bucket', name_field, id_field).annotate(count=Count('id'))
+
+
+def expiry_timeline(queryset, start, end, interval='week'):
+    """Every week or month bucket from ``start`` to ``end``, including empty ones, clipped to the range."""
+    id_field, name_field = ROLLUP_GROUPS['main_trainings']
+    counts = {}
+    for row in expiry_counts(queryset, start, end, interval):
+        counts.setdefault(row['bucket'], []).append(
+            {'id': row[id_field], 'name': row[name_field], 'count': row['count']}
+        )
+
+    timeline = []
+    bucket = _bucket_start(start, interval)
+    while bucket <= end:
+        following = _next_bucket(bucket, interval)
+        main_trainings = counts.get(bucket, [])
+        timeline.append({
+            'start': max(bucket, start),
+            'end': min(following - timedelta(days=1), end),
+            'total': sum(row['count'] for row in main_trainings),
+            'main_trainings': main_trainings,
+        })
+        bucket = following
+    return timeline
+
+
+def _expiry_message(row, today):
+    expiration_date = row['expiration_date']
+    verb = 'expired' if expiration_date < today else 'expires'
+    return (f"Training {verb} on {expiration_date.strftime('%d-%m-%Y')}: "
+            f"{row['employee__fullname']} - {row['sub_training__name']}")
+
+
+def sweep_expiry_warnings(today=None):
+    """Flag trainings that entered the warning window since the last sweep and notify about them."""
+    today = today or date.today()
+    threshold = today + WARNING_WINDOW
+
+    with transaction.atomic():
+        last_sweep = ExpirySweep.objects.order_by('-threshold_date').first()
+        due = EmployeeSubTraining.objects.filter(warning=False, expiration_date__lte=threshold)
+        if last_sweep is not None:
+            due = due.filter(expiration_date__gt=last_sweep.threshold_date)
+
+        rows = list(due.values('id', 'expiration_date', 'employee__fullname', 'sub_training__name'))
+        flagged = due.update(warning=True)
+
+        messages = list(dict.fromkeys(_expiry_message(row, today) for row in rows))
+        existing = set()
+        for chunk in _chunks(messages):
+            existing.update(Notification.objects.filter(message__in=chunk).values_list('message', flat=True))
+        new_notifications = [Notification(message=message) for message in messages if message not in existing]
+        Notification.objects.bulk_create(new_notifications, batch_size=CHUNK_SIZE)
+
+        return ExpirySweep.objects.create(threshold_date=threshold, flagged=flagged, notified=len(new_notifications))
+
+
+def assign_sub_training(sub_training, employees, start_date=None):
+    """Give every employee in ``employees`` (a queryset) the sub-training, skipping ones that already have it."""
+    start_date = start_date or date.today()
+    expiration_date = start_date + sub_training.validity_period if sub_training.validity_period else None
+    warning = bool(expiration_date and expiration_date - WARNING_WINDOW <= date.today())
+
+    with transaction.atomic():
+        already_assigned = EmployeeSubTraining.objects.filter(sub_training=sub_training, employee__in=employees)
+        employee_ids = list(
+            employees.exclude(id__in=already_assigned.values('employee_id')).order_by('id').values_list('id', flat=True)
+        )
+        EmployeeSubTraining.objects.bulk_create(
+            [
+                EmployeeSubTraining(
+                    employee_id=employee_id, sub_training=sub_training, start_date=start_date,
+                    expiration_date=expiration_date, warning=warning,
+                )
+                for employee_id in employee_ids
+            ],
+            batch_size=CHUNK_SIZE,
+        )
+        # bulk_create skips the post_save signal that keeps summaries current.
+        transaction.on_commit(lambda: refresh_compliance_summaries(employee_ids))
+    return employee_ids
@@ -0,0 +1,15 @@
+# db.py
+
+
+def apply_sqlite_pragmas(connection):
+    """Run the ``PRAGMAS`` of the connection's DATABASES entry (called for every new connection).
+
+    Django ignores unknown keys in a DATABASES entry, so the pragmas live next to the settings they tune
+    and each database (including throwaway benchmark ones) can have its own.
+    """
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,112 @@
+# fast.py
+"""Read-only fast path for the hot list endpoints.
+
+Rows are fetched with ``values()`` and turned into dicts by plain functions that reproduce the output of
+``EmployeeSerializer`` and ``EmployeePercentageSubTrainingSerializer`` exactly (tests.FastPathTests checks
+this), skipping serializer instantiation and per-field ``to_representation``. Change both together.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+try:
+    import orjson
+except ImportError:  # optional: FastJSONRenderer falls back to the standard library
+    orjson = None
+
+from .models import Employee
+
+EMPLOYEE_VALUES = (
+    'id', 'fullname', 'mobile_number', 'designation', 'gate_pass_no', 'rig_or_rigless',
+    'profile_photo', 'profile_photo_avatar', 'profile_photo_card', 'is_accepted', 'on_duty',
+    'company__id', 'company__name', 'project__id', 'project__name',
+)
+
+EMPLOYEE_TRAINING_VALUES = (
+    'id', 'employee__fullname', 'sub_training__name', 'sub_training__main_training__name',
+    'start_date', 'expiration_date', 'warning', 'completion_percentage',
+)
+
+
+def employee_mapper(request):
+    """Return a function turning an EMPLOYEE_VALUES row into EmployeeSerializer's representation."""
+    storage = Employee._meta.get_field('profile_photo').storage
+    build = request.build_absolute_uri if request is not None else (lambda url: url)
+
+    def photo_url(name):
+        return build(storage.url(name)) if name else None
+
+    def to_dict(row):
+        original = photo_url(row['profile_photo'])
+        if original is None:
+            urls = None
+        else:
+            urls = {
+                'avatar': photo_url(row['profile_photo_avatar']) or original,
+                'card': photo_url(row['profile_photo_card']) or original,
+                'original': original,
+            }
+        return {
+            'id': row['id'],
+            'fullname': row['fullname'],
+            'mobile_number': row['mobile_number'],
+            'designation': row['designation'],
+            'gate_pass_no': row['gate_pass_no'],
+            'rig_or_rigless': row['rig_or_rigless'],
+            'profile_photo': original,
+            'profile_photo_urls': urls,
+            'is_accepted': row['is_accepted'],
+            'company': {'id': row['company__id'], 'name': row['company__name']},
+            'project': {'id': row['project__id'], 'name': row['project__name']},
+            'on_duty': row['on_duty'],
+        }
+
+    return to_dict
+
+
+def employee_training_mapper(request):
+    """Return a function turning an EMPLOYEE_TRAINING_VALUES row into EmployeePercentageSubTrainingSerializer's output."""
+    def to_dict(row):
+        start_date, expiration_date = row['start_date'], row['expiration_date']
+        return {
+            'employee_name': row['employee__fullname'],
+            'sub_training_name': row['sub_training__name'],
+            'main_training_name': row['sub_training__main_training__name'],
+            'start_date': start_date.isoformat() if start_date else None,
+            'expiration_date': expiration_date.isoformat() if expiration_date else None,
+            'warning': row['warning'],
+            'completion_percentage': row['completion_percentage'],
+        }
+
+    return to_dict
+
+
+class FastListMixin:
+    """GET lists through ``values()`` and a row mapper instead of the serializer.
+
+    Set ``fast_values`` to the fields to fetch and ``fast_mapper`` to ``staticmethod(<mapper factory>)``.
+    Filtering and pagination work as before.
+    """
+    fast_values = ()
+    fast_mapper = None
+
+    def list(self, request, *args, **kwargs):
+        to_dict = self.fast_mapper(request)
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.fast_values)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response([to_dict(row) for row in page])
+        return Response([to_dict(row) for row in queryset])
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer using orjson when it is installed; output matches JSONRenderer's compact form."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Anything orjson can't serialise natively (and datetimes, which DRF formats its own way) goes
+        # through DRF's encoder.
+        rendered = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        # Like JSONRenderer: escape the two code points that are valid JSON but not valid JavaScript.
+        return rendered.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
@@ -4,7 +4,8 @@ from datetime import datetime
 
 class CustomDateField(serializers.DateField):
     def to_representation(self, value):
-        return value.strftime('%d-%m-%Y')
+        # Same text as strftime('%d-%m-%Y') without its per-call format parsing.
+        return '%02d-%02d-%d' % (value.day, value.month, value.year)
 
     def to_internal_value(self, data):
         try:
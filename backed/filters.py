@@ -1,9 +1,11 @@
 import django_filters
-from .models import Employee
+from .models import Employee, EmployeeSubTraining
+from .search import search_employees
 
 class EmployeeFilter(django_filters.FilterSet):
-    company_name = django_filters.CharFilter(field_name='company__name', lookup_expr='icontains')
-    project_name = django_filters.CharFilter(field_name='project__name', lookup_expr='icontains')
+    company_name = django_filters.CharFilter(method='filter_indexed')
+    project_name = django_filters.CharFilter(method='filter_indexed')
+    search = django_filters.CharFilter(method='filter_indexed')
 
     class Meta:
         model = Employee
@@ -13,3 +15,18 @@ class EmployeeFilter(django_filters.FilterSet):
             'on_duty': ['exact'],
                     
             }
+
+    def filter_indexed(self, queryset, name, value):
+        return search_employees(queryset, {None if name == 'search' else name: value})
+
+
+class EmployeeSubTrainingFilter(django_filters.FilterSet):
+    """``expiration_date_after`` / ``expiration_date_before`` are inclusive; used by the expiry timeline drill-down links."""
+    expiration_date = django_filters.DateFromToRangeFilter()
+    company = django_filters.NumberFilter(field_name='employee__company_id')
+    project = django_filters.NumberFilter(field_name='employee__project_id')
+    main_training = django_filters.NumberFilter(field_name='sub_training__main_training_id')
+
+    class Meta:
+        model = EmployeeSubTraining
+        fields = ['employee', 'sub_training']
@@ -0,0 +1,187 @@
+# imports.py
+import csv
+import io
+import json
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Company, Project, Employee
+from .outbox import outbox
+from .search import index_employees, set_prefix_keys
+from .serializers import EmployeeImportSerializer
+
+IMPORT_CHUNK_SIZE = 500
+JSON_READ_SIZE = 64 * 1024
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+JSON_DELIMITERS = frozenset(' \t\n\r,]')
+
+
+def iter_json_array(stream, read_size=JSON_READ_SIZE):
+    """Yield the items of a binary top-level JSON array one by one, reading ``read_size`` characters at a time."""
+    decoder = json.JSONDecoder()
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    buffer, position, eof = '', 0, False
+    consumed = 0  # characters dropped from the front of the buffer, so errors can point into the file
+
+    def read_more():
+        nonlocal buffer, position, eof, consumed
+        block = text.read(read_size)
+        consumed += position
+        buffer, position, eof = buffer[position:] + block, 0, not block
+
+    def next_char():
+        nonlocal position
+        while True:
+            position = JSON_WHITESPACE.match(buffer, position).end()
+            if position < len(buffer) or eof:
+                return buffer[position:position + 1]
+            read_more()
+
+    def next_item():
+        next_char()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"{e.msg} at character {consumed + e.pos} of the file.") from e
+            else:
+                # Only trust an item followed by a delimiter: a number cut off by the block boundary still decodes.
+                if eof or buffer[end:end + 1] in JSON_DELIMITERS:
+                    return item, end
+            read_more()
+
+    if next_char() != '[':
+        raise ValueError("Expected a JSON array of employees.")
+    position += 1
+    if next_char() == ']':
+        position += 1
+    else:
+        while True:
+            item, position = next_item()
+            yield item
+            separator = next_char()
+            position += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' at character {consumed + position - 1} of the file.")
+    if next_char():
+        raise ValueError(f"Extra data at character {consumed + position} of the file.")
+
+
+def read_rows(stream, file_format):
+    """Yield row dicts from a binary CSV, JSON array or JSON Lines stream, without loading the whole file."""
+    if file_format == 'csv':
+        for row in csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')):
+            # Blank cells mean "use the default", not an empty value.
+            yield {key: value for key, value in row.items() if key and value not in ('', None)}
+    elif file_format == 'jsonl':
+        for line_number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8-sig'), start=1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{e.msg} on line {line_number}, column {e.pos + 1}.") from e
+    elif file_format == 'json':
+        yield from iter_json_array(stream)
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def file_format_for(name):
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return {'ndjson': 'jsonl'}.get(extension, extension)
+
+
+def _unique_error(field):
+    label = Employee._meta.get_field(field).verbose_name
+    return {field: [f"employee with this {label} already exists."]}
+
+
+def _import_chunk(numbered_rows, seen_mobiles, seen_gate_passes, report):
+    valid = []
+    for row_number, row in numbered_rows:
+        serializer = EmployeeImportSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((row_number, serializer.validated_data))
+        else:
+            report['errors'].append({'row': row_number, 'errors': serializer.errors})
+
+    if not valid:
+        return
+
+    mobiles = {data['mobile_number'] for _, data in valid}
+    gate_passes = {data['gate_pass_no'] for _, data in valid}
+    taken = Employee.objects.filter(Q(mobile_number__in=mobiles) | Q(gate_pass_no__in=gate_passes))
+    for mobile_number, gate_pass_no in taken.values_list('mobile_number', 'gate_pass_no'):
+        seen_mobiles.add(mobile_number)
+        seen_gate_passes.add(gate_pass_no)
+    company_ids = set(Company.objects.filter(id__in={data['company_id'] for _, data in valid}).values_list('id', flat=True))
+    project_ids = set(Project.objects.filter(id__in={data['project_id'] for _, data in valid}).values_list('id', flat=True))
+
+    employees = []
+    for row_number, data in valid:
+        errors = {}
+        if data['mobile_number'] in seen_mobiles:
+            errors.update(_unique_error('mobile_number'))
+        if data['gate_pass_no'] in seen_gate_passes:
+            errors.update(_unique_error('gate_pass_no'))
+        if data['company_id'] not in company_ids:
+            errors['company_id'] = [f"Invalid pk \"{data['company_id']}\" - object does not exist."]
+        if data['project_id'] not in project_ids:
+            errors['project_id'] = [f"Invalid pk \"{data['project_id']}\" - object does not exist."]
+        if errors:
+            report['errors'].append({'row': row_number, 'errors': errors})
+            continue
+        seen_mobiles.add(data['mobile_number'])
+        seen_gate_passes.add(data['gate_pass_no'])
+        employee = Employee(**data)
+        set_prefix_keys(employee)
+        employees.append(employee)
+
+    if not employees:
+        return
+
+    with transaction.atomic():
+        Employee.objects.bulk_create(employees, batch_size=IMPORT_CHUNK_SIZE)
+        # bulk_create skips post_save, so do the work of the Employee signals here in batches.
+        created = list(
+            Employee.objects.filter(gate_pass_no__in=[e.gate_pass_no for e in employees]).values_list('id', 'fullname')
+        )
+        index_employees([employee_id for employee_id, _ in created])
+        outbox.enqueue_many(f"New employee registered: {fullname}" for _, fullname in created)
+    report['created'] += len(created)
+
+
+def import_employees(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate and insert employee rows chunk by chunk; returns a per-row error report.
+
+    Each chunk commits on its own. If the file turns out to be unreadable part-way (bad JSON, bad UTF-8,
+    a CSV error), the rows read before it are still imported and ``file_error`` gives the row where
+    reading stopped.
+    """
+    report = {'created': 0, 'skipped': 0, 'errors': [], 'file_error': None}
+    seen_mobiles, seen_gate_passes = set(), set()
+    rows = iter(rows)
+    row_number = 0
+    while report['file_error'] is None:
+        chunk = []
+        while len(chunk) < chunk_size:
+            try:
+                row = next(rows)
+            except StopIteration:
+                break
+            except (ValueError, csv.Error) as e:
+                report['file_error'] = {'row': row_number + 1, 'detail': str(e)}
+                break
+            row_number += 1
+            chunk.append((row_number, row))
+        if not chunk:
+            break
+        _import_chunk(chunk, seen_mobiles, seen_gate_passes, report)
+    report['errors'].sort(key=lambda error: error['row'])
+    report['skipped'] = len(report['errors'])
+    return report
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from backed.thumbnails import backfill_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Render the pre-rendered profile photo sizes that are missing (e.g. for photos uploaded before thumbnails existed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Re-render every photo, e.g. after THUMBNAIL_SIZES changed.")
+
+    def handle(self, *args, **options):
+        rendered, failed = backfill_thumbnails(rerender=options['all'])
+        if failed:
+            self.stderr.write(f"Could not render {failed} photos; see the log for details.")
+        self.stdout.write(self.style.SUCCESS(f"Rendered thumbnails for {rendered} photos."))
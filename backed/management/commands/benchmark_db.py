@@ -0,0 +1,126 @@
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+# The handler is private to the benchmark, so its only database has to be its 'default'.
+ALIAS = 'default'
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Benchmark:
+    """Readers page through on-duty employees while writers toggle duty and log a notification,
+    each operation ending like a request does (the connection is closed unless CONN_MAX_AGE keeps it)."""
+
+    def __init__(self, database, rows):
+        self.connections = ConnectionHandler({ALIAS: database})
+        self.rows = rows
+        self.lock = threading.Lock()
+        self.reads, self.writes, self.errors = [], [], 0
+
+    def setup(self):
+        connection = self.connections[ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE employee (id INTEGER PRIMARY KEY, fullname TEXT, on_duty INTEGER NOT NULL)")
+            cursor.execute("CREATE INDEX employee_on_duty ON employee (on_duty, id)")
+            cursor.execute("CREATE TABLE notification (id INTEGER PRIMARY KEY, message TEXT, created_at REAL)")
+            cursor.executemany(
+                "INSERT INTO employee (id, fullname, on_duty) VALUES (%s, %s, %s)",
+                [(i, f"Employee {i}", i % 2) for i in range(1, self.rows + 1)],
+            )
+        connection.close()
+
+    def read(self, cursor):
+        cursor.execute(
+            "SELECT id, fullname FROM employee WHERE on_duty = 1 AND id > %s ORDER BY id LIMIT 50",
+            [random.randint(0, self.rows)],
+        )
+        cursor.fetchall()
+
+    def write(self, cursor):
+        employee_id = random.randint(1, self.rows)
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("UPDATE employee SET on_duty = 1 - on_duty WHERE id = %s", [employee_id])
+            cursor.execute(
+                "INSERT INTO notification (message, created_at) VALUES (%s, %s)",
+                [f"Duty toggled for {employee_id}", time.time()],
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    def worker(self, operation, timings, deadline):
+        connection = self.connections[ALIAS]
+        try:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    with connection.cursor() as cursor:
+                        operation(cursor)
+                except OperationalError:
+                    with self.lock:
+                        self.errors += 1
+                else:
+                    elapsed = time.perf_counter() - started
+                    with self.lock:
+                        timings.append(elapsed)
+                connection.close_if_unusable_or_obsolete()
+        finally:
+            connection.close()
+
+    def run(self, seconds, readers, writers):
+        deadline = time.monotonic() + seconds
+        threads = [threading.Thread(target=self.worker, args=(self.read, self.reads, deadline)) for _ in range(readers)]
+        threads += [threading.Thread(target=self.worker, args=(self.write, self.writes, deadline)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare read/write concurrency of the SQLite database profiles (see SLB_DB_PROFILE in settings) "
+        "on a scratch database. The configured database is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--profile', action='append', dest='profiles',
+                            help="Profile to run (repeatable); defaults to every SQLite profile.")
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'] or [
+            name for name, database in settings.DATABASE_PROFILES.items() if database['ENGINE'].endswith('sqlite3')
+        ]
+        self.stdout.write(
+            f"{'profile':12} {'reads/s':>9} {'writes/s':>9} {'read p50':>9} {'read p99':>9} {'write p99':>10} {'errors':>7}"
+        )
+        for name in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                database = dict(settings.DATABASE_PROFILES[name], NAME=os.path.join(directory, 'benchmark.sqlite3'))
+                benchmark = Benchmark(database, options['rows'])
+                benchmark.setup()
+                benchmark.run(options['seconds'], options['readers'], options['writers'])
+            self.stdout.write(
+                f"{name:12} {len(benchmark.reads) / options['seconds']:9.0f} {len(benchmark.writes) / options['seconds']:9.0f} "
+                f"{_percentile(benchmark.reads, 0.5) * 1000:7.2f}ms {_percentile(benchmark.reads, 0.99) * 1000:7.2f}ms "
+                f"{_percentile(benchmark.writes, 0.99) * 1000:8.2f}ms {benchmark.errors:7d}"
+            )
@@ -0,0 +1,98 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from backed.fast import FastJSONRenderer, employee_mapper, employee_training_mapper
+from backed.models import Company, Project, Employee, MainTraining, SubTraining, EmployeeSubTraining
+from backed.serializers import EmployeeSerializer, EmployeePercentageSubTrainingSerializer
+
+
+def _employees(count):
+    company, project = Company(id=1, name="Company 1"), Project(id=1, name="Project 1")
+    instances, rows = [], []
+    for i in range(count):
+        photo = f'profile_photos/{i:064x}.jpg' if i % 2 else ''
+        employee = Employee(
+            id=i + 1, fullname=f"Employee {i}", mobile_number=f"9{i:09d}", designation='Driller',
+            gate_pass_no=f"GP{i:05d}", rig_or_rigless='Rig', company=company, project=project,
+            profile_photo=photo, is_accepted=True, on_duty=bool(i % 3),
+        )
+        instances.append(employee)
+        rows.append({
+            'id': employee.id, 'fullname': employee.fullname, 'mobile_number': employee.mobile_number,
+            'designation': employee.designation, 'gate_pass_no': employee.gate_pass_no,
+            'rig_or_rigless': employee.rig_or_rigless, 'profile_photo': photo, 'profile_photo_avatar': '',
+            'profile_photo_card': '', 'is_accepted': True, 'on_duty': employee.on_duty,
+            'company__id': 1, 'company__name': company.name, 'project__id': 1, 'project__name': project.name,
+        })
+    return instances, rows
+
+
+def _trainings(count):
+    employee = Employee(id=1, fullname="Employee 1")
+    main = MainTraining(id=1, name="Well control")
+    sub = SubTraining(id=1, name="Level 2", main_training=main, validity_period=timedelta(days=365))
+    instances, rows = [], []
+    for i in range(count):
+        start = date(2026, 1, 1) + timedelta(days=i % 300)
+        training = EmployeeSubTraining(
+            id=i + 1, employee=employee, sub_training=sub, start_date=start,
+            expiration_date=start + sub.validity_period, warning=bool(i % 2),
+        )
+        training.completion_percentage = 50.0
+        instances.append(training)
+        rows.append({
+            'id': training.id, 'employee__fullname': employee.fullname, 'sub_training__name': sub.name,
+            'sub_training__main_training__name': main.name, 'start_date': training.start_date,
+            'expiration_date': training.expiration_date, 'warning': training.warning, 'completion_percentage': 50.0,
+        })
+    return instances, rows
+
+
+def _render_serialized(serializer_class, instances, context):
+    return JSONRenderer().render(serializer_class(instances, many=True, context=context).data)
+
+
+def _render_mapped(mapper, rows, request):
+    to_dict = mapper(request)
+    return FastJSONRenderer().render([to_dict(row) for row in rows])
+
+
+def _best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serializer + JSONRenderer with the values() mappers + FastJSONRenderer (backed/fast.py) "
+        "on in-memory rows. Measures CPU only; no database is used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get('/api/employees/'))
+        context = {'request': request}
+        cases = [
+            ('employees/', _employees(options['rows']), EmployeeSerializer, employee_mapper),
+            ('employeetrainingpercentage/', _trainings(options['rows']), EmployeePercentageSubTrainingSerializer, employee_training_mapper),
+        ]
+        self.stdout.write(f"{'endpoint':30} {'serializer':>12} {'fast path':>12} {'speedup':>8}")
+        for name, (instances, rows), serializer_class, mapper in cases:
+            slow = _best_of(options['repeat'], lambda: _render_serialized(serializer_class, instances, context))
+            fast = _best_of(options['repeat'], lambda: _render_mapped(mapper, rows, request))
+            self.stdout.write(
+                f"{name:30} {options['rows'] / slow:9.0f}/s {options['rows'] / fast:9.0f}/s {slow / fast:7.1f}x"
+            )
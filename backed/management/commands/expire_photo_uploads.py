@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backed.uploads import expire_upload_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete resumable photo uploads idle longer than PHOTO_UPLOAD_SESSION_TTL, with their partial files. Run daily (e.g. from cron)."
+
+    def handle(self, *args, **options):
+        count = expire_upload_sessions()
+        self.stdout.write(self.style.SUCCESS(f"Removed {count} stale photo upload sessions."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backed.imports import import_employees, read_rows, file_format_for
+
+
+class Command(BaseCommand):
+    help = "Bulk import employees from a CSV, JSON or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'json', 'jsonl'], help="Defaults to the file extension.")
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or file_format_for(options['path'])
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = import_employees(read_rows(stream, file_format))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            messages = '; '.join(f"{field}: {' '.join(map(str, problems))}" for field, problems in error['errors'].items())
+            self.stderr.write(f"Row {error['row']}: {messages}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} employees, {report['skipped']} rows rejected."
+        ))
+        if report['file_error']:
+            raise CommandError(f"Stopped reading at row {report['file_error']['row']}: {report['file_error']['detail']}")
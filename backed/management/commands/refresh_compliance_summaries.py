@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backed.compliance import refresh_all_compliance_summaries
+
+
+class Command(BaseCommand):
+    help = "Re-age every employee compliance summary to today. Run daily (e.g. from cron)."
+
+    def handle(self, *args, **options):
+        count = refresh_all_compliance_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {count} compliance summaries."))
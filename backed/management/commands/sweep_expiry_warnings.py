@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from backed.compliance import sweep_expiry_warnings
+
+
+class Command(BaseCommand):
+    help = "Set the warning flag on trainings entering their 30-day expiry window and notify. Run daily (e.g. from cron)."
+
+    def handle(self, *args, **options):
+        sweep = sweep_expiry_warnings()
+        self.stdout.write(self.style.SUCCESS(
+            f"Flagged {sweep.flagged} trainings up to {sweep.threshold_date}, created {sweep.notified} notifications."
+        ))
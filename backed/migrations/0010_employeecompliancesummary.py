@@ -0,0 +1,25 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0009_alter_employeesubtraining_start_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeComplianceSummary',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='compliance_summary', serialize=False, to='backed.employee')),
+                ('average_completion_percentage', models.FloatField(default=0)),
+                ('total_trainings', models.PositiveIntegerField(default=0)),
+                ('valid_trainings', models.PositiveIntegerField(default=0)),
+                ('warning_trainings', models.PositiveIntegerField(default=0)),
+                ('expired_trainings', models.PositiveIntegerField(default=0)),
+                ('as_of', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
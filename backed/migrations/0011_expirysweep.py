@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0010_employeecompliancesummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpirySweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold_date', models.DateField()),
+                ('flagged', models.PositiveIntegerField(default=0)),
+                ('notified', models.PositiveIntegerField(default=0)),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='employeesubtraining',
+            name='expiration_date',
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# Frozen copies of backed.search at the time of this migration; later changes there must not alter it.
+SEARCH_TABLE = 'backed_employee_search'
+SEARCH_COLUMNS = {
+    'fullname': 'fullname',
+    'gate_pass_no': 'gate_pass_no',
+    'designation': 'designation',
+    'company_name': 'company__name',
+    'project_name': 'project__name',
+}
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Employee = apps.get_model('backed', 'Employee')
+    columns = ', '.join(SEARCH_COLUMNS)
+    placeholders = ', '.join(['%s'] * (len(SEARCH_COLUMNS) + 1))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({columns}, tokenize='unicode61', prefix='2 3')"
+        )
+        rows = Employee.objects.values_list('id', *SEARCH_COLUMNS.values())
+        cursor.executemany(f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) VALUES ({placeholders})", list(rows))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0011_expirysweep'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
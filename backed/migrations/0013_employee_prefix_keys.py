@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+def fill_prefix_keys(apps, schema_editor):
+    Employee = apps.get_model('backed', 'Employee')
+    employees = list(Employee.objects.only('id', 'fullname', 'gate_pass_no'))
+    for employee in employees:
+        employee.gate_pass_key = (employee.gate_pass_no or '').strip().casefold()
+        employee.fullname_key = (employee.fullname or '').strip().casefold()
+    Employee.objects.bulk_update(employees, ['gate_pass_key', 'fullname_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0012_employee_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='fullname_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='gate_pass_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_prefix_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0013_employee_prefix_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='profile_photo_avatar',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_photos/thumbs/'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='profile_photo_card',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profile_photos/thumbs/'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+import backed.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0014_employee_photo_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='profile_photo',
+            field=models.ImageField(blank=True, null=True, storage=backed.storage.photo_storage, upload_to='profile_photos/'),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='profile_photo_avatar',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=backed.storage.photo_storage, upload_to='profile_photos/thumbs/'),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='profile_photo_card',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=backed.storage.photo_storage, upload_to='profile_photos/thumbs/'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0016_photouploadsession'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('is_accepted', True)), fields=['id'], name='employee_accepted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('is_accepted', False)), fields=['id'], name='employee_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('on_duty', True)), fields=['id'], name='employee_on_duty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(condition=models.Q(('on_duty', False)), fields=['id'], name='employee_off_duty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeesubtraining',
+            index=models.Index(fields=['employee', 'sub_training'], name='est_employee_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at', '-id'], name='notification_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['message'], name='notification_message_idx'),
+        ),
+    ]
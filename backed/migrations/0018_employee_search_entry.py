@@ -0,0 +1,25 @@
+import backed.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0017_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSearchEntry',
+            fields=[
+                ('employee', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='backed.employee')),
+                ('document', backed.models.SearchDocumentField(db_column='backed_employee_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'backed_employee_search',
+                'managed': False,
+            },
+        ),
+    ]
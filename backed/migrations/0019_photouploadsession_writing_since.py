@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0018_employee_search_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photouploadsession',
+            name='writing_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
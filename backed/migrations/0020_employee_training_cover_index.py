@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backed', '0019_photouploadsession_writing_since'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='employeesubtraining',
+            name='est_employee_sub_idx',
+        ),
+        migrations.AddIndex(
+            model_name='employeesubtraining',
+            index=models.Index(fields=['employee', 'sub_training', 'expiration_date', 'start_date'], name='est_employee_cover_idx'),
+        ),
+    ]
@@ -1,5 +1,11 @@
 from django.db import models
+from django.db.models import Case, When, Value, F, Q, FloatField, ExpressionWrapper, Func, Lookup
+from django.db.models.functions import Greatest
 from datetime import timedelta, date
+import uuid
+
+from .search import SEARCH_TABLE
+from .storage import photo_storage
 
 # Create your models here.
 
@@ -23,14 +29,61 @@ class Employee(models.Model):
     rig_or_rigless = models.CharField(max_length=50, choices=[('Rig', 'Rig'), ('Rigless', 'Rigless')])
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
-    profile_photo = models.ImageField(upload_to='profile_photos/', null=True, blank=True)
+    profile_photo = models.ImageField(upload_to='profile_photos/', storage=photo_storage, null=True, blank=True)
+    # Pre-rendered sizes of profile_photo, written by backed/thumbnails.py after upload.
+    profile_photo_avatar = models.ImageField(upload_to='profile_photos/thumbs/', storage=photo_storage, null=True, blank=True, editable=False)
+    profile_photo_card = models.ImageField(upload_to='profile_photos/thumbs/', storage=photo_storage, null=True, blank=True, editable=False)
     is_accepted = models.BooleanField(default=False)
     on_duty = models.BooleanField(default=False)
+    # Case-folded copies for index-backed prefix lookups (autocomplete); kept in sync by a pre_save signal.
+    gate_pass_key = models.CharField(max_length=100, default='', editable=False, db_index=True)
+    fullname_key = models.CharField(max_length=200, default='', editable=False, db_index=True)
 
+    class Meta:
+        indexes = [
+            # Accepted / not-accepted and on / off duty lists, paginated by id. Partial indexes, because the
+            # ORM compiles these filters to a bare boolean test that SQLite only matches against an index WHERE.
+            models.Index(fields=['id'], condition=Q(is_accepted=True), name='employee_accepted_idx'),
+            models.Index(fields=['id'], condition=Q(is_accepted=False), name='employee_pending_idx'),
+            models.Index(fields=['id'], condition=Q(on_duty=True), name='employee_on_duty_idx'),
+            models.Index(fields=['id'], condition=Q(on_duty=False), name='employee_off_duty_idx'),
+        ]
 
     def __str__(self):
         return self.fullname
     
+
+class SearchDocumentField(models.TextField):
+    """An FTS5 table's hidden column of the same name, which full-text queries are MATCHed against."""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class EmployeeSearchEntry(models.Model):
+    """A row of the SQLite FTS5 employee index (backed/search.py), joined on rowid = employee id.
+
+    The table is created and kept current outside the ORM (migration 0012, signals), so this model is
+    read-only and only usable on SQLite.
+    """
+    employee = models.OneToOneField(
+        Employee, primary_key=True, db_column='rowid', related_name='search_entry',
+        on_delete=models.DO_NOTHING, db_constraint=False,
+    )
+    document = SearchDocumentField(db_column=SEARCH_TABLE)
+    rank = models.FloatField()  # bm25, lower is better
+
+    class Meta:
+        managed = False
+        db_table = SEARCH_TABLE
+
 VALIDITY_CHOICES = [
     (timedelta(days=182), '6 months'),
     (timedelta(days=365), '1 year'),
@@ -58,13 +111,69 @@ class SubTraining(models.Model):
     validity_period = models.DurationField(choices=VALIDITY_CHOICES, null=True, blank=True)
 
 
+class DurationMicroseconds(Func):
+    # SQLite and MySQL store durations as bigint microseconds.
+    template = 'CAST(%(expressions)s AS REAL)'
+    output_field = FloatField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='EXTRACT(EPOCH FROM %(expressions)s) * 1000000', **extra_context)
+
+
+class ElapsedMicroseconds(Func):
+    """Microseconds from a date column to a fixed day, as a float.
+
+    Elsewhere this is Django's date subtraction; on SQLite that is a Python function called for every
+    row, so SQLite gets native julianday() arithmetic instead (same values, several times faster).
+    """
+    output_field = FloatField()
+
+    def __init__(self, start, as_of):
+        as_of = Value(as_of, output_field=models.DateField())
+        duration = ExpressionWrapper(as_of - start, output_field=models.DurationField())
+        super().__init__(duration, as_of, start)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        duration = self.get_source_expressions()[0]
+        return compiler.compile(DurationMicroseconds(duration))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        _, as_of, start = self.get_source_expressions()
+        as_of_sql, as_of_params = compiler.compile(as_of)
+        start_sql, start_params = compiler.compile(start)
+        return f'((julianday({as_of_sql}) - julianday({start_sql})) * 86400000000.0)', (*as_of_params, *start_params)
+
+
+class RoundTwo(Func):
+    function = 'ROUND'
+    template = '%(function)s(%(expressions)s, 2)'
+    output_field = FloatField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='%(function)s(CAST(%(expressions)s AS numeric), 2)', **extra_context)
+
+
+class EmployeeSubTrainingQuerySet(models.QuerySet):
+    def with_completion(self, as_of=None):
+        """Annotate ``completion_percentage`` the same way ``calculate_completion()`` does, in SQL."""
+        as_of = as_of or date.today()
+        remaining = Value(100.0) - ElapsedMicroseconds(F('start_date'), as_of) / DurationMicroseconds(F('sub_training__validity_period')) * Value(100.0)
+        return self.annotate(completion_percentage=Case(
+            When(Q(sub_training__validity_period__isnull=True) | Q(expiration_date__isnull=True), then=Value(100.0)),
+            default=RoundTwo(Greatest(Value(0.0), remaining)),
+            output_field=FloatField(),
+        ))
+
+
 class EmployeeSubTraining(models.Model):
     employee = models.ForeignKey(Employee, related_name='sub_trainings', on_delete=models.CASCADE)
     sub_training = models.ForeignKey(SubTraining, related_name='employee_sub_trainings', on_delete=models.CASCADE)
     start_date = models.DateField(null=True, blank=True)
-    expiration_date = models.DateField(null=True, blank=True)
+    expiration_date = models.DateField(null=True, blank=True, db_index=True)
     warning = models.BooleanField(default=False)
 
+    objects = EmployeeSubTrainingQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         if not self.start_date:
             self.start_date = date.today()
@@ -82,6 +191,13 @@ class EmployeeSubTraining(models.Model):
         completion_percentage = max(0, 100 - (elapsed_duration / total_duration) * 100)
         return round(completion_percentage, 2)
 
+    class Meta:
+        indexes = [
+            # Per-employee training lists and the (employee, sub training) lookups of assign/delete. The dates
+            # make it covering for compliance_rollup(), which then never reads the table itself.
+            models.Index(fields=['employee', 'sub_training', 'expiration_date', 'start_date'], name='est_employee_cover_idx'),
+        ]
+
     def __str__(self):
         return f"{self.employee.fullname} - {self.sub_training.name}"
     
@@ -90,5 +206,51 @@ class Notification(models.Model):
     message = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Newest-first feed, matching NotificationCursorPagination's ordering.
+            models.Index(fields=['-created_at', '-id'], name='notification_feed_idx'),
+            # The expiry sweep checks for existing messages before notifying again.
+            models.Index(fields=['message'], name='notification_message_idx'),
+        ]
+
+    def __str__(self):
+        return self.message
+
+class ExpirySweep(models.Model):
+    threshold_date = models.DateField()  # rows expiring on or before this date have been flagged
+    flagged = models.PositiveIntegerField(default=0)
+    notified = models.PositiveIntegerField(default=0)
+    ran_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Sweep up to {self.threshold_date}"
+
+
+class EmployeeComplianceSummary(models.Model):
+    employee = models.OneToOneField(Employee, related_name='compliance_summary', on_delete=models.CASCADE, primary_key=True)
+    average_completion_percentage = models.FloatField(default=0)
+    total_trainings = models.PositiveIntegerField(default=0)
+    valid_trainings = models.PositiveIntegerField(default=0)
+    warning_trainings = models.PositiveIntegerField(default=0)
+    expired_trainings = models.PositiveIntegerField(default=0)
+    as_of = models.DateField()  # day the figures were last aged to
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.average_completion_percentage}%"
+
+
+class PhotoUploadSession(models.Model):
+    """A resumable profile photo upload; chunks are appended to a temp file until ``offset`` reaches ``size``."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    employee = models.ForeignKey(Employee, related_name='photo_uploads', on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    writing_since = models.DateTimeField(null=True, blank=True, editable=False)  # claimed by a request appending a chunk
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
-        return self.message
\ No newline at end of file
+        return f"{self.employee_id} - {self.filename} ({self.offset}/{self.size})"
@@ -0,0 +1,127 @@
+# outbox.py
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, f'NOTIFICATION_OUTBOX_{name}', default)
+
+
+class NotificationOutbox:
+    """Bounded in-process queue of notification messages written in batches by a worker thread.
+
+    With ``NOTIFICATION_OUTBOX_ASYNC = False`` (e.g. in tests) messages are written straight away.
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._worker = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._unwritten = []
+
+    @property
+    def is_async(self):
+        return _setting('ASYNC', True)
+
+    def enqueue(self, message):
+        self.enqueue_many([message])
+
+    def enqueue_many(self, messages):
+        """Queue messages once the current transaction commits, so rolled-back work sends nothing."""
+        messages = list(messages)
+        if not messages:
+            return
+        if not self.is_async:
+            self._write(messages)
+            return
+        transaction.on_commit(lambda: self._put(messages))
+
+    def _put(self, messages):
+        self._start()
+        for index, message in enumerate(messages):
+            try:
+                self._queue.put_nowait(message)
+            except queue.Full:
+                # Back-pressure: the caller pays for the write instead of growing the queue or dropping events.
+                self._write(self._drain() + messages[index:])
+                return
+
+    def _start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            if self._queue is None:
+                self._queue = queue.Queue(maxsize=_setting('MAX_SIZE', 10000))
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name='notification-outbox', daemon=True)
+            self._worker.start()
+
+    def _drain(self, limit=None):
+        messages = []
+        while self._queue is not None and (limit is None or len(messages) < limit):
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def _write(self, messages):
+        from .models import Notification
+
+        batch_size = _setting('BATCH_SIZE', 500)
+        Notification.objects.bulk_create([Notification(message=message) for message in messages], batch_size=batch_size)
+
+    def _run(self):
+        batch_size = _setting('BATCH_SIZE', 500)
+        interval = _setting('FLUSH_INTERVAL', 1.0)
+        try:
+            while not self._stopping.is_set():
+                if self._unwritten:
+                    batch = self._unwritten
+                else:
+                    try:
+                        first = self._queue.get(timeout=interval)
+                    except queue.Empty:
+                        continue
+                    batch = [first] + self._drain(batch_size - 1)
+                # The thread outlives requests, so nothing else retires a broken or stale connection.
+                close_old_connections()
+                try:
+                    self._write(batch)
+                except Exception:
+                    # Keep the batch and retry it before anything newer; stop() writes it if we never get there.
+                    logger.exception("Could not write %d queued notifications; retrying", len(batch))
+                    self._unwritten = batch
+                    self._stopping.wait(interval)
+                else:
+                    self._unwritten = []
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Write everything queued so far, including a batch the worker failed to write, from the calling thread."""
+        messages = self._unwritten + self._drain()
+        self._unwritten = []
+        if messages:
+            self._write(messages)
+        return len(messages)
+
+    def stop(self):
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout=_setting('FLUSH_INTERVAL', 1.0) * 2)
+        self.flush()
+
+
+outbox = NotificationOutbox()
+atexit.register(outbox.stop)
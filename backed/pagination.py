@@ -0,0 +1,49 @@
+# pagination.py
+from collections import OrderedDict
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param
+
+
+class OptionalCursorPagination(CursorPagination):
+    """Cursor pagination that is only applied when the client sends ``page_size``.
+
+    Without it the view keeps returning the full list, so existing clients are unaffected.
+    Add ``count=true`` to also get the total number of rows (an extra COUNT query).
+
+    DRF's cursor holds the value of the first ``ordering`` field plus an offset past the rows that share
+    it; later fields only order those ties. It is not a keyset over every ordering field.
+    """
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = 'id'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        page = super().paginate_queryset(queryset, request, view)
+        if page is not None:
+            if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+                self.count = queryset.count()
+            # Follow-up pages skip the COUNT unless the client asks again.
+            self.base_url = remove_query_param(self.base_url, self.count_query_param)
+        return page
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+
+class NotificationCursorPagination(OptionalCursorPagination):
+    """Newest first. Pages are positioned by created_at, and notifications created in the same instant
+    are stepped over by offset in -id order, so a burst of them splits across pages without repeats.
+    """
+    ordering = ('-created_at', '-id')
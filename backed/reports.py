@@ -0,0 +1,72 @@
+# reports.py
+import csv
+import tempfile
+
+from .models import EmployeeSubTraining
+
+REPORT_CHUNK_SIZE = 2000
+
+REPORT_COLUMNS = [
+    ('Employee ID', 'employee_id'),
+    ('Full name', 'employee__fullname'),
+    ('Gate pass no', 'employee__gate_pass_no'),
+    ('Designation', 'employee__designation'),
+    ('Company', 'employee__company__name'),
+    ('Project', 'employee__project__name'),
+    ('Main training', 'sub_training__main_training__name'),
+    ('Sub training', 'sub_training__name'),
+    ('Start date', 'start_date'),
+    ('Expiration date', 'expiration_date'),
+    ('Warning', 'warning'),
+    ('Completion %', 'completion_percentage'),
+]
+DATE_COLUMNS = [index for index, (_, field) in enumerate(REPORT_COLUMNS) if field in ('start_date', 'expiration_date')]
+
+
+def _format_date(value):
+    return value.strftime('%d-%m-%Y') if value else ''
+
+
+def report_rows(queryset=None):
+    """Yield one list per employee × sub-training from a single joined, chunked query."""
+    if queryset is None:
+        queryset = EmployeeSubTraining.objects.all()
+    rows = queryset.with_completion().order_by('employee_id', 'id').values_list(*[field for _, field in REPORT_COLUMNS])
+    for row in rows.iterator(chunk_size=REPORT_CHUNK_SIZE):
+        row = list(row)
+        for index in DATE_COLUMNS:
+            row[index] = _format_date(row[index])
+        yield row
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller, so csv.writer can stream."""
+
+    def write(self, value):
+        return value
+
+
+def csv_report(queryset=None):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([title for title, _ in REPORT_COLUMNS])
+    for row in report_rows(queryset):
+        yield writer.writerow(row)
+
+
+def xlsx_report(queryset=None):
+    """Write the report to a temporary XLSX file and return it rewound.
+
+    openpyxl's write-only mode flushes rows to disk as they are appended, so memory stays flat.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Compliance')
+    sheet.append([title for title, _ in REPORT_COLUMNS])
+    for row in report_rows(queryset):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
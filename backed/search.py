@@ -0,0 +1,130 @@
+# search.py
+import re
+
+from django.db import connection
+from django.db.models import F, Q
+
+SEARCH_TABLE = 'backed_employee_search'
+
+# Search column -> ORM path used to fill the index (and by the fallback filter on other databases).
+SEARCH_FIELDS = {
+    'fullname': 'fullname',
+    'gate_pass_no': 'gate_pass_no',
+    'designation': 'designation',
+    'company_name': 'company__name',
+    'project_name': 'project__name',
+}
+
+CHUNK_SIZE = 500
+
+
+# Upper bound for "starts with" range scans on the case-folded autocomplete keys.
+PREFIX_END = '\U0010ffff'
+
+
+def prefix_key(value):
+    return (value or '').strip().casefold()
+
+
+def set_prefix_keys(employee):
+    employee.gate_pass_key = prefix_key(employee.gate_pass_no)
+    employee.fullname_key = prefix_key(employee.fullname)
+
+
+def autocomplete_employees(queryset, text, limit):
+    """Top ``limit`` employees whose gate pass number, then full name, starts with ``text``."""
+    prefix = prefix_key(text)
+    if not prefix:
+        return []
+    fields = ('id', 'fullname', 'gate_pass_no')
+    matches = {}
+    for key in ('gate_pass_key', 'fullname_key'):
+        rows = queryset.filter(**{f'{key}__gte': prefix, f'{key}__lt': prefix + PREFIX_END}).order_by(key).values(*fields)
+        for row in rows[:limit]:
+            matches.setdefault(row['id'], row)
+        if len(matches) >= limit:
+            break
+    return list(matches.values())[:limit]
+
+
+def search_index_available():
+    return connection.vendor == 'sqlite'
+
+
+def index_employees(employee_ids):
+    """(Re)write the index rows of the given employees."""
+    from .models import Employee
+
+    if not search_index_available():
+        return
+    employee_ids = list(employee_ids)
+    columns = ', '.join(SEARCH_FIELDS)
+    placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS) + 1))
+    with connection.cursor() as cursor:
+        for start in range(0, len(employee_ids), CHUNK_SIZE):
+            chunk = employee_ids[start:start + CHUNK_SIZE]
+            rows = Employee.objects.filter(id__in=chunk).values_list('id', *SEARCH_FIELDS.values())
+            cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(employee_id,) for employee_id in chunk])
+            cursor.executemany(f"INSERT INTO {SEARCH_TABLE}(rowid, {columns}) VALUES ({placeholders})", list(rows))
+
+
+def remove_employees(employee_ids):
+    if not search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(employee_id,) for employee_id in employee_ids])
+
+
+def rebuild_search_index():
+    from .models import Employee
+
+    if not search_index_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    employee_ids = list(Employee.objects.order_by('id').values_list('id', flat=True))
+    index_employees(employee_ids)
+    return len(employee_ids)
+
+
+def match_expression(terms):
+    """Build an FTS5 query where every word of every term must prefix-match its column.
+
+    ``terms`` maps a search column to the user's text; the ``None`` key searches all columns.
+    """
+    clauses = []
+    for column, text in terms.items():
+        words = re.findall(r'\w+', text or '')
+        if not words:
+            continue
+        expression = ' AND '.join(f'"{word}"*' for word in words)
+        clauses.append(f'({expression})' if column is None else f'{column} : ({expression})')
+    return ' AND '.join(clauses)
+
+
+def search_employees(queryset, terms):
+    """Filter ``queryset`` to employees matching ``terms``, best matches first.
+
+    On SQLite every word must prefix-match a whole word of the column: ``gate_pass_no=GP0001`` finds
+    GP00012, but ``0001`` does not (the icontains fallback on other databases matches anywhere).
+    """
+    terms = {column: text for column, text in terms.items() if text}
+    if not terms:
+        return queryset
+
+    if not search_index_available():
+        for column, text in terms.items():
+            fields = SEARCH_FIELDS.values() if column is None else [SEARCH_FIELDS[column]]
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': text})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    expression = match_expression(terms)
+    if not expression:
+        return queryset.none()
+    # A join, so SQLite runs the full-text query once and drives the employee lookups from its results.
+    return queryset.filter(search_entry__document__match=expression).annotate(
+        search_rank=F('search_entry__rank')
+    ).order_by('search_rank', 'id')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Company, Employee,MainTraining, SubTraining,EmployeeSubTraining,Project,Notification
+from .models import Company, Employee,MainTraining, SubTraining,EmployeeSubTraining,Project,Notification,PhotoUploadSession
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from datetime import timedelta, date
@@ -21,20 +22,83 @@ class EmployeeSerializer(serializers.ModelSerializer):
     project_id = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all(), source='project', write_only=True)
     company = CompanySerializer(read_only=True)
     project = ProjectsSerializer(read_only=True)
+    profile_photo_urls = serializers.SerializerMethodField()
 
     class Meta:
         model = Employee
         fields = [
             'id', 'fullname', 'mobile_number', 'designation', 'gate_pass_no',
-            'rig_or_rigless', 'company_id', 'project_id', 'profile_photo', 'is_accepted','company','project','on_duty'
+            'rig_or_rigless', 'company_id', 'project_id', 'profile_photo', 'profile_photo_urls', 'is_accepted','company','project','on_duty'
         ]
 
+    def get_profile_photo_urls(self, obj):
+        if not obj.profile_photo:
+            return None
+        request = self.context.get('request')
+        build = request.build_absolute_uri if request is not None else (lambda url: url)
+        original = build(obj.profile_photo.url)
+        # Sizes that are still being rendered fall back to the original.
+        return {
+            'avatar': build(obj.profile_photo_avatar.url) if obj.profile_photo_avatar else original,
+            'card': build(obj.profile_photo_card.url) if obj.profile_photo_card else original,
+            'original': original,
+        }
+
+class EmployeeProfileSerializer(serializers.ModelSerializer):
+    # Flat and small: this is what login returns and what the profile cache stores.
+    company_name = serializers.CharField(source='company.name', read_only=True)
+    project_name = serializers.CharField(source='project.name', read_only=True)
+    avatar = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Employee
+        fields = [
+            'id', 'fullname', 'mobile_number', 'designation', 'gate_pass_no', 'rig_or_rigless',
+            'company_id', 'company_name', 'project_id', 'project_name', 'avatar', 'is_accepted', 'on_duty'
+        ]
+
+    def get_avatar(self, obj):
+        photo = obj.profile_photo_avatar or obj.profile_photo
+        return photo.url if photo else None
+
+class EmployeeImportSerializer(serializers.ModelSerializer):
+    # Uniqueness and foreign keys are checked per chunk with set queries in imports.py.
+    company_id = serializers.IntegerField()
+    project_id = serializers.IntegerField()
+
+    class Meta:
+        model = Employee
+        fields = [
+            'fullname', 'mobile_number', 'designation', 'gate_pass_no',
+            'rig_or_rigless', 'company_id', 'project_id', 'is_accepted', 'on_duty'
+        ]
+        extra_kwargs = {
+            'mobile_number': {'validators': []},
+            'gate_pass_no': {'validators': []},
+        }
+
 class EmployeePhotoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['profile_photo']
+
+class PhotoUploadStartSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        max_size = getattr(settings, 'PHOTO_UPLOAD_MAX_SIZE', 20 * 1024 * 1024)
+        if value > max_size:
+            raise serializers.ValidationError(f"Photos may be at most {max_size} bytes.")
+        return value
+
+class PhotoUploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PhotoUploadSession
+        fields = ['id', 'employee', 'filename', 'size', 'offset', 'created_at', 'updated_at']
     
 
+
 class SubTrainingSerializer(serializers.ModelSerializer):
     main_training = serializers.PrimaryKeyRelatedField(queryset=MainTraining.objects.all())
 
@@ -149,19 +213,79 @@ class EmployeeSubTrainingSerializer(serializers.ModelSerializer):
 
         validated_data['expiration_date'] = expiration_date
 
-        # Create the EmployeeSubTraining instance
-        employee_sub_training = EmployeeSubTraining.objects.create(**validated_data)
-
-        # Check and set the warning flag
+        # Set the warning flag up front so the row is written once
         if expiration_date and (expiration_date - timedelta(days=30)) <= date.today():
-            employee_sub_training.warning = True
-            employee_sub_training.save()
+            validated_data['warning'] = True
+
+        return EmployeeSubTraining.objects.create(**validated_data)
+    
+class BulkSubTrainingAssignSerializer(serializers.Serializer):
+    sub_training = serializers.PrimaryKeyRelatedField(queryset=SubTraining.objects.all())
+    employees = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    company = serializers.IntegerField(required=False)
+    project = serializers.IntegerField(required=False)
+    start_date = CustomDateField(required=False)
 
-        return employee_sub_training
+    def validate(self, attrs):
+        if not any(key in attrs for key in ('employees', 'company', 'project')):
+            raise serializers.ValidationError("Provide 'employees' or a 'company'/'project' filter.")
+        if not attrs.get('start_date'):
+            attrs['start_date'] = date.today()
+        return attrs
+
+    def get_employees(self):
+        employees = Employee.objects.all()
+        if 'employees' in self.validated_data:
+            employees = employees.filter(id__in=self.validated_data['employees'])
+        if 'company' in self.validated_data:
+            employees = employees.filter(company_id=self.validated_data['company'])
+        if 'project' in self.validated_data:
+            employees = employees.filter(project_id=self.validated_data['project'])
+        return employees
     
 class AverageCompletionPercentageSerializer(serializers.Serializer):
     employee_id = serializers.IntegerField()
     average_completion_percentage = serializers.FloatField()
+    total_trainings = serializers.IntegerField(required=False)
+    valid_trainings = serializers.IntegerField(required=False)
+    warning_trainings = serializers.IntegerField(required=False)
+    expired_trainings = serializers.IntegerField(required=False)
+
+class ComplianceFilterSerializer(serializers.Serializer):
+    company = serializers.IntegerField(required=False)
+    project = serializers.IntegerField(required=False)
+    main_training = serializers.IntegerField(required=False)
+
+class ComplianceAnalyticsFilterSerializer(ComplianceFilterSerializer):
+    as_of = serializers.ListField(child=serializers.DateField(), required=False, max_length=36)
+
+class ExpiryTimelineFilterSerializer(ComplianceFilterSerializer):
+    interval = serializers.ChoiceField(choices=['week', 'month'], default='week')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=1000, default=50)
+
+    # Roughly "the next six months"; the longest range allowed is about two years of weekly buckets.
+    default_span = timedelta(days=183)
+    max_span = timedelta(days=731)
+
+    def validate(self, data):
+        data['start'] = data.get('start') or date.today()
+        data['end'] = data.get('end') or data['start'] + self.default_span
+        if data['end'] < data['start']:
+            raise serializers.ValidationError({'end': "Must not be before start."})
+        if data['end'] - data['start'] > self.max_span:
+            raise serializers.ValidationError({'end': f"The range may span at most {self.max_span.days} days."})
+        return data
+
+class ComplianceGroupSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    average_completion_percentage = serializers.FloatField(allow_null=True)
+    employees = serializers.IntegerField()
+    total_trainings = serializers.IntegerField()
+    expiring_trainings = serializers.IntegerField()
+    expired_trainings = serializers.IntegerField()
 
 class AdminLoginSerializer(serializers.Serializer):
     email = serializers.EmailField(label=("Email"), write_only=True)
@@ -215,7 +339,8 @@ class EmployeePercentageSubTrainingSerializer(serializers.ModelSerializer):
         fields = ['employee_name', 'sub_training_name', 'main_training_name', 'start_date', 'expiration_date', 'warning', 'completion_percentage']
 
     def get_completion_percentage(self, obj):
-        return obj.calculate_completion()
+        completion = getattr(obj, 'completion_percentage', None)
+        return completion if completion is not None else obj.calculate_completion()
 
 class EmployeeMainTrainingSerializer(serializers.ModelSerializer):
     sub_training_name = serializers.CharField(source='sub_training.name', read_only=True)
@@ -228,7 +353,8 @@ class EmployeeMainTrainingSerializer(serializers.ModelSerializer):
         fields = ['employee_name', 'main_training_name', 'sub_training_name', 'start_date', 'expiration_date', 'warning', 'completion_percentage']
 
     def get_completion_percentage(self, obj):
-        return obj.calculate_completion()
+        completion = getattr(obj, 'completion_percentage', None)
+        return completion if completion is not None else obj.calculate_completion()
     
 class MainTrainingsSerializer(serializers.ModelSerializer):
     sub_trainings = SubTrainingSerializer(many=True, read_only=True)
@@ -276,8 +402,7 @@ class MainTrainingWithSubSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'sub_trainings']
 
     def get_sub_trainings(self, obj):
-        sub_trainings = SubTraining.objects.all()
-        return SubTrainingSerializer(sub_trainings, many=True).data
+        return SubTrainingSerializer(obj.subtraining_set.all(), many=True).data
 
 class EmployeeSearchSerializer(serializers.ModelSerializer):
     company_name = serializers.CharField(source='company.name', read_only=True)
@@ -287,12 +412,20 @@ class EmployeeSearchSerializer(serializers.ModelSerializer):
         model = Employee
         fields = ['id', 'fullname', 'gate_pass_no', 'designation', 'company_name', 'project_name']
 
+class EmployeeAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Employee
+        fields = ['id', 'fullname', 'gate_pass_no']
+
 
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'message', 'created_at']
 
+class NotificationFeedSerializer(serializers.Serializer):
+    since_id = serializers.IntegerField(min_value=0)
+
 class AveragePercentageSerializer(serializers.Serializer):
     main_training_name = serializers.CharField()
     average_percentage = serializers.FloatField()
\ No newline at end of file
@@ -1,8 +1,92 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Employee, Notification
+from .models import Company, Project, Employee, MainTraining, SubTraining, EmployeeSubTraining
+from .compliance import refresh_compliance_summaries
+from .cache import bump_reference_version, invalidate_employee_profiles
+from .outbox import outbox
+from .thumbnails import THUMBNAIL_SIZES, thumbnails_stale, schedule_thumbnails
+from .search import index_employees, remove_employees, set_prefix_keys
+from .db import apply_sqlite_pragmas
 
 @receiver(post_save, sender=Employee)
 def create_notification(sender, instance, created, **kwargs):
     if created:
-        Notification.objects.create(message=f"New employee registered: {instance.fullname}")
\ No newline at end of file
+        outbox.enqueue(f"New employee registered: {instance.fullname}")
+
+@receiver(post_save, sender=EmployeeSubTraining)
+@receiver(post_delete, sender=EmployeeSubTraining)
+def refresh_employee_compliance(sender, instance, **kwargs):
+    employee_id = instance.employee_id
+    transaction.on_commit(lambda: refresh_compliance_summaries([employee_id]))
+
+@receiver(post_save, sender=SubTraining)
+def refresh_sub_training_compliance(sender, instance, created, **kwargs):
+    if created:
+        return
+    employee_ids = list(
+        EmployeeSubTraining.objects.filter(sub_training=instance).values_list('employee_id', flat=True).distinct()
+    )
+    if employee_ids:
+        transaction.on_commit(lambda: refresh_compliance_summaries(employee_ids))
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=MainTraining)
+@receiver(post_delete, sender=MainTraining)
+@receiver(post_save, sender=SubTraining)
+@receiver(post_delete, sender=SubTraining)
+def invalidate_reference_data(sender, **kwargs):
+    # Bump after commit, or a request in between could cache the old rows under the new version.
+    transaction.on_commit(lambda: bump_reference_version(sender))
+
+
+@receiver(pre_save, sender=Employee)
+def update_prefix_keys(sender, instance, **kwargs):
+    set_prefix_keys(instance)
+
+@receiver(pre_save, sender=Employee)
+def clear_stale_thumbnails(sender, instance, **kwargs):
+    # A new photo invalidates the old sizes; clients fall back to the original until new ones are rendered.
+    instance._thumbnails_pending = thumbnails_stale(instance)
+    if instance._thumbnails_pending or not instance.profile_photo:
+        for field in THUMBNAIL_SIZES:
+            setattr(instance, field, None)
+
+@receiver(post_save, sender=Employee)
+def render_photo_thumbnails(sender, instance, **kwargs):
+    if getattr(instance, '_thumbnails_pending', False):
+        schedule_thumbnails(instance)
+
+@receiver(post_save, sender=Employee)
+def index_employee(sender, instance, **kwargs):
+    index_employees([instance.id])
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_profile(sender, instance, **kwargs):
+    employee_id = instance.id
+    transaction.on_commit(lambda: invalidate_employee_profiles([employee_id]))
+
+@receiver(post_delete, sender=Employee)
+def unindex_employee(sender, instance, **kwargs):
+    remove_employees([instance.id])
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Project)
+def reindex_company_or_project(sender, instance, created, **kwargs):
+    if created:
+        return
+    field = 'company' if sender is Company else 'project'
+    employee_ids = list(Employee.objects.filter(**{field: instance}).values_list('id', flat=True))
+    index_employees(employee_ids)
+    transaction.on_commit(lambda: invalidate_employee_profiles(employee_ids))
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    apply_sqlite_pragmas(connection)
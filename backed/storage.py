@@ -0,0 +1,36 @@
+# storage.py
+import hashlib
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Saves each file as ``<upload dir>/<sha256 of content><ext>``, so identical uploads share one file.
+
+    The name changes whenever the content does, which makes every stored file safe to cache forever.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        extension = posixpath.splitext(name)[1].lower()
+        name = posixpath.join(posixpath.dirname(name), digest.hexdigest() + extension)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+def photo_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,31 @@
+"""Test runner that keeps the suite off state shared with a running server, and off background threads."""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def test_caches():
+    """Every configured cache alias as its own LocMemCache, with the alias's timeout and options."""
+    return {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+            **{key: config[key] for key in ('TIMEOUT', 'OPTIONS') if key in config},
+        }
+        for alias, config in settings.CACHES.items()
+    }
+
+
+class TestRunner(DiscoverRunner):
+    """Runs tests against process-local caches instead of the file caches under BASE_DIR/cache, and writes
+    notifications synchronously; tests of the outbox worker turn it back on for themselves.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.test_settings = override_settings(CACHES=test_caches(), NOTIFICATION_OUTBOX_ASYNC=False)
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        super().teardown_test_environment(**kwargs)
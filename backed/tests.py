@@ -1,3 +1,1994 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.utils import ConnectionHandler
+from unittest import mock, skipUnless
+
+from django.http import Http404
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from . import urls, views
+from .authentication import issue_employee_token
+from .cache import employee_profile_key, get_employee_profile
+from .analytics import TrainingArrays, TrainingRows
+from .compliance import compliance_rollup, expiry_counts, get_compliance_summary, refresh_all_compliance_summaries, sweep_expiry_warnings, WARNING_WINDOW
+from .fast import FastJSONRenderer
+from .imports import import_employees, iter_json_array, read_rows
+from .outbox import NotificationOutbox
+from .fields import CustomDateField
+from .search import SEARCH_TABLE, autocomplete_employees, search_employees, search_index_available
+from .thumbnails import THUMBNAIL_SIZES, _render_in_worker, render_thumbnails, thumbnails_stale
+from .models import Company, Project, Employee, MainTraining, SubTraining, EmployeeSubTraining, EmployeeComplianceSummary, ExpirySweep, Notification, PhotoUploadSession
+from .serializers import EmployeeSerializer, EmployeePercentageSubTrainingSerializer
+from .uploads import UploadOffsetMismatch, append_chunk, session_path, start_upload
+
+try:
+    import numpy  # noqa: F401
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Maximum number of queries the request from route_request() may run on each named route against the
+# seeded dataset, including work deferred to transaction.on_commit. The dataset is large enough that any
+# per-row query blows through these numbers.
+# Set QUERY_BUDGET_REPORT=1 to print the query count and wall time of every route.
+QUERY_BUDGETS = {
+    'company-list-create': 1,
+    'company-detail': 1,
+    'company-list': 1,
+    'employee-list-create': 1,
+    'employee-detail': 1,
+    'employee-list': 1,
+    'employee-bulk-import': 11,  # per chunk of up to 500 rows: checks, insert, index, notifications
+    'employee-login': 1,
+    'employee-me': 1,
+    'employee-update-photo': 6,  # save, thumbnails (THUMBNAIL_WORKERS=0), search index
+    'employee-photo-upload': 2,
+    'photo-upload-detail': 3,  # session, claim, record the offset and release
+    'photo-upload-commit': 7,
+    'accept-reject-employee': 5,
+    'accepted-employee-list': 1,
+    'not-accepted-employee-list': 1,
+    'toggle-duty': 5,
+    'on-duty-employees': 1,
+    'of-duty-employees': 1,
+    'employee-search': 1,
+    'employee-autocomplete': 2,
+    'employee-sub-trainings': 1,
+    'employee-main-training-detail': 1,
+    'average-completion-percentage': 1,
+    'employee-main-training-average': 1,
+    'compliance-rollup': 2,
+    'compliance-report': 1,
+    'compliance-analytics': 1,
+    'expiry-timeline': 1,
+    'main-training-list-create': 1,
+    'main-training-detail': 1,
+    'main-training-list': 2,
+    'sub-training-list-create': 1,
+    'sub-training-detail': 1,
+    'sub-training-list': 1,
+    'employee-sub-training-list-create': 1,
+    'employee-sub-training-bulk-assign': 10,  # including the summary refresh on commit
+    'employee-sub-training-detail': 1,
+    'employee-subtraining-delete': 6,
+    'admin-login': 10,
+    'project-list-create': 1,
+    'project-detail': 1,
+    'project-list': 1,
+    'project-update': 6,  # reindexes the project's employees in batches
+    'project-delete': 10,
+    'notification-list': 1,
+    'notification-stream': 1,
+    'notification-detail': 1,
+    'async-employee-list': 1,
+    'async-accepted-employee-list': 1,
+    'async-not-accepted-employee-list': 1,
+    'async-on-duty-employees': 1,
+    'async-of-duty-employees': 1,
+    'async-employee-sub-trainings': 1,
+    'async-average-completion-percentage': 1,
+    'async-employee-main-training-average': 1,
+    'async-notification-list': 1,
+}
+
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def seed_dataset(employees=40, main_trainings=4, sub_trainings_per_main=3):
+    companies = [Company.objects.create(name=f"Company {i}") for i in range(3)]
+    projects = [Project.objects.create(name=f"Project {i}") for i in range(3)]
+    mains = [MainTraining.objects.create(name=f"Main {i}") for i in range(main_trainings)]
+    validity_periods = [timedelta(days=182), timedelta(days=365), None]
+    subs = [
+        SubTraining.objects.create(
+            main_training=main, name=f"{main.name} / Sub {j}", validity_period=validity_periods[j % len(validity_periods)]
+        )
+        for main in mains for j in range(sub_trainings_per_main)
+    ]
+    staff = []
+    for i in range(employees):
+        staff.append(Employee.objects.create(
+            fullname=f"Employee {i}", mobile_number=f"900000{i:04d}", designation='Driller',
+            gate_pass_no=f"GP{i:05d}", rig_or_rigless='Rig' if i % 2 else 'Rigless',
+            company=companies[i % len(companies)], project=projects[i % len(projects)],
+            is_accepted=bool(i % 3), on_duty=bool(i % 2),
+        ))
+    for i, employee in enumerate(staff):
+        for k, sub in enumerate(subs[i % 3::3]):
+            EmployeeSubTraining.objects.create(
+                employee=employee, sub_training=sub, start_date=date.today() - timedelta(days=30 * (i + k))
+            )
+    return {
+        'company': companies[0], 'project': projects[0], 'employee': staff[1],
+        'main_training': mains[0], 'sub_training': subs[1],
+        'employee_sub_training': EmployeeSubTraining.objects.filter(employee=staff[1]).first(),
+        'notification': Notification.objects.first(),
+    }
+
+
+
+def hire(company, project, fullname, gate_pass_no, designation='Driller', **fields):
+    """An accepted, on-duty employee with a predictable name and gate pass."""
+    fields = {'is_accepted': True, 'on_duty': True, 'rig_or_rigless': 'Rig', **fields}
+    return Employee.objects.create(
+        fullname=fullname, mobile_number=f"8{gate_pass_no[2:]}", designation=designation, gate_pass_no=gate_pass_no,
+        company=company, project=project, **fields,
+    )
+
+def route_kwargs(objects, name):
+    employee = objects['employee']
+    main_training = objects['employee_sub_training'].sub_training.main_training
+    by_name = {
+        'company-detail': {'pk': objects['company'].pk},
+        'employee-detail': {'pk': employee.pk},
+        'employee-update-photo': {'pk': employee.pk},
+        'employee-photo-upload': {'pk': employee.pk},
+        'photo-upload-detail': {'upload_id': objects.get('upload_id', uuid.UUID(int=0))},
+        'photo-upload-commit': {'upload_id': objects.get('complete_upload_id', uuid.UUID(int=0))},
+        'accept-reject-employee': {'pk': employee.pk},
+        'toggle-duty': {'pk': employee.pk},
+        'employee-sub-trainings': {'employee_id': employee.pk},
+        'employee-main-training-detail': {'employee_id': employee.pk, 'main_training_id': main_training.pk},
+        'average-completion-percentage': {'employee_id': employee.pk},
+        'employee-main-training-average': {'employee_id': employee.pk, 'main_training_id': main_training.pk},
+        'async-employee-sub-trainings': {'employee_id': employee.pk},
+        'async-average-completion-percentage': {'employee_id': employee.pk},
+        'async-employee-main-training-average': {'employee_id': employee.pk, 'main_training_id': main_training.pk},
+        'main-training-detail': {'pk': objects['main_training'].pk},
+        'sub-training-detail': {'pk': objects['sub_training'].pk},
+        'employee-sub-training-detail': {'pk': objects['employee_sub_training'].pk},
+        'employee-subtraining-delete': {
+            'employee_id': employee.pk, 'subtraining_id': objects.get('spare_sub_training', objects['sub_training']).pk,
+        },
+        'project-detail': {'pk': objects['project'].pk},
+        'project-update': {'pk': objects['project'].pk},
+        'project-delete': {'pk': objects.get('spare_project', objects['project']).pk},
+        'notification-detail': {'pk': objects['notification'].pk},
+    }
+    return by_name.get(name, {})
+
+
+def photo_bytes(size=(640, 480), color='navy'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class TempMediaMixin:
+    """Give each test its own MEDIA_ROOT and PHOTO_UPLOAD_TEMP_DIR under a temporary directory."""
+
+    def setUp(self):
+        super().setUp()
+        self.temp_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_root)
+        self.media_root = os.path.join(self.temp_root, 'media')
+        paths = override_settings(MEDIA_ROOT=self.media_root, PHOTO_UPLOAD_TEMP_DIR=os.path.join(self.temp_root, 'sessions'))
+        paths.enable()
+        self.addCleanup(paths.disable)
+
+
+def staff_csv(company, project, count, first=0):
+    """An import file of ``count`` new employees."""
+    lines = ['fullname,mobile_number,designation,gate_pass_no,rig_or_rigless,company_id,project_id']
+    lines += [
+        f"Imported {i},7000{i:06d},Roughneck,IM{i:05d},Rig,{company.pk},{project.pk}" for i in range(first, first + count)
+    ]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def route_request(objects, name):
+    """The request the query budget suite sends to a route, as (method, data, client kwargs).
+
+    Routes that change data get a real payload, so their budget covers the work they do; anything not
+    listed is a bare GET.
+    """
+    employee, photo = objects['employee'], objects['photo']
+    requests = {
+        'employee-bulk-import': lambda: ('post', {
+            'file': SimpleUploadedFile('staff.csv', staff_csv(objects['company'], objects['project'], 10)),
+        }, {'format': 'multipart'}),
+        'employee-login': lambda: ('post', {'fullname': employee.fullname, 'mobile_number': employee.mobile_number}, {'format': 'json'}),
+        'employee-me': lambda: ('get', None, {'HTTP_AUTHORIZATION': f"Employee {issue_employee_token(employee)}"}),
+        'employee-update-photo': lambda: ('patch', {
+            'profile_photo': SimpleUploadedFile('rig.jpg', photo, 'image/jpeg'),
+        }, {'format': 'multipart'}),
+        'employee-photo-upload': lambda: ('post', {'filename': 'rig.jpg', 'size': len(photo)}, {'format': 'json'}),
+        'photo-upload-detail': lambda: ('put', photo, {
+            'content_type': 'application/offset+octet-stream', 'HTTP_UPLOAD_OFFSET': '0',
+        }),
+        'photo-upload-commit': lambda: ('post', None, {}),
+        'accept-reject-employee': lambda: ('patch', {'action': 'accept'}, {'format': 'json'}),
+        'toggle-duty': lambda: ('patch', {'on_duty': not employee.on_duty}, {'format': 'json'}),
+        'employee-search': lambda: ('get', {'q': 'employee 1', 'company_name': 'company'}, {}),
+        'employee-autocomplete': lambda: ('get', {'q': 'GP000', 'limit': 20}, {}),
+        'employee-sub-training-bulk-assign': lambda: ('post', {
+            'sub_training': objects['sub_training'].pk, 'company': objects['company'].pk,
+        }, {'format': 'json'}),
+        'employee-subtraining-delete': lambda: ('delete', None, {}),
+        'admin-login': lambda: ('post', {'email': ADMIN_EMAIL, 'password': ADMIN_PASSWORD}, {'format': 'json'}),
+        'project-update': lambda: ('put', {'name': 'Project 0 North'}, {'format': 'json'}),
+        'project-delete': lambda: ('delete', None, {}),
+    }
+    return requests.get(name, lambda: ('get', None, {}))()
+
+
+ADMIN_EMAIL, ADMIN_PASSWORD = 'admin@example.com', 'correct horse'
+
+
+@override_settings(
+    THUMBNAIL_WORKERS=0,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class QueryBudgetTests(TempMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.objects = seed_dataset()
+        refresh_all_compliance_summaries()
+        User.objects.create_user('admin', ADMIN_EMAIL, ADMIN_PASSWORD)
+
+    def setUp(self):
+        super().setUp()
+        clear_caches()
+
+        # Fixtures the write routes consume: upload sessions (one empty, one complete), a project and an
+        # assignment to delete.
+        photo = photo_bytes()
+        employee = self.objects['employee']
+        upload = start_upload(employee, 'rig.jpg', len(photo))
+        complete = start_upload(employee, 'card.jpg', len(photo))
+        append_chunk(complete, 0, io.BytesIO(photo), len(photo))
+        spare_project = Project.objects.create(name='Spare')
+        hire(self.objects['company'], spare_project, 'Spare Hand', 'SP00001')
+        spare_sub_training = SubTraining.objects.create(main_training=self.objects['main_training'], name='Spare')
+        EmployeeSubTraining.objects.create(employee=employee, sub_training=spare_sub_training)
+        self.objects = dict(
+            self.objects, photo=photo, upload_id=upload.pk, complete_upload_id=complete.pk,
+            spare_project=spare_project, spare_sub_training=spare_sub_training,
+        )
+
+    def test_every_route_has_a_budget(self):
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names - set(QUERY_BUDGETS), set())
+
+    def test_query_budgets(self):
+        timings = []
+        for pattern in urls.urlpatterns:
+            with self.subTest(route=pattern.name):
+                url = reverse(pattern.name, kwargs=route_kwargs(self.objects, pattern.name))
+                method, data, extra = route_request(self.objects, pattern.name)
+                # A fresh client each time, so a login (admin-login) doesn't add session queries to later routes.
+                client = APIClient()
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                    response = getattr(client, method)(url, data, **extra)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+                timings.append((pattern.name, method, len(queries), elapsed))
+                self.assertLess(response.status_code, 400, getattr(response, 'data', response))
+                self.assertLessEqual(
+                    len(queries), QUERY_BUDGETS[pattern.name],
+                    f"{method.upper()} {url} ran {len(queries)} queries:\n" + "\n".join(q['sql'] for q in queries.captured_queries)
+                )
+        if os.environ.get('QUERY_BUDGET_REPORT'):
+            for name, method, count, elapsed in timings:
+                print(f"{method.upper():6} {name:40} {count:3d} queries {elapsed * 1000:8.2f} ms")
+
+
+
+
+# Async route -> the sync route whose payload it must reproduce.
+ASYNC_EQUIVALENTS = {
+    'async-employee-list': 'employee-list',
+    'async-accepted-employee-list': 'accepted-employee-list',
+    'async-not-accepted-employee-list': 'not-accepted-employee-list',
+    'async-on-duty-employees': 'on-duty-employees',
+    'async-of-duty-employees': 'of-duty-employees',
+    'async-employee-sub-trainings': 'employee-sub-trainings',
+    'async-average-completion-percentage': 'average-completion-percentage',
+    'async-employee-main-training-average': 'employee-main-training-average',
+    'async-notification-list': 'notification-list',
+}
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.objects = seed_dataset(employees=12, main_trainings=2)
+        refresh_all_compliance_summaries()
+
+    def assertSamePayload(self, async_name, query=''):
+        sync_name = ASYNC_EQUIVALENTS[async_name]
+        kwargs = route_kwargs(self.objects, sync_name)
+        client = APIClient()
+        expected = client.get(reverse(sync_name, kwargs=kwargs) + query)
+        actual = client.get(reverse(async_name, kwargs=kwargs) + query)
+        self.assertEqual(actual.status_code, expected.status_code)
+        if expected.status_code == 200:
+            actual_data, expected_data = actual.json(), expected.json()
+            if isinstance(expected_data, dict) and 'next' in expected_data:
+                # Cursor links carry the path, which differs between the two routes.
+                for link in ('next', 'previous'):
+                    self.assertEqual(actual_data.pop(link) is None, expected_data.pop(link) is None)
+            self.assertEqual(actual_data, expected_data)
+
+    def test_async_views_match_their_sync_versions(self):
+        for async_name in ASYNC_EQUIVALENTS:
+            with self.subTest(route=async_name):
+                self.assertSamePayload(async_name)
+                self.assertSamePayload(async_name, '?page_size=3')
+
+    def test_async_filters_and_feeds(self):
+        self.assertSamePayload('async-on-duty-employees', '?fullname__icontains=employee 1')
+        self.assertSamePayload('async-notification-list', '?since_id=3')
+        self.assertEqual(APIClient().get(reverse('async-notification-list') + '?since_id=x').status_code, 400)
+        self.assertEqual(APIClient().post(reverse('async-employee-list')).status_code, 405)
+
+class NotificationFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.notifications = [Notification.objects.create(message=f"Notice {i}") for i in range(5)]
+
+    def event_ids(self, body):
+        return [int(event_id) for event_id in re.findall(r'^id: (\d+)$', body, re.MULTILINE)]
+
+    def test_since_id_returns_newer_rows_oldest_first(self):
+        since = self.notifications[1].id
+        response = APIClient().get(reverse('notification-list'), {'since_id': since})
+        self.assertEqual([row['id'] for row in response.json()], [n.id for n in self.notifications[2:]])
+        with mock.patch.object(views.NotificationListView, 'since_limit', 2):
+            limited = APIClient().get(reverse('notification-list'), {'since_id': since})
+        self.assertEqual([row['id'] for row in limited.json()], [n.id for n in self.notifications[2:4]])
+        self.assertEqual(APIClient().get(reverse('notification-list'), {'since_id': -1}).status_code, 400)
+
+    def test_wsgi_answers_with_one_batch_instead_of_streaming(self):
+        response = self.client.get(reverse('notification-stream'), {'since_id': self.notifications[0].id})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('retry: '))
+        self.assertEqual(self.event_ids(body), [n.id for n in self.notifications])
+
+        # Without a position the client is only told where to resume from.
+        fresh = self.client.get(reverse('notification-stream')).content.decode()
+        self.assertEqual(self.event_ids(fresh), [self.notifications[-1].id])
+
+        # A reconnecting EventSource resumes from Last-Event-ID rather than the original since_id.
+        resumed = self.client.get(
+            reverse('notification-stream'), {'since_id': 0}, HTTP_LAST_EVENT_ID=str(self.notifications[3].id)
+        )
+        self.assertEqual(self.event_ids(resumed.content.decode()), [n.id for n in self.notifications[3:]])
+
+    async def test_asgi_stream_delivers_new_rows_until_its_lifetime_ends(self):
+        with mock.patch.multiple(views, NOTIFICATION_STREAM_POLL_INTERVAL=0.01, NOTIFICATION_STREAM_MAX_AGE=0.3):
+            response = await AsyncClient().get(reverse('notification-stream'), {'since_id': self.notifications[3].id})
+            chunks, late = [], None
+            async for chunk in response.streaming_content:
+                chunks.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+                if late is None and len(self.event_ids(''.join(chunks))) == 2:
+                    late = await Notification.objects.acreate(message="Late notice")
+        self.assertEqual(self.event_ids(''.join(chunks)), [n.id for n in self.notifications[3:]] + [late.id])
+
+
+# Querysets behind the hot views, as name -> callable(objects). Each must be answered from an index.
+HOT_QUERYSETS = {
+    'accepted employees': lambda o: Employee.objects.select_related('company', 'project').filter(is_accepted=True).order_by('id'),
+    'not accepted employees': lambda o: Employee.objects.select_related('company', 'project').filter(is_accepted=False).order_by('id'),
+    'on duty employees': lambda o: Employee.objects.select_related('company', 'project').filter(on_duty=True).order_by('id'),
+    'off duty employees': lambda o: Employee.objects.select_related('company', 'project').filter(on_duty=False).order_by('id'),
+    'employee login': lambda o: Employee.objects.filter(mobile_number=o['employee'].mobile_number),
+    'employee trainings': lambda o: EmployeeSubTraining.objects.filter(employee_id=o['employee'].pk).order_by('id'),
+    'employee sub training': lambda o: EmployeeSubTraining.objects.filter(
+        employee_id=o['employee'].pk, sub_training_id=o['sub_training'].pk
+    ),
+    'employee main training': lambda o: EmployeeSubTraining.objects.filter(
+        employee_id=o['employee'].pk, sub_training__main_training_id=o['main_training'].pk
+    ).select_related('sub_training__main_training'),
+    'expiry window': lambda o: EmployeeSubTraining.objects.filter(
+        warning=False, expiration_date__lte=date.today() + WARNING_WINDOW
+    ),
+    'expiry timeline': lambda o: expiry_counts(
+        EmployeeSubTraining.objects.all(), date.today(), date.today() + timedelta(days=183)
+    ),
+    'notification feed': lambda o: Notification.objects.order_by('-created_at', '-id')[:50],
+    'notification dedup': lambda o: Notification.objects.filter(message__in=['a', 'b']),
+    'notifications since id': lambda o: Notification.objects.filter(id__gt=10).order_by('id')[:500],
+}
+
+# Querysets whose order should come straight off the index instead of a sort step.
+PRESORTED = {
+    'accepted employees', 'not accepted employees', 'on duty employees', 'off duty employees',
+    'notification feed', 'notifications since id',
+}
+
+
+@skipUnlessDBFeature('supports_explaining_query_execution')
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, project = Company.objects.create(name="Acme"), Project.objects.create(name="North")
+        cls.employees = [hire(company, project, f"Worker {i}", f"GP{i:05d}") for i in range(7)]
+
+        # Five of the nine notifications arrive in the same instant, so a page boundary falls inside the tie.
+        Notification.objects.all().delete()  # the hires' announcements
+        now = timezone.now()
+        offsets = [-3, -2, 0, 0, 0, 0, 0, 1, 2]
+        cls.notifications = [Notification.objects.create(message=f"Notice {i}") for i in range(len(offsets))]
+        for notification, minutes in zip(cls.notifications, offsets):
+            notification.created_at = now + timedelta(minutes=minutes)
+            Notification.objects.filter(pk=notification.pk).update(created_at=notification.created_at)
+
+    def walk(self, url, direction='next'):
+        pages, client = [], APIClient()
+        while url:
+            pages.append(client.get(url).json())
+            url = pages[-1][direction]
+        return pages
+
+    def ids(self, pages):
+        return [row['id'] for page in pages for row in page['results']]
+
+    def test_lists_are_only_paginated_when_page_size_is_sent(self):
+        response = APIClient().get(reverse('employee-list-create'))
+        self.assertEqual([row['id'] for row in response.json()], [employee.id for employee in self.employees])
+
+        page = APIClient().get(reverse('employee-list-create'), {'page_size': 3}).json()
+        self.assertEqual(list(page), ['next', 'previous', 'results'])
+        self.assertEqual(len(page['results']), 3)
+        self.assertIsNone(page['previous'])
+
+    def test_count_is_opt_in_and_not_repeated_on_later_pages(self):
+        client = APIClient()
+        first = client.get(reverse('employee-list-create'), {'page_size': 3, 'count': 'true'}).json()
+        self.assertEqual(first['count'], len(self.employees))
+        self.assertNotIn('count=', first['next'])
+        with self.assertNumQueries(1):
+            second = client.get(first['next']).json()
+        self.assertNotIn('count', second)
+
+    def test_walking_pages_visits_every_row_once_in_both_directions(self):
+        pages = self.walk(reverse('employee-list-create') + '?page_size=3')
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertEqual(self.ids(pages), [employee.id for employee in self.employees])
+
+        back = self.walk(pages[-1]['previous'], direction='previous')
+        self.assertEqual(self.ids(reversed(back)), self.ids(pages[:-1]))
+
+    def test_notifications_sharing_a_timestamp_are_neither_repeated_nor_skipped(self):
+        expected = [n.id for n in sorted(self.notifications, key=lambda n: (n.created_at, n.id), reverse=True)]
+        for page_size in (2, 3, 4):
+            with self.subTest(page_size=page_size):
+                pages = self.walk(reverse('notification-list') + f'?page_size={page_size}')
+                self.assertEqual(self.ids(pages), expected)
+                back = self.walk(pages[-1]['previous'], direction='previous')
+                self.assertEqual(self.ids(reversed(back)), self.ids(pages[:-1]))
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN QUERY PLAN regression tests for the indexes in migration 0017 (SQLite plan format)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.objects = seed_dataset(employees=20, main_trainings=2)
+
+    def plan(self, queryset):
+        return [re.sub(r'^\d+ \d+ \d+ ', '', line) for line in queryset.explain().splitlines()]
+
+    def test_hot_querysets_use_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Plan assertions are written against SQLite's EXPLAIN QUERY PLAN output.")
+        for name, build in HOT_QUERYSETS.items():
+            with self.subTest(queryset=name):
+                plan = self.plan(build(self.objects))
+                full_scans = [step for step in plan if re.fullmatch(r'SCAN \w+', step.strip())]
+                self.assertEqual(full_scans, [], f"{name} scans a whole table:\n" + "\n".join(plan))
+                if name in PRESORTED:
+                    sorts = [step for step in plan if 'TEMP B-TREE' in step]
+                    self.assertEqual(sorts, [], f"{name} sorts instead of reading index order:\n" + "\n".join(plan))
+
+class EmployeeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        objects = seed_dataset(employees=6, main_trainings=1)
+        cls.company, cls.project = objects['company'], objects['project']
+        cls.smith = hire(cls.company, cls.project, 'John Smith', 'GP10012')
+        cls.smithson = hire(cls.company, cls.project, 'Smith Smithson', 'GP10013')
+        cls.farrier = hire(cls.company, cls.project, 'Jane Doe', 'GP20001', designation='Smith')
+
+    def search(self, route='employee-search', **params):
+        response = APIClient().get(reverse(route), params)
+        self.assertEqual(response.status_code, 200)
+        return [row['fullname'] for row in response.json()]
+
+    def setUp(self):
+        if not search_index_available():
+            self.skipTest("The full-text index is SQLite only; see test_other_databases_fall_back_to_icontains.")
+
+    def test_match_runs_once_as_a_join(self):
+        with CaptureQueriesContext(connection) as queries:
+            names = self.search(fullname='smi')
+        self.assertEqual(set(names), {'John Smith', 'Smith Smithson'})
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]['sql'].count('MATCH'), 1)
+        self.assertIn('INNER JOIN', queries[0]['sql'])
+        # The full-text query drives the plan; employees are then fetched by primary key.
+        plan = search_employees(Employee.objects.filter(is_accepted=True), {'fullname': 'smi'}).explain().splitlines()
+        self.assertIn(f'SCAN {SEARCH_TABLE} VIRTUAL TABLE', plan[0])
+
+    def test_results_are_ranked_by_bm25(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank, rowid", ['"smith"*'])
+            expected = [Employee.objects.get(id=row[0]).fullname for row in cursor.fetchall()]
+        self.assertEqual(self.search(q='smith'), expected)
+        self.assertEqual(set(expected), {'John Smith', 'Smith Smithson', 'Jane Doe'})
+
+    def test_words_prefix_match_whole_tokens_only(self):
+        self.assertEqual(set(self.search(gate_pass_no='GP100')), {'John Smith', 'Smith Smithson'})
+        self.assertEqual(self.search(gate_pass_no='0012'), [])
+        self.assertEqual(self.search(fullname='john smi'), ['John Smith'])
+
+    def test_filter_terms_combine(self):
+        self.assertEqual(
+            set(self.search('on-duty-employees', company_name=self.company.name, search='smith')),
+            {'John Smith', 'Smith Smithson', 'Jane Doe'},
+        )
+        self.assertEqual(self.search('on-duty-employees', project_name='nowhere', search='smith'), [])
+
+    def test_signals_keep_the_index_current(self):
+        self.smith.fullname = 'John Wright'
+        self.smith.save()
+        self.assertEqual(self.search(fullname='wright'), ['John Wright'])
+        self.assertNotIn('John Wright', self.search(fullname='smith'))
+
+        self.company.name = 'Halliburton'
+        self.company.save()
+        self.assertEqual(
+            set(self.search(company_name='halli')),
+            set(Employee.objects.filter(company=self.company, is_accepted=True).values_list('fullname', flat=True)),
+        )
+        self.project.name = 'Offshore North'
+        self.project.save()
+        self.assertIn('Jane Doe', self.search(project_name='offsh'))
+
+        self.farrier.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE rowid = %s", [self.farrier.id])
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(self.search(designation='smith'), [])
+
+
+class EmployeeAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.project = Company.objects.create(name="Acme"), Project.objects.create(name="North")
+        cls.zola = hire(cls.company, cls.project, "Émile Zola", "EZ10001")
+        cls.strasse = hire(cls.company, cls.project, "Straße Worker", "SW20001")
+        cls.gate_pass = hire(cls.company, cls.project, "Bob Jones", "Gp00002")
+        cls.named_gp = hire(cls.company, cls.project, "GP Smith", "ZZ30001")
+        cls.first_gate_pass = hire(cls.company, cls.project, "Carl Ames", "GP00001")
+        cls.pending = hire(cls.company, cls.project, "Gp Pending", "GP00003", is_accepted=False)
+
+    def complete(self, q, **params):
+        response = APIClient().get(reverse('employee-autocomplete'), {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['gate_pass_no'] for row in response.json()]
+
+    def test_matching_folds_case(self):
+        for q in ('émile', 'ÉMILE', '  Émi', 'ez1'):
+            with self.subTest(q=q):
+                self.assertEqual(self.complete(q), ['EZ10001'])
+        self.assertEqual(self.complete('STRASS'), ['SW20001'])
+        self.assertEqual(self.complete('emile'), [])
+        self.assertEqual(self.complete('   '), [])
+
+    def test_gate_pass_matches_come_before_name_matches(self):
+        self.assertEqual(self.complete('gp'), ['GP00001', 'Gp00002', 'ZZ30001'])
+        self.assertEqual(
+            APIClient().get(reverse('employee-autocomplete'), {'q': 'gp', 'limit': 1}).json(),
+            [{'id': self.first_gate_pass.pk, 'fullname': "Carl Ames", 'gate_pass_no': "GP00001"}],
+        )
+
+    def test_an_employee_matching_both_ways_is_listed_once(self):
+        hire(self.company, self.project, "GP Both", "GP00004")
+        self.assertEqual(self.complete('gp'), ['GP00001', 'Gp00002', 'GP00004', 'ZZ30001'])
+
+    def test_limit_is_clamped(self):
+        Employee.objects.bulk_create([
+            Employee(
+                fullname=f"Extra {i}", mobile_number=f"6000{i:06d}", designation='Driller', gate_pass_no=f"GX{i:05d}",
+                gate_pass_key=f"gx{i:05d}", fullname_key=f"extra {i}", rig_or_rigless='Rig',
+                company=self.company, project=self.project, is_accepted=True,
+            )
+            for i in range(60)
+        ])
+        for limit, expected in (('5', 5), ('0', 1), ('-3', 1), ('1000', 50), ('many', 10)):
+            with self.subTest(limit=limit):
+                self.assertEqual(len(self.complete('gx', limit=limit)), expected)
+        self.assertEqual(len(self.complete('gx')), 10)
+        self.assertEqual(autocomplete_employees(Employee.objects.all(), 'gx', 3), list(
+            Employee.objects.filter(gate_pass_no__in=['GX00000', 'GX00001', 'GX00002']).order_by('gate_pass_no')
+            .values('id', 'fullname', 'gate_pass_no')
+        ))
+
+    def test_keys_stay_current_after_a_save(self):
+        self.zola.fullname = "Honoré de Balzac"
+        self.zola.gate_pass_no = "HB40001"
+        self.zola.save()
+        self.assertEqual(self.complete('émile'), [])
+        self.assertEqual(self.complete('ez'), [])
+        self.assertEqual(self.complete('HONORÉ'), ['HB40001'])
+        self.assertEqual(self.complete('hb4'), ['HB40001'])
+
+        response = APIClient().patch(reverse('employee-detail', kwargs={'pk': self.strasse.pk}), {'fullname': "Anna Weiß"}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.complete('anna weiss'), ['SW20001'])
+        self.assertEqual(self.complete('straße'), [])
+
+    def test_unaccepted_employees_are_left_out(self):
+        self.assertNotIn('GP00003', self.complete('gp'))
+        self.pending.is_accepted = True
+        self.pending.save()
+        self.assertIn('GP00003', self.complete('gp'))
+
+
+class EmployeeSearchFallbackTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        objects = seed_dataset(employees=6, main_trainings=1)
+        hire(objects['company'], objects['project'], 'John Smith', 'GP10012')
+
+    def test_other_databases_fall_back_to_icontains(self):
+        with mock.patch('backed.search.search_index_available', return_value=False):
+            with CaptureQueriesContext(connection) as queries:
+                response = APIClient().get(reverse('employee-search'), {'gate_pass_no': '0012', 'q': 'smi'})
+        self.assertEqual([row['fullname'] for row in response.json()], ['John Smith'])
+        self.assertNotIn('MATCH', queries[0]['sql'])
+
+
+class MainTrainingCatalogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(employees=3)
+
+    def setUp(self):
+        clear_caches()
+
+    def test_sub_trainings_are_nested_under_their_main_training(self):
+        response = APIClient().get(reverse('main-training-list'))
+        for main_training in response.json():
+            self.assertEqual(len(main_training['sub_trainings']), 3)
+            self.assertEqual({sub['main_training'] for sub in main_training['sub_trainings']}, {main_training['id']})
+
+    def test_catalog_is_cached_until_a_training_changes(self):
+        client = APIClient()
+        first = client.get(reverse('main-training-list'))
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get(reverse('main-training-list')).json(), first.json())
+        with self.assertNumQueries(0):
+            not_modified = client.get(reverse('main-training-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MainTraining.objects.create(name='Well control')
+            # The version only moves once the new row is committed.
+            self.assertEqual(client.get(reverse('main-training-list'), HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        changed = client.get(reverse('main-training-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+        self.assertEqual(len(changed.json()), len(first.json()) + 1)
+
+    def test_reference_lists_are_cached_per_query_string_and_invalidated_by_signals(self):
+        client = APIClient()
+        for name in ('company-list', 'project-list', 'sub-training-list', 'main-training-list-create'):
+            with self.subTest(route=name):
+                first = client.get(reverse(name))
+                with self.assertNumQueries(0):
+                    self.assertEqual(client.get(reverse(name)).json(), first.json())
+                with self.assertNumQueries(1):
+                    client.get(reverse(name) + '?format=json')
+
+        companies = client.get(reverse('company-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(name='Offshore')
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get(reverse('company-list'), HTTP_IF_NONE_MATCH=companies['ETag']).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.filter(name='Company 0').get().delete()
+        refreshed = client.get(reverse('company-list'), HTTP_IF_NONE_MATCH=companies['ETag'])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(len(refreshed.json()), len(companies.json()) - 1)
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'reference': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'reference', 'TIMEOUT': 60},
+    })
+    def test_process_local_cache_recovers_from_a_missed_bump_within_its_timeout(self):
+        client = APIClient()
+        companies = client.get(reverse('company-list'))
+        # update() sends no signal, like a save whose version bump landed in another process's cache.
+        Company.objects.filter(name='Company 0').update(name='Company Zero')
+        self.assertEqual(client.get(reverse('company-list'), HTTP_IF_NONE_MATCH=companies['ETag']).status_code, 304)
+
+        with mock.patch('time.time', return_value=time.time() + 61):
+            refreshed = client.get(reverse('company-list'), HTTP_IF_NONE_MATCH=companies['ETag'])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertIn('Company Zero', [company['name'] for company in refreshed.json()])
+
+
+@override_settings(THUMBNAIL_WORKERS=0)
+class ResumablePhotoUploadTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.employee = seed_dataset(employees=2, main_trainings=1)['employee']
+        self.photo = photo_bytes()
+        self.client = APIClient()
+
+    def start(self):
+        response = self.client.post(
+            reverse('employee-photo-upload', kwargs={'pk': self.employee.pk}),
+            {'filename': 'rig.jpg', 'size': len(self.photo)}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response['Location']
+
+    def put(self, url, offset, data):
+        return self.client.put(url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_upload_resumes_from_the_stored_offset_and_commits(self):
+        url = self.start()
+        half = len(self.photo) // 2
+        self.assertEqual(self.put(url, 0, self.photo[:half])['Upload-Offset'], str(half))
+
+        # A client that lost track of its progress is told where to resume.
+        stale = self.put(url, 0, self.photo[:half])
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(self.client.get(url).json()['offset'], half)
+
+        early = self.client.post(url + 'commit/')
+        self.assertEqual(early.status_code, 409)
+
+        self.assertEqual(self.put(url, half, self.photo[half:]).status_code, 200)
+        committed = self.client.post(url + 'commit/')
+        self.assertEqual(committed.status_code, 200, committed.content)
+
+        self.employee.refresh_from_db()
+        with self.employee.profile_photo.open('rb') as stored:
+            self.assertEqual(stored.read(), self.photo)
+        self.assertFalse(PhotoUploadSession.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.temp_root, 'sessions')), [])
+
+    def test_commit_rejects_a_file_that_is_not_an_image(self):
+        url = self.client.post(
+            reverse('employee-photo-upload', kwargs={'pk': self.employee.pk}),
+            {'filename': 'rig.jpg', 'size': 4}, format='json',
+        )['Location']
+        self.put(url, 0, b'oops')
+        response = self.client.post(url + 'commit/')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('profile_photo', response.json())
+        self.employee.refresh_from_db()
+        self.assertFalse(self.employee.profile_photo)
+
+    def test_a_concurrent_chunk_at_the_same_offset_is_refused(self):
+        session = start_upload(self.employee, 'rig.jpg', len(self.photo))
+        competing = PhotoUploadSession.objects.get(pk=session.pk)
+        outcome = {}
+
+        class SlowBody(io.BytesIO):
+            # A second request arrives while the first is still receiving its body.
+            def read(body, size=-1):
+                if not outcome:
+                    try:
+                        append_chunk(competing, 0, io.BytesIO(b'x' * 10), 10)
+                    except UploadOffsetMismatch as e:
+                        outcome['expected'] = e.expected
+                return io.BytesIO.read(body, size)
+
+        self.assertEqual(append_chunk(session, 0, SlowBody(self.photo), len(self.photo)), len(self.photo))
+        self.assertEqual(outcome, {'expected': 0})
+        session.refresh_from_db()
+        self.assertEqual((session.offset, session.writing_since), (len(self.photo), None))
+        with open(session_path(session), 'rb') as part:
+            self.assertEqual(part.read(), self.photo)
+
+    def test_a_stale_offset_is_refused_with_the_current_one(self):
+        session = start_upload(self.employee, 'rig.jpg', len(self.photo))
+        stale = PhotoUploadSession.objects.get(pk=session.pk)
+        append_chunk(session, 0, io.BytesIO(self.photo[:100]), 100)
+        with self.assertRaises(UploadOffsetMismatch) as raised:
+            append_chunk(stale, 0, io.BytesIO(self.photo[:100]), 100)
+        self.assertEqual((raised.exception.expected, stale.offset), (100, 100))
+
+    def test_the_claim_of_a_request_that_died_lapses(self):
+        session = start_upload(self.employee, 'rig.jpg', len(self.photo))
+        PhotoUploadSession.objects.filter(pk=session.pk).update(writing_since=timezone.now())
+        with self.assertRaises(UploadOffsetMismatch):
+            append_chunk(session, 0, io.BytesIO(self.photo), len(self.photo))
+
+        PhotoUploadSession.objects.filter(pk=session.pk).update(writing_since=timezone.now() - timedelta(minutes=11))
+        self.assertEqual(append_chunk(session, 0, io.BytesIO(self.photo), len(self.photo)), len(self.photo))
+        self.assertEqual(self.client.get(reverse('photo-upload-detail', kwargs={'upload_id': session.pk})).json()['offset'],
+                         len(self.photo))
+
+
+@override_settings(THUMBNAIL_WORKERS=0)
+class ThumbnailTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        clear_caches()
+        self.company, self.project = Company.objects.create(name="Acme"), Project.objects.create(name="North")
+        self.employee = hire(self.company, self.project, "Jane Doe", "GP00001")
+
+    def set_photo(self, employee, color='navy'):
+        employee.profile_photo = SimpleUploadedFile('rig.jpg', photo_bytes(color=color), 'image/jpeg')
+        employee.save()
+        employee.refresh_from_db()
+        return employee
+
+    def clear_sizes(self, employee):
+        Employee.objects.filter(pk=employee.pk).update(**{field: None for field in THUMBNAIL_SIZES})
+        employee.refresh_from_db()
+
+    def dimensions(self, field_file):
+        with field_file.open('rb') as stored:
+            return Image.open(stored).size
+
+    def test_uploaded_photo_gets_both_sizes_and_urls(self):
+        client = APIClient()
+        response = client.patch(reverse('employee-update-photo', kwargs={'pk': self.employee.pk}), {
+            'profile_photo': SimpleUploadedFile('rig.jpg', photo_bytes(), 'image/jpeg'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 200)
+
+        self.employee.refresh_from_db()
+        self.assertEqual(self.dimensions(self.employee.profile_photo_avatar), (96, 72))
+        self.assertEqual(self.dimensions(self.employee.profile_photo_card), (480, 360))
+
+        urls = client.get(reverse('employee-detail', kwargs={'pk': self.employee.pk})).json()['profile_photo_urls']
+        self.assertEqual(urls, {
+            'avatar': 'http://testserver' + self.employee.profile_photo_avatar.url,
+            'card': 'http://testserver' + self.employee.profile_photo_card.url,
+            'original': 'http://testserver' + self.employee.profile_photo.url,
+        })
+        self.assertEqual(len(set(urls.values())), 3)
+
+    def test_urls_fall_back_to_the_original_while_sizes_are_missing(self):
+        self.set_photo(self.employee)
+        self.clear_sizes(self.employee)
+        urls = EmployeeSerializer(self.employee).data['profile_photo_urls']
+        self.assertEqual(urls, dict.fromkeys(['avatar', 'card', 'original'], self.employee.profile_photo.url))
+        self.assertIsNone(EmployeeSerializer(hire(self.company, self.project, "John Roe", "GP00002")).data['profile_photo_urls'])
+
+    def test_thumbnails_stale(self):
+        self.assertFalse(thumbnails_stale(self.employee))
+        self.employee.profile_photo = SimpleUploadedFile('rig.jpg', photo_bytes(), 'image/jpeg')
+        self.assertTrue(thumbnails_stale(self.employee))
+
+        self.employee.save()
+        self.employee.refresh_from_db()
+        self.assertFalse(thumbnails_stale(self.employee))
+        Employee.objects.filter(pk=self.employee.pk).update(profile_photo_card=None)
+        self.employee.refresh_from_db()
+        self.assertTrue(thumbnails_stale(self.employee))
+
+    def test_render_thumbnails_attaches_sizes_to_the_current_photo_only(self):
+        old_photo = self.set_photo(self.employee).profile_photo.name
+        self.set_photo(self.employee, color='teal')
+        self.clear_sizes(self.employee)
+
+        render_thumbnails(self.employee.pk, old_photo)
+        self.employee.refresh_from_db()
+        self.assertFalse(self.employee.profile_photo_avatar)
+
+        get_employee_profile(self.employee.pk)
+        names = render_thumbnails(self.employee.pk, self.employee.profile_photo.name)
+        self.employee.refresh_from_db()
+        self.assertEqual({field: getattr(self.employee, field).name for field in THUMBNAIL_SIZES}, names)
+        self.assertIsNone(caches['profiles'].get(employee_profile_key(self.employee.pk)))
+
+    def test_hooks_clear_and_render_sizes_only_when_the_photo_changes(self):
+        self.set_photo(self.employee)
+        rendered = {field: getattr(self.employee, field).name for field in THUMBNAIL_SIZES}
+        with mock.patch('backed.signals.schedule_thumbnails') as schedule:
+            self.employee.designation = 'Toolpusher'
+            self.employee.save()
+            schedule.assert_not_called()
+            self.employee.refresh_from_db()
+            self.assertEqual({field: getattr(self.employee, field).name for field in THUMBNAIL_SIZES}, rendered)
+
+            self.employee.profile_photo = SimpleUploadedFile('new.jpg', photo_bytes(color='teal'), 'image/jpeg')
+            self.employee.save()
+            schedule.assert_called_once_with(self.employee)
+            self.employee.refresh_from_db()
+            self.assertFalse(any(getattr(self.employee, field) for field in THUMBNAIL_SIZES))
+
+            self.set_photo(self.employee, color='olive')
+            schedule.reset_mock()
+            Employee.objects.filter(pk=self.employee.pk).update(**rendered)
+            self.employee.refresh_from_db()
+            self.employee.profile_photo = None
+            self.employee.save()
+            schedule.assert_not_called()
+            self.employee.refresh_from_db()
+            self.assertFalse(any(getattr(self.employee, field) for field in THUMBNAIL_SIZES))
+
+    @override_settings(THUMBNAIL_WORKERS=2)
+    def test_worker_pool_renders_after_commit(self):
+        with mock.patch('backed.thumbnails._executor') as executor:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.employee.profile_photo = SimpleUploadedFile('rig.jpg', photo_bytes(), 'image/jpeg')
+                self.employee.save()
+            executor.submit.assert_not_called()
+            for callback in callbacks:
+                callback()
+        executor.submit.assert_called_once_with(_render_in_worker, self.employee.pk, self.employee.profile_photo.name)
+
+    def test_backfill_command(self):
+        self.set_photo(self.employee)
+        other = self.set_photo(hire(self.company, self.project, "John Roe", "GP00002"), color='teal')
+        hire(self.company, self.project, "No Photo", "GP00003")
+        self.clear_sizes(self.employee)
+
+        stdout = io.StringIO()
+        call_command('backfill_thumbnails', stdout=stdout)
+        self.assertIn("Rendered thumbnails for 1 photos.", stdout.getvalue())
+        self.employee.refresh_from_db()
+        self.assertEqual(self.dimensions(self.employee.profile_photo_avatar), (96, 72))
+
+        call_command('backfill_thumbnails', stdout=stdout)
+        self.assertIn("Rendered thumbnails for 0 photos.", stdout.getvalue())
+        Employee.objects.filter(pk=other.pk).update(profile_photo='profile_photos/missing.jpg')
+        stderr = io.StringIO()
+        with self.assertLogs('backed.thumbnails', 'ERROR'):
+            call_command('backfill_thumbnails', '--all', stdout=stdout, stderr=stderr)
+        self.assertIn("Rendered thumbnails for 1 photos.", stdout.getvalue().splitlines()[-1])
+        self.assertIn("Could not render 1 photos", stderr.getvalue())
+
+
+class MediaStorageTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = Employee._meta.get_field('profile_photo').storage
+        self.photo = photo_bytes()
+        self.name = self.storage.save('profile_photos/rig.jpg', ContentFile(self.photo))
+
+    def get(self, path, **headers):
+        return self.client.get(reverse('media', kwargs={'path': path}), **headers)
+
+    def test_identical_uploads_share_one_file(self):
+        digest = hashlib.sha256(self.photo).hexdigest()
+        self.assertEqual(self.name, f'profile_photos/{digest}.jpg')
+        self.assertEqual(self.storage.save('profile_photos/copy.JPG', SimpleUploadedFile('copy.JPG', self.photo)), self.name)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'profile_photos')), [f'{digest}.jpg'])
+
+        other = self.storage.save('profile_photos/rig.jpg', ContentFile(photo_bytes(color='teal')))
+        self.assertNotEqual(other, self.name)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'profile_photos'))), 2)
+
+    def test_content_addressed_files_are_immutable(self):
+        response = self.get(self.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.photo)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.photo).hexdigest()}"')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_other_files_are_revalidated(self):
+        os.makedirs(os.path.join(self.media_root, 'exports'))
+        with open(os.path.join(self.media_root, 'exports', 'readme.txt'), 'w') as f:
+            f.write("hello")
+        response = self.get('exports/readme.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b"hello")
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        self.assertRegex(response['ETag'], r'^"[0-9a-f]+-5"$')
+
+        self.assertEqual(self.get('exports/readme.txt', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        with open(os.path.join(self.media_root, 'exports', 'readme.txt'), 'w') as f:
+            f.write("hello, world")
+        self.assertEqual(self.get('exports/readme.txt', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_matching_etag_gets_304(self):
+        etag = self.get(self.name)['ETag']
+        for if_none_match in (etag, f'"stale", {etag}', f'W/{etag}', '*'):
+            with self.subTest(if_none_match=if_none_match):
+                self.assertEqual(self.get(self.name, HTTP_IF_NONE_MATCH=if_none_match).status_code, 304)
+        self.assertEqual(self.get(self.name, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+        not_modified = self.get(self.name, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual((not_modified['ETag'], not_modified['Cache-Control']), (etag, 'public, max-age=31536000, immutable'))
+
+    @override_settings(MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_nginx_sends_the_bytes(self):
+        response = self.get(self.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.name)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(self.get(self.name, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Sendfile')
+    def test_sendfile_header(self):
+        response = self.get(self.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, self.name))
+        self.assertNotIn('X-Accel-Redirect', response)
+        self.assertEqual(response.content, b'')
+
+    def test_paths_outside_media_root_and_missing_files_are_404(self):
+        with open(os.path.join(os.path.dirname(self.media_root), 'secret.txt'), 'w') as f:
+            self.addCleanup(os.remove, f.name)
+            f.write("secret")
+        for path in ('../secret.txt', 'profile_photos/../../secret.txt', '/etc/passwd', 'profile_photos', 'missing.jpg'):
+            with self.subTest(path=path):
+                with self.assertRaises(Http404):
+                    views.MediaFileView(RequestFactory().get('/media/'), path)
+        self.assertEqual(self.client.get('/media/profile_photos/../../secret.txt').status_code, 404)
+        self.assertEqual(self.client.get('/media/%2E%2E/secret.txt').status_code, 404)
+
+
+class EmployeeLoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = seed_dataset(employees=2, main_trainings=1)['employee']
+
+    def setUp(self):
+        clear_caches()
+
+    def login(self, fullname=None):
+        return APIClient().post(reverse('employee-login'), {
+            'fullname': fullname or self.employee.fullname, 'mobile_number': self.employee.mobile_number,
+        }, format='json')
+
+    def test_login_issues_a_token_for_a_cached_profile(self):
+        with self.assertNumQueries(1):
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['company_name'], self.employee.company.name)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Employee {response.json()['token']}")
+        with self.assertNumQueries(0):
+            me = client.get(reverse('employee-me'))
+        self.assertEqual(me.json(), response.json()['data'])
+
+        self.employee.designation = 'Toolpusher'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.save()
+        self.assertEqual(client.get(reverse('employee-me')).json()['designation'], 'Toolpusher')
+
+    def test_profiles_live_in_the_shared_profile_cache(self):
+        self.login()
+        key = employee_profile_key(self.employee.pk)
+        self.assertEqual(caches['profiles'].get(key)['designation'], self.employee.designation)
+        self.assertIsNone(caches['default'].get(key))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.save()
+            self.assertIsNotNone(caches['profiles'].get(key))
+        self.assertIsNone(caches['profiles'].get(key))
+
+    def test_wrong_name_and_bad_token_are_rejected(self):
+        self.assertEqual(self.login(fullname='Someone Else').status_code, 404)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Employee forged')
+        self.assertEqual(client.get(reverse('employee-me')).status_code, 401)
+        self.assertEqual(APIClient().get(reverse('employee-me')).status_code, 401)
+
+
+class DatabaseProfileTests(TestCase):
+    def test_wal_profile_pragmas_are_applied_to_new_connections(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        database = dict(settings.DATABASE_PROFILES['sqlite-wal'], NAME=os.path.join(directory, 'profile.sqlite3'))
+        scratch = ConnectionHandler({'default': database})['default']
+        self.addCleanup(scratch.close)
+        with scratch.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+
+class FastPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.objects = seed_dataset(employees=9, main_trainings=2)
+        # URL building only needs the stored names, not the files.
+        Employee.objects.filter(id__in=Employee.objects.order_by('id').values('id')[:3]).update(
+            profile_photo='profile_photos/' + 'a' * 64 + '.jpg',
+        )
+        Employee.objects.filter(id=Employee.objects.order_by('id').values('id')[:1]).update(
+            profile_photo_avatar='profile_photos/thumbs/' + 'b' * 64 + '.jpg',
+        )
+
+    def serialized(self, serializer_class, queryset, path):
+        request = Request(RequestFactory().get(path))
+        return JSONRenderer().render(serializer_class(queryset, many=True, context={'request': request}).data)
+
+    def test_employee_list_matches_employee_serializer(self):
+        expected = self.serialized(
+            EmployeeSerializer, Employee.objects.select_related('company', 'project').order_by('id'), '/api/employees/'
+        )
+        for fast_json in sorted({None, orjson}, key=bool):
+            with self.subTest(orjson=bool(fast_json)), mock.patch('backed.fast.orjson', fast_json):
+                self.assertEqual(APIClient().get(reverse('employee-list')).content, expected)
+
+    def test_training_percentages_match_their_serializer(self):
+        employee = self.objects['employee']
+        url = reverse('employee-sub-trainings', kwargs={'employee_id': employee.pk})
+        queryset = EmployeeSubTraining.objects.filter(employee=employee).select_related(
+            'employee', 'sub_training__main_training'
+        ).with_completion().order_by('id')
+        self.assertEqual(APIClient().get(url).content, self.serialized(EmployeePercentageSubTrainingSerializer, queryset, url))
+
+    def test_fast_path_pages_like_the_serializer(self):
+        client = APIClient()
+        first = client.get(reverse('employee-list') + '?page_size=4').json()
+        second = client.get(first['next']).json()
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, list(Employee.objects.order_by('id').values_list('id', flat=True)[:8]))
+
+    @skipUnless(orjson, "without orjson FastJSONRenderer is JSONRenderer")
+    def test_fast_renderer_matches_json_renderer(self):
+        data = [{
+            'text': 'Ünïcode \u2028 line \u2029 para "quoted"', 'number': 12.5, 'none': None, 'flag': True,
+            'decimal': Decimal('1.10'), 'uuid': uuid.UUID(int=7), 'day': date(2026, 1, 2),
+            'moment': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc), 'nested': {'list': [1, 'two']},
+        }]
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_custom_date_field_matches_strftime(self):
+        field = CustomDateField()
+        for day in (date(2026, 1, 2), date(1999, 12, 31), date(2030, 10, 9)):
+            self.assertEqual(field.to_representation(day), day.strftime('%d-%m-%Y'))
+
+
+class CompletionPercentageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, project = Company.objects.create(name="Acme"), Project.objects.create(name="North")
+        cls.employee = hire(company, project, "Jane Doe", "GP00001")
+        cls.main_training = MainTraining.objects.create(name="Safety")
+        cls.subs = {
+            'permanent': SubTraining.objects.create(main_training=cls.main_training, name="Induction", validity_period=None),
+            'week': SubTraining.objects.create(main_training=cls.main_training, name="Toolbox", validity_period=timedelta(days=7)),
+            'half-year': SubTraining.objects.create(main_training=cls.main_training, name="H2S", validity_period=timedelta(days=182)),
+            'year': SubTraining.objects.create(main_training=cls.main_training, name="First aid", validity_period=timedelta(days=365)),
+        }
+
+    def assign(self, sub, days_ago, employee=None):
+        return EmployeeSubTraining.objects.create(
+            employee=employee or self.employee, sub_training=self.subs[sub], start_date=date.today() - timedelta(days=days_ago),
+        )
+
+    def assertMatchesCalculateCompletion(self):
+        trainings = EmployeeSubTraining.objects.with_completion().select_related('sub_training').order_by('id')
+        self.assertTrue(trainings)
+        for training in trainings:
+            with self.subTest(sub_training=training.sub_training.name, start_date=training.start_date):
+                self.assertEqual(training.completion_percentage, training.calculate_completion())
+
+    def test_permanent_trainings_are_complete(self):
+        for days_ago in (-30, 0, 5000):
+            self.assign('permanent', days_ago)
+        self.assertMatchesCalculateCompletion()
+        self.assertEqual(set(EmployeeSubTraining.objects.with_completion().values_list('completion_percentage', flat=True)), {100.0})
+
+    def test_future_start_date_exceeds_one_hundred_percent(self):
+        self.assign('half-year', -30)
+        self.assign('week', -1)
+        self.assertMatchesCalculateCompletion()
+        self.assertTrue(all(training.completion_percentage > 100 for training in EmployeeSubTraining.objects.with_completion()))
+
+    def test_expired_trainings_bottom_out_at_zero(self):
+        self.assign('week', 8)
+        self.assign('year', 365)
+        self.assign('year', 1000)
+        self.assertMatchesCalculateCompletion()
+        self.assertEqual(set(EmployeeSubTraining.objects.with_completion().values_list('completion_percentage', flat=True)), {0.0})
+
+    def test_partial_completion_across_validity_periods(self):
+        for sub in ('week', 'half-year', 'year'):
+            for days_ago in range(-9, 400, 13):
+                self.assign(sub, days_ago)
+        self.assertMatchesCalculateCompletion()
+
+    def test_main_training_average_view(self):
+        for sub, days_ago in (('permanent', 10), ('week', 3), ('half-year', -20), ('half-year', 45), ('year', 400)):
+            self.assign(sub, days_ago)
+        trainings = EmployeeSubTraining.objects.select_related('sub_training')
+        expected = round(sum(training.calculate_completion() for training in trainings) / len(trainings), 2)
+
+        response = APIClient().get(reverse('employee-main-training-average', kwargs={
+            'employee_id': self.employee.pk, 'main_training_id': self.main_training.pk,
+        }))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'main_training_name': "Safety", 'average_percentage': expected})
+
+    def test_main_training_average_view_without_trainings(self):
+        response = APIClient().get(reverse('employee-main-training-average', kwargs={
+            'employee_id': self.employee.pk, 'main_training_id': self.main_training.pk,
+        }))
+        self.assertEqual(response.status_code, 404)
+
+
+class ComplianceSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, project = Company.objects.create(name="Acme"), Project.objects.create(name="North")
+        cls.employee = hire(company, project, "Jane Doe", "GP00001")
+        main_training = MainTraining.objects.create(name="Safety")
+        cls.year = SubTraining.objects.create(main_training=main_training, name="First aid", validity_period=timedelta(days=365))
+        cls.half_year = SubTraining.objects.create(main_training=main_training, name="H2S", validity_period=timedelta(days=182))
+
+    def assign(self, sub_training, days_ago):
+        with self.captureOnCommitCallbacks(execute=True):
+            return EmployeeSubTraining.objects.create(
+                employee=self.employee, sub_training=sub_training, start_date=date.today() - timedelta(days=days_ago),
+            )
+
+    def summary(self):
+        return EmployeeComplianceSummary.objects.get(employee=self.employee)
+
+    def expected_average(self):
+        trainings = EmployeeSubTraining.objects.filter(employee=self.employee).select_related('sub_training')
+        return round(sum(training.calculate_completion() for training in trainings) / len(trainings), 2)
+
+    def test_assigning_and_removing_trainings_refreshes_the_summary(self):
+        self.assign(self.year, 100)
+        summary = self.summary()
+        self.assertEqual((summary.total_trainings, summary.valid_trainings, summary.warning_trainings, summary.expired_trainings),
+                         (1, 1, 0, 0))
+        self.assertEqual(summary.average_completion_percentage, self.expected_average())
+
+        expired = self.assign(self.half_year, 200)
+        summary = self.summary()
+        self.assertEqual((summary.total_trainings, summary.valid_trainings, summary.expired_trainings), (2, 1, 1))
+        self.assertEqual(summary.average_completion_percentage, self.expected_average())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            expired.delete()
+        summary = self.summary()
+        self.assertEqual((summary.total_trainings, summary.expired_trainings), (1, 0))
+        self.assertEqual(summary.average_completion_percentage, self.expected_average())
+
+    def test_validity_period_change_reages_assigned_employees(self):
+        self.assign(self.year, 91)
+        before = self.summary().average_completion_percentage
+
+        self.year.validity_period = timedelta(days=182)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.year.save()
+        after = self.summary().average_completion_percentage
+        self.assertLess(after, before)
+        self.assertEqual(after, self.expected_average())
+
+    def test_new_sub_training_refreshes_nobody(self):
+        self.assign(self.year, 10)
+        with mock.patch('backed.signals.refresh_compliance_summaries') as refresh, self.captureOnCommitCallbacks(execute=True):
+            SubTraining.objects.create(main_training=self.year.main_training, name="Rigging", validity_period=None)
+        refresh.assert_not_called()
+
+    def test_get_compliance_summary_rebuilds_a_stale_summary(self):
+        self.assign(self.year, 100)
+        EmployeeComplianceSummary.objects.filter(employee=self.employee).update(
+            as_of=date.today() - timedelta(days=1), average_completion_percentage=1.0, total_trainings=9,
+        )
+        summary = get_compliance_summary(self.employee.pk)
+        self.assertEqual(summary.as_of, date.today())
+        self.assertEqual((summary.average_completion_percentage, summary.total_trainings), (self.expected_average(), 1))
+        self.assertEqual(self.summary().as_of, date.today())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_compliance_summary(self.employee.pk).as_of, date.today())
+
+    def test_get_compliance_summary_builds_a_missing_summary(self):
+        self.assign(self.year, 100)
+        EmployeeComplianceSummary.objects.all().delete()
+        self.assertEqual(get_compliance_summary(self.employee.pk).total_trainings, 1)
+        self.assertIsNone(get_compliance_summary(0))
+
+
+class ExpiryWarningSweepTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company, project = Company.objects.create(name="Acme"), Project.objects.create(name="North")
+        cls.employee = hire(company, project, "Jane Doe", "GP00001")
+        cls.twin = hire(company, project, "Jane Doe", "GP00002")
+        cls.first_aid = SubTraining.objects.create(
+            main_training=MainTraining.objects.create(name="Safety"), name="First aid", validity_period=timedelta(days=365),
+        )
+
+    def assign(self, employee, expires_in):
+        training = EmployeeSubTraining.objects.create(
+            employee=employee, sub_training=self.first_aid, start_date=date.today() + timedelta(days=expires_in - 365),
+        )
+        # Rows were valid when assigned and have since drifted towards expiry; only the sweep flags them.
+        EmployeeSubTraining.objects.filter(pk=training.pk).update(warning=False)
+        return training
+
+    def message(self, training, verb='expires'):
+        return f"Training {verb} on {training.expiration_date.strftime('%d-%m-%Y')}: Jane Doe - First aid"
+
+    def expiry_notifications(self):
+        return list(Notification.objects.filter(message__startswith="Training ").values_list('message', flat=True))
+
+    def flagged(self):
+        return set(EmployeeSubTraining.objects.filter(warning=True).values_list('id', flat=True))
+
+    def test_second_run_flags_nothing(self):
+        expired, soon = self.assign(self.employee, -3), self.assign(self.employee, 15)
+        self.assign(self.employee, 45)
+
+        sweep = sweep_expiry_warnings()
+        self.assertEqual((sweep.threshold_date, sweep.flagged, sweep.notified), (date.today() + WARNING_WINDOW, 2, 2))
+        self.assertEqual(self.flagged(), {expired.id, soon.id})
+        self.assertCountEqual(self.expiry_notifications(), [self.message(expired, 'expired'), self.message(soon)])
+
+        with self.assertNumQueries(6):  # no notification lookups when nothing crossed the watermark
+            sweep = sweep_expiry_warnings()
+        self.assertEqual((sweep.flagged, sweep.notified), (0, 0))
+        self.assertEqual(len(self.expiry_notifications()), 2)
+        self.assertEqual(ExpirySweep.objects.count(), 2)
+
+    def test_identical_messages_are_notified_once(self):
+        first, second = self.assign(self.employee, 10), self.assign(self.twin, 10)
+        already_notified = self.assign(self.employee, 20)
+        Notification.objects.create(message=self.message(already_notified))
+
+        sweep = sweep_expiry_warnings()
+        self.assertEqual((sweep.flagged, sweep.notified), (3, 1))
+        self.assertEqual(self.flagged(), {first.id, second.id, already_notified.id})
+        self.assertCountEqual(self.expiry_notifications(), [self.message(first), self.message(already_notified)])
+
+    def test_later_run_flags_only_newly_crossed_rows(self):
+        self.assign(self.employee, 15)
+        sweep_expiry_warnings()
+        crossing, later = self.assign(self.employee, 45), self.assign(self.employee, 90)
+        previously_flagged = self.flagged()
+
+        sweep = sweep_expiry_warnings(today=date.today() + timedelta(days=20))
+        self.assertEqual((sweep.threshold_date, sweep.flagged, sweep.notified), (date.today() + timedelta(days=50), 1, 1))
+        self.assertEqual(self.flagged(), previously_flagged | {crossing.id})
+        self.assertNotIn(later.id, self.flagged())
+        self.assertIn(self.message(crossing), self.expiry_notifications())
+
+    def test_management_command(self):
+        self.assign(self.employee, 15)
+        stdout = io.StringIO()
+        call_command('sweep_expiry_warnings', stdout=stdout)
+        self.assertIn("Flagged 1 trainings", stdout.getvalue())
+        self.assertIn("created 1 notifications", stdout.getvalue())
+
+
+class BulkSubTrainingAssignTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme, other_company = Company.objects.create(name="Acme"), Company.objects.create(name="Globex")
+        project = Project.objects.create(name="North")
+        cls.jane = hire(cls.acme, project, "Jane Doe", "GP00001")
+        cls.john = hire(cls.acme, project, "John Roe", "GP00002")
+        cls.outsider = hire(other_company, project, "Olga Lee", "GP00003")
+        cls.h2s = SubTraining.objects.create(
+            main_training=MainTraining.objects.create(name="Safety"), name="H2S", validity_period=timedelta(days=182),
+        )
+
+    def bulk_assign(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return APIClient().post(reverse('employee-sub-training-bulk-assign'), {'sub_training': self.h2s.pk, **payload}, format='json')
+
+    def test_skips_existing_assignments_and_reports_only_missing_employees(self):
+        EmployeeSubTraining.objects.create(employee=self.jane, sub_training=self.h2s)
+        missing_id = Employee.objects.order_by('-id').first().id + 1
+
+        response = self.bulk_assign({
+            'employees': [self.jane.pk, self.john.pk, self.outsider.pk, missing_id], 'company': self.acme.pk,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {
+            'sub_training': self.h2s.pk, 'created': 1, 'employees': [self.john.pk], 'unknown_employees': [missing_id],
+        })
+        self.assertEqual(EmployeeSubTraining.objects.filter(sub_training=self.h2s).count(), 2)
+        self.assertFalse(EmployeeSubTraining.objects.filter(employee=self.outsider).exists())
+
+        response = self.bulk_assign({'company': self.acme.pk})
+        self.assertEqual((response.json()['created'], response.json()['unknown_employees']), (0, []))
+
+    def test_computes_expiry_and_warning_from_the_start_date(self):
+        for employee, days_ago in ((self.jane, 170), (self.john, 0)):
+            start_date = date.today() - timedelta(days=days_ago)
+            response = self.bulk_assign({'employees': [employee.pk], 'start_date': start_date.strftime('%d-%m-%Y')})
+            self.assertEqual(response.json()['created'], 1)
+
+            training = EmployeeSubTraining.objects.get(employee=employee, sub_training=self.h2s)
+            self.assertEqual(training.start_date, start_date)
+            self.assertEqual(training.expiration_date, start_date + timedelta(days=182))
+            self.assertEqual(training.warning, days_ago == 170)
+
+    def test_refreshes_compliance_summaries(self):
+        EmployeeSubTraining.objects.create(
+            employee=self.jane, sub_training=SubTraining.objects.create(main_training=self.h2s.main_training, name="Induction"),
+        )
+        self.bulk_assign({'employees': [self.jane.pk, self.john.pk]})
+        summaries = {
+            summary.employee_id: summary
+            for summary in EmployeeComplianceSummary.objects.filter(employee__in=[self.jane, self.john])
+        }
+        self.assertEqual({employee_id: summary.total_trainings for employee_id, summary in summaries.items()},
+                         {self.jane.pk: 2, self.john.pk: 1})
+        self.assertEqual(summaries[self.john.pk].average_completion_percentage, 100.0)
+        self.assertEqual(summaries[self.john.pk].as_of, date.today())
+
+    def test_requires_employees_or_a_filter(self):
+        response = self.bulk_assign({})
+        self.assertEqual(response.status_code, 400)
+
+
+class EmployeeImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.project = Company.objects.create(name="Acme"), Project.objects.create(name="North")
+        cls.existing = hire(cls.company, cls.project, "Jane Doe", "GP00001")
+
+    def row(self, i, **fields):
+        return {
+            'fullname': f"Imported {i}", 'mobile_number': f"7000{i:06d}", 'designation': 'Roughneck',
+            'gate_pass_no': f"IM{i:05d}", 'rig_or_rigless': 'Rig',
+            'company_id': self.company.pk, 'project_id': self.project.pk, **fields,
+        }
+
+    def rejected(self, report):
+        return {error['row']: sorted(error['errors']) for error in report['errors']}
+
+    def upload(self, name, content):
+        return APIClient().post(reverse('employee-bulk-import'), {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def test_duplicates_within_a_chunk_across_chunks_and_in_the_database(self):
+        report = import_employees([
+            self.row(1),
+            self.row(2, gate_pass_no='IM00001'),
+            self.row(3, gate_pass_no=self.existing.gate_pass_no),
+            self.row(4, mobile_number=self.row(1)['mobile_number']),
+            self.row(5, mobile_number=self.existing.mobile_number, gate_pass_no=self.existing.gate_pass_no),
+            self.row(6),
+        ], chunk_size=2)
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(self.rejected(report), {
+            2: ['gate_pass_no'], 3: ['gate_pass_no'], 4: ['mobile_number'], 5: ['gate_pass_no', 'mobile_number'],
+        })
+        self.assertEqual(sorted(Employee.objects.filter(fullname__startswith="Imported").values_list('gate_pass_no', flat=True)),
+                         ['IM00001', 'IM00006'])
+
+    def test_unknown_company_or_project(self):
+        missing_company = Company.objects.order_by('-id').first().id + 1
+        missing_project = Project.objects.order_by('-id').first().id + 1
+        report = import_employees([
+            self.row(1, company_id=missing_company),
+            self.row(2, project_id=missing_project),
+            self.row(3, company_id=missing_company, project_id=missing_project),
+            self.row(4),
+        ])
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(self.rejected(report), {1: ['company_id'], 2: ['project_id'], 3: ['company_id', 'project_id']})
+        self.assertEqual(report['errors'][0]['errors']['company_id'], [f'Invalid pk "{missing_company}" - object does not exist.'])
+
+    def test_every_format_reports_rejected_rows_by_number(self):
+        def staff(first):
+            return [self.row(first), self.row(first + 1, fullname=''), self.row(first + 2, rig_or_rigless='Offshore'),
+                    self.row(first, fullname="Again")]
+
+        header = list(self.row(0))
+        files = {
+            'staff.csv': '\n'.join([','.join(header)] + [','.join(str(row[key]) for key in header) for row in staff(10)]),
+            'staff.json': json.dumps(staff(20), indent=2),
+            'staff.ndjson': '\n'.join(json.dumps(row) for row in staff(30)) + '\n',
+        }
+        for name, content in files.items():
+            with self.subTest(name=name):
+                response = self.upload(name, content.encode())
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['created'], 1)
+                self.assertEqual(self.rejected(response.json()), {
+                    2: ['fullname'], 3: ['rig_or_rigless'], 4: ['gate_pass_no', 'mobile_number'],
+                })
+
+    def test_unreadable_uploads_are_rejected(self):
+        for name, content in (('staff.json', b'{"fullname": "Not a list"}'), ('staff.json', b'[{"fullname": "Cut off"'),
+                              ('staff.xml', b'<staff/>')):
+            with self.subTest(name=name, content=content):
+                self.assertEqual(self.upload(name, content).status_code, 400)
+
+    def test_a_file_that_breaks_after_the_first_chunk_keeps_the_rows_before_it(self):
+        rows = [json.dumps(self.row(i)) for i in range(1, 600)]
+        rows[9] = json.dumps(self.row(10, fullname=''))
+        json_content = '[' + ', '.join(rows) + ', {"fullname": "Broken" "x"}]'
+        files = {
+            # Positions point into the whole file, not the buffer that was being decoded.
+            'staff.json': (json_content, f"at character {json_content.rindex('x') - 1} of the file"),
+            'staff.jsonl': ('\n'.join(rows) + '\n{"fullname": \n', "on line 600, column 15"),
+        }
+        for name, (content, position) in files.items():
+            with self.subTest(name=name):
+                with transaction.atomic():
+                    response = self.upload(name, content.encode())
+                    self.assertEqual(response.status_code, 200)
+                    report = response.json()
+                    self.assertEqual((report['created'], report['skipped']), (598, 1))
+                    self.assertEqual(self.rejected(report), {10: ['fullname']})
+                    self.assertEqual(report['file_error']['row'], 600)
+                    self.assertIn(position, report['file_error']['detail'])
+                    self.assertEqual(Employee.objects.filter(fullname__startswith="Imported").count(), 598)
+                    transaction.set_rollback(True)
+
+    def test_json_arrays_are_read_incrementally(self):
+        rows = [self.row(i, note="], {\"quoted\": [1, 2.5]}") for i in range(20)]
+        content = json.dumps(rows).encode()
+        self.assertEqual(list(iter_json_array(io.BytesIO(content), read_size=3)), rows)
+        self.assertEqual(list(read_rows(io.BytesIO(b'\xef\xbb\xbf [ ] '), 'json')), [])
+
+    def test_imported_employees_are_announced_and_searchable(self):
+        report = import_employees([self.row(i) for i in range(3)], chunk_size=2)
+        self.assertEqual(report, {'created': 3, 'skipped': 0, 'errors': [], 'file_error': None})
+        self.assertCountEqual(
+            Notification.objects.filter(message__startswith="New employee registered: Imported").values_list('message', flat=True),
+            [f"New employee registered: Imported {i}" for i in range(3)],
+        )
+        if search_index_available():
+            found = search_employees(Employee.objects.all(), {'fullname': 'imported'})
+            self.assertCountEqual(found.values_list('gate_pass_no', flat=True), ['IM00000', 'IM00001', 'IM00002'])
+            found = search_employees(Employee.objects.all(), {'gate_pass_no': 'IM00002'})
+            self.assertEqual(list(found.values_list('fullname', flat=True)), ["Imported 2"])
+
+
+@override_settings(NOTIFICATION_OUTBOX_ASYNC=True, NOTIFICATION_OUTBOX_BATCH_SIZE=3, NOTIFICATION_OUTBOX_FLUSH_INTERVAL=0.05)
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.outbox = NotificationOutbox()
+        self.addCleanup(self.outbox.stop)
+        self.writes = []
+        self.worker_writing, self.release_worker = threading.Event(), threading.Event()
+
+        def record(messages):
+            # The worker holds its first batch until released, so the queue fills up behind it.
+            if threading.current_thread() is self.outbox._worker and not self.worker_writing.is_set():
+                self.worker_writing.set()
+                self.release_worker.wait(timeout=5)
+            self.writes.append((threading.current_thread().name, list(messages)))
+
+        patcher = mock.patch.object(self.outbox, '_write', side_effect=record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def enqueue(self, messages):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.outbox.enqueue_many(messages)
+
+    def written(self):
+        return [message for _, batch in self.writes for message in batch]
+
+    def test_nothing_is_queued_before_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.outbox.enqueue("Rolled back")
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNone(self.outbox._worker)
+
+    def test_worker_writes_in_batches(self):
+        messages = [f"Message {i}" for i in range(10)]
+        self.enqueue(messages)
+        self.assertTrue(self.worker_writing.wait(timeout=5))
+        self.release_worker.set()
+        deadline = time.monotonic() + 5
+        while len(self.written()) < len(messages) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.written(), messages)
+        self.assertEqual({thread for thread, _ in self.writes}, {'notification-outbox'})
+        self.assertTrue(all(len(batch) <= 3 for _, batch in self.writes))
+        self.assertEqual(len(self.writes[1][1]), 3)
+
+    def test_stop_flushes_what_the_worker_left_behind(self):
+        messages = [f"Message {i}" for i in range(10)]
+        self.enqueue(messages)
+        self.assertTrue(self.worker_writing.wait(timeout=5))
+
+        threading.Timer(0.05, self.release_worker.set).start()
+        self.outbox.stop()  # registered with atexit for the real outbox
+        self.assertFalse(self.outbox._worker.is_alive())
+        self.assertEqual(self.written(), messages)
+        self.assertEqual(self.writes[-1][0], threading.current_thread().name)
+        self.assertEqual(self.outbox.flush(), 0)
+
+    @override_settings(NOTIFICATION_OUTBOX_MAX_SIZE=2)
+    def test_full_queue_makes_the_caller_write(self):
+        self.enqueue(["First"])
+        self.assertTrue(self.worker_writing.wait(timeout=5))
+
+        self.enqueue([f"Overflow {i}" for i in range(5)])
+        self.assertEqual(self.writes, [(threading.current_thread().name, [f"Overflow {i}" for i in range(5)])])
+        self.release_worker.set()
+        self.outbox.stop()
+        self.assertEqual(self.written(), [f"Overflow {i}" for i in range(5)] + ["First"])
+
+    def test_a_failed_batch_is_retried_before_newer_messages(self):
+        record, failures = self.outbox._write.side_effect, [OperationalError("database is locked")]
+
+        def flaky(messages):
+            if failures:
+                raise failures.pop()
+            record(messages)
+
+        self.outbox._write.side_effect = flaky
+        self.release_worker.set()
+        messages = [f"Message {i}" for i in range(5)]
+        with mock.patch('backed.outbox.close_old_connections') as close_old, self.assertLogs('backed.outbox', 'ERROR'):
+            self.enqueue(messages)
+            deadline = time.monotonic() + 5
+            while len(self.written()) < len(messages) and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(self.written(), messages)
+        self.assertEqual(self.writes[0][1], messages[:3])
+        self.assertGreaterEqual(close_old.call_count, 3)
+
+    def test_stop_writes_a_batch_the_worker_could_not(self):
+        self.outbox._write.side_effect = OperationalError("database is locked")
+        with self.assertLogs('backed.outbox', 'ERROR'):
+            self.enqueue(["Kept"])
+            deadline = time.monotonic() + 5
+            while not self.outbox._unwritten and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.outbox._write.side_effect = lambda messages: self.writes.append(('stop', list(messages)))
+        self.outbox.stop()
+        self.assertEqual(self.writes, [('stop', ["Kept"])])
+
+
+@override_settings(NOTIFICATION_OUTBOX_ASYNC=True, NOTIFICATION_OUTBOX_FLUSH_INTERVAL=0.05)
+class NotificationOutboxDatabaseTests(TransactionTestCase):
+    def test_worker_and_stop_write_notifications(self):
+        outbox = NotificationOutbox()
+        outbox.enqueue_many(f"Queued {i}" for i in range(5))
+        outbox.stop()
+        outbox.enqueue("After stop")
+        outbox.stop()
+        self.assertCountEqual(
+            Notification.objects.values_list('message', flat=True), [f"Queued {i}" for i in range(5)] + ["After stop"],
+        )
+
+
+class ComplianceAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(employees=24, main_trainings=3)
+
+    def loaders(self):
+        return [TrainingArrays, TrainingRows] if numpy_available else [TrainingRows]
+
+    def test_snapshots_match_the_sql_rollup_on_any_date(self):
+        for loader in self.loaders():
+            trainings = loader.load(chunk_size=7)
+            for as_of in (date.today(), date.today() + timedelta(days=45), date.today() - timedelta(days=400)):
+                with self.subTest(loader=loader.__name__, as_of=as_of):
+                    snapshot = trainings.snapshot(as_of)
+                    for group, rows in compliance_rollup(today=as_of).items():
+                        self.assertEqual(snapshot[group], rows)
+
+    def test_completion_matches_calculate_completion(self):
+        queryset = EmployeeSubTraining.objects.select_related('sub_training').order_by('id')
+        expected = [training.calculate_completion() for training in queryset]
+        self.assertEqual(TrainingRows.load(queryset).completion(date.today()), expected)
+        if numpy_available:
+            self.assertEqual(TrainingArrays.load(queryset).completion(date.today()).tolist(), expected)
+
+    @skipUnless(numpy_available, "compares against the NumPy implementation")
+    def test_pure_python_fallback_matches_numpy(self):
+        as_of = date.today() + timedelta(days=20)
+        self.assertEqual(TrainingRows.load().snapshot(as_of), TrainingArrays.load().snapshot(as_of))
+        self.assertEqual(TrainingRows.load(EmployeeSubTraining.objects.none()).snapshot(as_of),
+                         TrainingArrays.load(EmployeeSubTraining.objects.none()).snapshot(as_of))
+
+    def test_endpoint_returns_a_snapshot_per_date(self):
+        first_of_next_month = (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
+        for has_numpy in sorted({False, numpy_available}):
+            with self.subTest(numpy=has_numpy), mock.patch.dict('sys.modules', {} if has_numpy else {'numpy': None}):
+                response = APIClient().get(reverse('compliance-analytics'), {'as_of': [date.today(), first_of_next_month]})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([snapshot['as_of'] for snapshot in response.json()['snapshots']],
+                                 [date.today().isoformat(), first_of_next_month.isoformat()])
+
+
+class ComplianceRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.objects = seed_dataset(employees=24, main_trainings=3)
+
+    def expected_rollup(self, trainings):
+        """The rollup recomputed row by row from calculate_completion()."""
+        today = date.today()
+        owners = {
+            'companies': lambda training: training.employee.company,
+            'projects': lambda training: training.employee.project,
+            'main_trainings': lambda training: training.sub_training.main_training,
+        }
+        rollup = {}
+        for group, owner in owners.items():
+            buckets = {}
+            for training in trainings:
+                buckets.setdefault(owner(training), []).append(training)
+            rollup[group] = sorted((
+                {
+                    'id': parent.id,
+                    'name': parent.name,
+                    'average_completion_percentage': round(sum(t.calculate_completion() for t in rows) / len(rows), 2),
+                    'employees': len({t.employee_id for t in rows}),
+                    'total_trainings': len(rows),
+                    'expiring_trainings': sum(
+                        1 for t in rows if t.expiration_date and today <= t.expiration_date <= today + WARNING_WINDOW
+                    ),
+                    'expired_trainings': sum(1 for t in rows if t.expiration_date and t.expiration_date < today),
+                }
+                for parent, rows in buckets.items()
+            ), key=lambda row: (row['name'], row['id']))
+        return rollup
+
+    def trainings(self, **filters):
+        return list(EmployeeSubTraining.objects.filter(**filters).select_related(
+            'employee__company', 'employee__project', 'sub_training__main_training',
+        ))
+
+    def test_rollup_matches_calculate_completion(self):
+        expected = self.expected_rollup(self.trainings())
+        self.assertEqual(compliance_rollup(), expected)
+        self.assertTrue(any(row['expired_trainings'] for row in expected['companies']))
+        self.assertTrue(any(row['expiring_trainings'] for row in expected['main_trainings']))
+
+    def test_endpoint_filters(self):
+        company, project, main_training = (self.objects[key] for key in ('company', 'project', 'main_training'))
+        cases = [
+            ({'company': company.pk}, {'employee__company': company}),
+            ({'project': project.pk}, {'employee__project': project}),
+            ({'main_training': main_training.pk}, {'sub_training__main_training': main_training}),
+            ({'company': company.pk, 'main_training': main_training.pk},
+             {'employee__company': company, 'sub_training__main_training': main_training}),
+        ]
+        for params, filters in cases:
+            with self.subTest(params=params):
+                response = APIClient().get(reverse('compliance-rollup'), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), self.expected_rollup(self.trainings(**filters)))
+
+    def test_rollup_reads_trainings_only_through_covering_indexes(self):
+        with self.assertNumQueries(2) as queries:
+            compliance_rollup()
+        if connection.vendor != 'sqlite':
+            self.skipTest("Plan assertions are written against SQLite's EXPLAIN QUERY PLAN output.")
+        for query in queries.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plan = [row[-1] for row in cursor.fetchall()]
+            with self.subTest(sql=query['sql']):
+                training_steps = [step for step in plan if 'backed_employeesubtraining' in step]
+                self.assertTrue(training_steps)
+                self.assertTrue(all('COVERING INDEX' in step for step in training_steps), "\n".join(plan))
+
+    def test_endpoint_with_no_matching_trainings(self):
+        other_project = Project.objects.exclude(pk=self.objects['project'].pk).first()
+        response = APIClient().get(reverse('compliance-rollup'), {'company': self.objects['company'].pk, 'project': other_project.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'companies': [], 'projects': [], 'main_trainings': []})
+
+
+class ComplianceReportExportTests(TestCase):
+    HEADER = [
+        'Employee ID', 'Full name', 'Gate pass no', 'Designation', 'Company', 'Project', 'Main training',
+        'Sub training', 'Start date', 'Expiration date', 'Warning', 'Completion %',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.objects = seed_dataset(employees=12, main_trainings=2)
+
+    def export(self, **params):
+        return APIClient().get(reverse('compliance-report'), params)
+
+    def expected_rows(self, **filters):
+        trainings = EmployeeSubTraining.objects.filter(**filters).select_related(
+            'employee__company', 'employee__project', 'sub_training__main_training',
+        ).order_by('employee_id', 'id')
+        return [
+            [
+                training.employee_id, training.employee.fullname, training.employee.gate_pass_no,
+                training.employee.designation, training.employee.company.name, training.employee.project.name,
+                training.sub_training.main_training.name, training.sub_training.name,
+                training.start_date.strftime('%d-%m-%Y'),
+                training.expiration_date.strftime('%d-%m-%Y') if training.expiration_date else '',
+                training.warning, float(training.calculate_completion()),
+            ]
+            for training in trainings
+        ]
+
+    def csv_rows(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="compliance-report.csv"')
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_csv_has_a_header_and_one_row_per_training(self):
+        rows = self.csv_rows(self.export())
+        self.assertEqual(rows[0], self.HEADER)
+        expected = self.expected_rows()
+        self.assertEqual(rows[1:], [[str(value) for value in row] for row in expected])
+        self.assertIn('', [row[9] for row in rows[1:]])  # permanent trainings have no expiration date
+        self.assertEqual({row[10] for row in rows[1:]}, {'True', 'False'})
+
+    def test_csv_is_the_default_and_streams_from_one_query(self):
+        response = self.export(export='csv')
+        with self.assertNumQueries(1):
+            rows = self.csv_rows(response)
+        self.assertEqual(len(rows), EmployeeSubTraining.objects.count() + 1)
+
+    def test_filters(self):
+        company, project, main_training = (self.objects[key] for key in ('company', 'project', 'main_training'))
+        cases = [
+            ({'company': company.pk}, {'employee__company': company}),
+            ({'project': project.pk}, {'employee__project': project}),
+            ({'main_training': main_training.pk}, {'sub_training__main_training': main_training}),
+            ({'company': company.pk, 'main_training': main_training.pk},
+             {'employee__company': company, 'sub_training__main_training': main_training}),
+        ]
+        for params, filters in cases:
+            with self.subTest(params=params):
+                rows = self.csv_rows(self.export(**params))
+                self.assertEqual(rows[1:], [[str(value) for value in row] for row in self.expected_rows(**filters)])
+                self.assertTrue(rows[1:])
+
+        other_project = Project.objects.exclude(pk=project.pk).first()
+        self.assertEqual(self.csv_rows(self.export(company=company.pk, project=other_project.pk)), [self.HEADER])
+        self.assertEqual(self.export(company='acme').status_code, 400)
+
+    @skipUnless(openpyxl, "XLSX export needs openpyxl")
+    def test_xlsx(self):
+        response = self.export(export='xlsx', company=self.objects['company'].pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="compliance-report.xlsx"')
+
+        workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = [list(row) for row in workbook['Compliance'].iter_rows(values_only=True)]
+        self.assertEqual(rows[0], self.HEADER)
+        expected = self.expected_rows(employee__company=self.objects['company'])
+        self.assertEqual(rows[1:], [[None if value == '' else value for value in row] for row in expected])
+
+    def test_xlsx_without_openpyxl(self):
+        with mock.patch.dict('sys.modules', {'openpyxl': None}):
+            response = self.export(export='xlsx')
+        self.assertEqual(response.status_code, 501)
+
+    def test_unknown_export_type(self):
+        response = self.export(export='pdf')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': "export must be 'csv' or 'xlsx'."})
+
+
+class ExpiryTimelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.objects = seed_dataset(employees=30)
+
+    def expiring(self, start, end, **filters):
+        return EmployeeSubTraining.objects.filter(expiration_date__gte=start, expiration_date__lte=end, **filters)
+
+    def test_weekly_buckets_cover_the_range_and_add_up(self):
+        response = APIClient().get(reverse('expiry-timeline'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        start, end = date.fromisoformat(data['start']), date.fromisoformat(data['end'])
+        self.assertEqual(end - start, timedelta(days=183))
+
+        buckets = data['buckets']
+        self.assertEqual(buckets[0]['start'], data['start'])
+        self.assertEqual(buckets[-1]['end'], data['end'])
+        for previous, bucket in zip(buckets, buckets[1:]):
+            self.assertEqual(date.fromisoformat(bucket['start']), date.fromisoformat(previous['end']) + timedelta(days=1))
+            self.assertEqual(date.fromisoformat(bucket['start']).weekday(), 0)
+        for bucket in buckets:
+            self.assertEqual(bucket['total'], self.expiring(bucket['start'], bucket['end']).count())
+            self.assertEqual(bucket['total'], sum(row['count'] for row in bucket['main_trainings']))
+        self.assertEqual(data['total'], self.expiring(start, end).count())
+        self.assertGreater(data['total'], 0)
+
+    def test_monthly_buckets_respect_filters(self):
+        main_training = self.objects['main_training']
+        response = APIClient().get(reverse('expiry-timeline'), {
+            'interval': 'month', 'main_training': main_training.pk, 'company': self.objects['company'].pk,
+        })
+        buckets = response.json()['buckets']
+        self.assertTrue(all(date.fromisoformat(bucket['start']).day == 1 for bucket in buckets[1:]))
+        for bucket in buckets:
+            self.assertEqual([row['id'] for row in bucket['main_trainings']], [main_training.pk] if bucket['total'] else [])
+            self.assertEqual(bucket['total'], self.expiring(
+                bucket['start'], bucket['end'],
+                sub_training__main_training=main_training, employee__company=self.objects['company'],
+            ).count())
+
+    def test_drill_down_links_page_through_the_bucket(self):
+        client = APIClient()
+        buckets = client.get(reverse('expiry-timeline'), {'interval': 'month', 'page_size': 2}).json()['buckets']
+        bucket = max(buckets, key=lambda bucket: bucket['total'])
+        for url, count in [(bucket['trainings'], bucket['total'])] + [
+            (row['trainings'], row['count']) for row in bucket['main_trainings']
+        ]:
+            rows = []
+            while url:
+                page = client.get(url).json()
+                rows += [(row['employee'], row['sub_training']) for row in page['results']]
+                url = page['next']
+            self.assertEqual(len(rows), count)
+            self.assertEqual(len(set(rows)), count)
+        self.assertTrue(all(bucket['trainings'] is None for bucket in buckets if not bucket['total']))
+
+    def test_rejects_inverted_or_oversized_ranges(self):
+        client = APIClient()
+        today = date.today()
+        self.assertEqual(client.get(reverse('expiry-timeline'), {'start': today, 'end': today - timedelta(days=1)}).status_code, 400)
+        self.assertEqual(client.get(reverse('expiry-timeline'), {'start': today, 'end': today + timedelta(days=800)}).status_code, 400)
@@ -0,0 +1,110 @@
+# thumbnails.py
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .cache import invalidate_employee_profiles
+
+logger = logging.getLogger(__name__)
+
+# Pre-rendered sizes: model field -> longest edge in pixels. The original is kept as uploaded.
+THUMBNAIL_SIZES = {
+    'profile_photo_avatar': 96,
+    'profile_photo_card': 480,
+}
+
+_executor = None
+
+
+def _thumbnail_stem(photo_name):
+    return os.path.splitext(os.path.basename(photo_name))[0]
+
+
+def thumbnails_stale(employee):
+    """True when the employee has a photo that is newly assigned or missing any pre-rendered size."""
+    photo = employee.profile_photo
+    if not photo:
+        return False
+    return not photo._committed or not all(getattr(employee, field) for field in THUMBNAIL_SIZES)
+
+
+def render_thumbnails(employee_id, photo_name):
+    from .models import Employee
+
+    storage = Employee._meta.get_field('profile_photo').storage
+    stem = _thumbnail_stem(photo_name)
+    with storage.open(photo_name) as photo:
+        image = ImageOps.exif_transpose(Image.open(photo))
+        image = image.convert('RGB')
+
+    names = {}
+    for field, edge in THUMBNAIL_SIZES.items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail((edge, edge), Image.LANCZOS)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, 'JPEG', quality=85, optimize=True)
+        upload_to = Employee._meta.get_field(field).upload_to
+        names[field] = storage.save(f'{upload_to}{stem}_{edge}.jpg', ContentFile(buffer.getvalue()))
+
+    # Only attach if the employee still has the photo these were rendered from; update() skips signals.
+    if Employee.objects.filter(pk=employee_id, profile_photo=photo_name).update(**names):
+        invalidate_employee_profiles([employee_id])
+    return names
+
+
+def _render_logged(employee_id, photo_name):
+    try:
+        render_thumbnails(employee_id, photo_name)
+    except Exception:
+        logger.exception("Could not render thumbnails for employee %s (%s)", employee_id, photo_name)
+
+
+def _render_in_worker(employee_id, photo_name):
+    try:
+        _render_logged(employee_id, photo_name)
+    finally:
+        connection.close()
+
+
+def schedule_thumbnails(employee):
+    """Render thumbnails for the employee's current photo in the worker pool (inline with THUMBNAIL_WORKERS = 0)."""
+    global _executor
+
+    workers = getattr(settings, 'THUMBNAIL_WORKERS', 2)
+    employee_id, photo_name = employee.pk, employee.profile_photo.name
+    if not workers:
+        _render_logged(employee_id, photo_name)
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnails')
+    transaction.on_commit(lambda: _executor.submit(_render_in_worker, employee_id, photo_name))
+
+
+def backfill_thumbnails(rerender=False):
+    """Render the sizes of every photo missing one (every photo with ``rerender``); returns (rendered, failed)."""
+    from .models import Employee
+
+    employees = Employee.objects.exclude(profile_photo__isnull=True).exclude(profile_photo='')
+    if not rerender:
+        missing = Q()
+        for field in THUMBNAIL_SIZES:
+            missing |= Q(**{f'{field}__isnull': True}) | Q(**{field: ''})
+        employees = employees.filter(missing)
+
+    rendered = failed = 0
+    for employee_id, photo_name in list(employees.order_by('id').values_list('id', 'profile_photo')):
+        try:
+            render_thumbnails(employee_id, photo_name)
+        except Exception:
+            logger.exception("Could not render thumbnails for employee %s (%s)", employee_id, photo_name)
+            failed += 1
+        else:
+            rendered += 1
+    return rendered, failed
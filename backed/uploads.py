@@ -0,0 +1,116 @@
+# uploads.py
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PhotoUploadSession
+
+# Bytes read from the request body per write, so a chunk never sits in memory whole.
+READ_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, expected):
+        super().__init__(f"Upload is at offset {expected}.")
+        self.expected = expected
+
+
+def _temp_dir():
+    return getattr(settings, 'PHOTO_UPLOAD_TEMP_DIR', None) or os.path.join(settings.BASE_DIR, 'upload_sessions')
+
+
+def session_path(session):
+    return os.path.join(_temp_dir(), f'{session.pk}.part')
+
+
+def start_upload(employee, filename, size):
+    session = PhotoUploadSession.objects.create(employee=employee, filename=os.path.basename(filename), size=size)
+    os.makedirs(_temp_dir(), exist_ok=True)
+    open(session_path(session), 'wb').close()
+    return session
+
+
+def _chunk_timeout():
+    return timedelta(seconds=getattr(settings, 'PHOTO_UPLOAD_CHUNK_TIMEOUT', 10 * 60))
+
+
+def append_chunk(session, offset, stream, length):
+    """Write ``length`` bytes from ``stream`` at ``offset``, which must be where the session left off.
+
+    Bytes are streamed to disk as they arrive. If the connection drops mid-chunk, whatever reached the
+    disk is kept and the session offset says where the client has to resume from.
+
+    Concurrent requests are serialized with a conditional UPDATE that claims the session (still at
+    ``offset``, nobody else writing) before the file is touched, so no database lock is held while the
+    body arrives. The request that loses gets UploadOffsetMismatch; the claim of a request that died
+    mid-chunk lapses after PHOTO_UPLOAD_CHUNK_TIMEOUT seconds.
+    """
+    claimed_at = timezone.now()
+    claimed = PhotoUploadSession.objects.filter(pk=session.pk, offset=offset).filter(
+        Q(writing_since__isnull=True) | Q(writing_since__lt=claimed_at - _chunk_timeout())
+    ).update(writing_since=claimed_at)
+    if not claimed:
+        session.refresh_from_db(fields=['offset', 'writing_since', 'updated_at'])
+        raise UploadOffsetMismatch(session.offset)
+    length = min(length, session.size - offset)
+
+    written = 0
+    try:
+        with open(session_path(session), 'r+b') as part:
+            # Drop anything past the recorded offset, e.g. from a write that crashed before it was recorded.
+            part.seek(offset)
+            part.truncate()
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break
+                part.write(data)
+                written += len(data)
+    finally:
+        # Record what reached the disk and release the claim, unless it lapsed and another request took over.
+        now = timezone.now()
+        released = PhotoUploadSession.objects.filter(pk=session.pk, writing_since=claimed_at).update(
+            offset=offset + written, writing_since=None, updated_at=now,
+        )
+        if released:
+            session.offset, session.writing_since, session.updated_at = offset + written, None, now
+        else:
+            session.refresh_from_db(fields=['offset', 'writing_since', 'updated_at'])
+    return written
+
+
+class UploadedPart(File):
+    """A finished upload on disk. Exposing its path lets image validation read it in place and
+    FileSystemStorage move it into MEDIA_ROOT instead of copying it."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def uploaded_file(session):
+    """The finished upload, named after the client's original filename; the caller closes it."""
+    return UploadedPart(open(session_path(session), 'rb'), name=session.filename)
+
+
+def discard_upload(session):
+    try:
+        os.remove(session_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def expire_upload_sessions(now=None):
+    """Remove sessions untouched for PHOTO_UPLOAD_SESSION_TTL seconds, with their partial files."""
+    now = now or timezone.now()
+    ttl = getattr(settings, 'PHOTO_UPLOAD_SESSION_TTL', 24 * 60 * 60)
+    stale = PhotoUploadSession.objects.filter(updated_at__lt=now - timedelta(seconds=ttl))
+    count = 0
+    for session in stale.iterator():
+        discard_upload(session)
+        count += 1
+    return count
@@ -1,5 +1,5 @@
 from django.urls import path
-from backed import views
+from backed import views, async_views
 from .views import EmployeeLoginView
 
 
@@ -14,8 +14,13 @@ urlpatterns = [
     path('register-employees/', views.EmployeeListCreateView.as_view(), name='employee-list-create'),
     path('employees/<int:pk>/', views.EmployeeRetrieveUpdateDestroyView.as_view(), name='employee-detail'),
     path('employees/', views.EmployeeListView.as_view(), name='employee-list'),
+    path('employees/bulk-import/', views.EmployeeBulkImportView.as_view(), name='employee-bulk-import'),
     path('employees-login/', EmployeeLoginView, name='employee-login'),
+    path('employees/me/', views.EmployeeMeView.as_view(), name='employee-me'),
     path('employees/<int:pk>/update-photo/', views.EmployeeUpdatePhotoView.as_view(), name='employee-update-photo'),
+    path('employees/<int:pk>/photo-uploads/', views.EmployeePhotoUploadStartView.as_view(), name='employee-photo-upload'),
+    path('photo-uploads/<uuid:upload_id>/', views.PhotoUploadSessionView.as_view(), name='photo-upload-detail'),
+    path('photo-uploads/<uuid:upload_id>/commit/', views.PhotoUploadCommitView.as_view(), name='photo-upload-commit'),
     path('employees/<int:pk>/accept-reject/', views.AcceptRejectEmployeeView.as_view(), name='accept-reject-employee'),
     path('employees-accepted/', views.AcceptedEmployeeListView.as_view(), name='accepted-employee-list'),
     path('employees-not-accepted/', views.NotAcceptedEmployeeListView.as_view(), name='not-accepted-employee-list'),
@@ -23,10 +28,15 @@ urlpatterns = [
     path('employees/on-duty/', views.OnDutyEmployeeListView.as_view(), name='on-duty-employees'),
     path('employees/off-duty/', views.OfDutyEmployeeListView.as_view(), name='of-duty-employees'),
     path('employees/search/', views.EmployeeSearchAPIView.as_view(), name='employee-search'),
+    path('employees/autocomplete/', views.EmployeeAutocompleteView.as_view(), name='employee-autocomplete'),
     path('employeetrainingpercentage/<int:employee_id>/', views.EmployeeSubTrainingListView.as_view(), name='employee-sub-trainings'),
     path('employee/<int:employee_id>/main-training/<int:main_training_id>/', views.EmployeeMainTrainingDetailView.as_view(), name='employee-main-training-detail'),
     path('employees/<int:employee_id>/average-completion-percentage/', views.AverageCompletionPercentageView.as_view(), name='average-completion-percentage'),
     path('employee/<int:employee_id>/main-training/<int:main_training_id>/average/', views.EmployeeMainTrainingAverageView.as_view(), name='employee-main-training-average'),
+    path('compliance-rollup/', views.ComplianceRollupView.as_view(), name='compliance-rollup'),
+    path('compliance-analytics/', views.ComplianceAnalyticsView.as_view(), name='compliance-analytics'),
+    path('compliance-report/', views.ComplianceReportExportView.as_view(), name='compliance-report'),
+    path('expiry-timeline/', views.ExpiryTimelineView.as_view(), name='expiry-timeline'),
 
     
     
@@ -45,6 +55,7 @@ urlpatterns = [
 
     # Employee SubTraining URLs
     path('employee-sub-trainings/', views.EmployeeSubTrainingListCreateView.as_view(), name='employee-sub-training-list-create'),
+    path('employee-sub-trainings/bulk-assign/', views.EmployeeSubTrainingBulkAssignView.as_view(), name='employee-sub-training-bulk-assign'),
     path('employee-sub-trainings/<int:pk>/', views.EmployeeSubTrainingRetrieveUpdateDestroyView.as_view(), name='employee-sub-training-detail'),
     path('employees/<int:employee_id>/subtrainings/<int:subtraining_id>/', views.EmployeeSubTrainingDeleteView.as_view(), name='employee-subtraining-delete'),
 
@@ -60,9 +71,22 @@ urlpatterns = [
     path('delprojects/<int:pk>/', views.ProjectDeleteView.as_view(), name='project-delete'),
 
     path('notifications/', views.NotificationListView.as_view(), name='notification-list'),
+    path('notifications/stream/', views.NotificationStreamView, name='notification-stream'),
     path('del-notifications/<int:pk>/', views.NotificationDetailView.as_view(), name='notification-detail'),
 
 
+    # Async versions of the read-heavy endpoints (same payloads), for ASGI deployments
+    path('async/employees/', async_views.AsyncEmployeeListView.as_view(), name='async-employee-list'),
+    path('async/employees-accepted/', async_views.AsyncAcceptedEmployeeListView.as_view(), name='async-accepted-employee-list'),
+    path('async/employees-not-accepted/', async_views.AsyncNotAcceptedEmployeeListView.as_view(), name='async-not-accepted-employee-list'),
+    path('async/employees/on-duty/', async_views.AsyncOnDutyEmployeeListView.as_view(), name='async-on-duty-employees'),
+    path('async/employees/off-duty/', async_views.AsyncOffDutyEmployeeListView.as_view(), name='async-of-duty-employees'),
+    path('async/employeetrainingpercentage/<int:employee_id>/', async_views.AsyncEmployeeSubTrainingListView.as_view(), name='async-employee-sub-trainings'),
+    path('async/employees/<int:employee_id>/average-completion-percentage/', async_views.AsyncAverageCompletionPercentageView.as_view(), name='async-average-completion-percentage'),
+    path('async/employee/<int:employee_id>/main-training/<int:main_training_id>/average/', async_views.AsyncEmployeeMainTrainingAverageView.as_view(), name='async-employee-main-training-average'),
+    path('async/notifications/', async_views.AsyncNotificationListView.as_view(), name='async-notification-list'),
+
+
 
 
 
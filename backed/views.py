@@ -1,18 +1,57 @@
 # backed/views.py
 
+import asyncio
+import json
+import mimetypes
+import os
+import re
+from datetime import date
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.decorators import api_view
+from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from .models import Company, Employee,MainTraining, SubTraining,EmployeeSubTraining,Project,Notification
+from django.urls import reverse
+from .models import Company, Employee,MainTraining, SubTraining,EmployeeSubTraining,Project,Notification,PhotoUploadSession
 from .serializers import CompanySerializer, EmployeeSerializer, EmployeePhotoSerializer,MainTrainingCreateUpdateSerializer,MainTrainingSerializer,SubTrainingSerializer\
 ,EmployeeSubTrainingSerializer,AdminLoginSerializer,ProjectsSerializer,AcceptRejectEmployeeSerializer,OnDutyOffDutyToggleSerializer,EmployeePercentageSubTrainingSerializer\
 ,MainTrainingsSerializer,SubTrainingWithMainNameSerializer,MainTrainingWithSubSerializer,EmployeeSearchSerializer,EmployeeMainTrainingSerializer,NotificationSerializer\
-,AverageCompletionPercentageSerializer,AveragePercentageSerializer,SubTrainingUpdateSerializer
+,AverageCompletionPercentageSerializer,AveragePercentageSerializer,SubTrainingUpdateSerializer,ComplianceGroupSerializer\
+,ComplianceFilterSerializer,EmployeeAutocompleteSerializer,BulkSubTrainingAssignSerializer,NotificationFeedSerializer\
+,PhotoUploadStartSerializer,PhotoUploadSessionSerializer,ComplianceAnalyticsFilterSerializer,ExpiryTimelineFilterSerializer
 from rest_framework.views import APIView
 from django.contrib.auth import login
-from .filters import EmployeeFilter
+from .filters import EmployeeFilter, EmployeeSubTrainingFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from django.http import Http404, StreamingHttpResponse, FileResponse, HttpResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+from django.db.models import Avg, Count, Max
+from .search import SEARCH_FIELDS, search_employees, autocomplete_employees
+from .reports import csv_report, xlsx_report
+from .imports import import_employees, read_rows, file_format_for
+from .pagination import OptionalCursorPagination, NotificationCursorPagination
+from .cache import ReferenceCacheMixin, get_employee_profile
+from .authentication import EmployeeTokenAuthentication, issue_employee_token
+from .compliance import get_compliance_summary, compliance_rollup, assign_sub_training, filter_trainings, expiry_timeline
+from .analytics import compliance_trend
+from .fast import FastListMixin, FastJSONRenderer, EMPLOYEE_VALUES, EMPLOYEE_TRAINING_VALUES, employee_mapper, employee_training_mapper
+from .uploads import UploadOffsetMismatch, start_upload, append_chunk, uploaded_file, discard_upload
+
+# Server-sent events: how often the stream checks for new rows, how long it may stay silent, and how long
+# it may stay open. Django (4.2) does not notice a client going away mid-response, so every stream ends
+# after NOTIFICATION_STREAM_MAX_AGE and the browser reconnects with Last-Event-ID.
+NOTIFICATION_STREAM_POLL_INTERVAL = 1.0
+NOTIFICATION_STREAM_HEARTBEAT = 15.0
+NOTIFICATION_STREAM_MAX_AGE = 300.0
+
+# Files written by ContentAddressedStorage: the name is the SHA-256 of the content.
+CONTENT_ADDRESSED_NAME = re.compile(r'(?:^|/)([0-9a-f]{64})\.\w+$')
 
 # Company Views
 class CompanyListCreateView(generics.ListCreateAPIView):
@@ -25,11 +64,12 @@ class CompanyRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 
 # Employee Views
 class EmployeeListCreateView(generics.ListCreateAPIView):
-    queryset = Employee.objects.all()
+    queryset = Employee.objects.select_related('company', 'project')
     serializer_class = EmployeeSerializer
+    pagination_class = OptionalCursorPagination
 
 class EmployeeRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Employee.objects.all()
+    queryset = Employee.objects.select_related('company', 'project')
     serializer_class = EmployeeSerializer
 
 @api_view(['POST'])
@@ -46,34 +86,128 @@ def EmployeeLoginView(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    try:
-        employee = get_object_or_404(Employee, fullname=fullname, mobile_number=mobile_number)
-        serializer = EmployeeSerializer(employee)
-        return Response(
-            {
-                "status": True,
-                "message": "Login successful",
-                "data": serializer.data
-            },
-            status=status.HTTP_200_OK
-        )
-    except Exception as e:
+    # mobile_number is unique, so this is a single index lookup; the name is then checked in Python.
+    employee = Employee.objects.select_related('company', 'project').filter(mobile_number=mobile_number).first()
+    if employee is None or employee.fullname != fullname:
         return Response(
             {
                 "status": False,
-                "error": str(e)
+                "error": "No Employee matches the given query."
             },
             status=status.HTTP_404_NOT_FOUND
         )
 
+    return Response(
+        {
+            "status": True,
+            "message": "Login successful",
+            "token": issue_employee_token(employee),
+            "data": get_employee_profile(employee.pk, employee)
+        },
+        status=status.HTTP_200_OK
+    )
+
+class EmployeeMeView(APIView):
+    """Profile of the employee holding the token; served from cache without touching the database."""
+    authentication_classes = [EmployeeTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        profile = get_employee_profile(request.user.employee_id)
+        if profile is None:
+            raise Http404
+        return Response(profile, status=status.HTTP_200_OK)
+
+class EmployeeBulkImportView(APIView):
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is not None:
+            rows = read_rows(upload.file, file_format_for(upload.name))
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response({"detail": "Upload a CSV/JSON 'file' or post a JSON list of employees."}, status=status.HTTP_400_BAD_REQUEST)
+        report = import_employees(rows)
+        file_error = report['file_error']
+        if file_error and file_error['row'] == 1:
+            # Nothing could be read at all; a failure further in still returns what was imported.
+            return Response({"detail": f"Could not read import: {file_error['detail']}", **report}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
 class EmployeeUpdatePhotoView(generics.UpdateAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeePhotoSerializer
 
-
-class MainTrainingListCreateView(generics.ListCreateAPIView):
+class EmployeePhotoUploadStartView(APIView):
+    """Open a resumable upload: POST {filename, size}, then PUT the bytes to the returned session."""
+    def post(self, request, pk, *args, **kwargs):
+        employee = get_object_or_404(Employee, pk=pk)
+        serializer = PhotoUploadStartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = start_upload(employee, **serializer.validated_data)
+        response = Response(PhotoUploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+        response['Location'] = reverse('photo-upload-detail', kwargs={'upload_id': session.pk})
+        response['Upload-Offset'] = session.offset
+        return response
+
+class PhotoUploadSessionView(APIView):
+    """GET reports how many bytes arrived; PUT appends a chunk sent as the raw body with an
+    ``Upload-Offset`` header equal to that count; DELETE abandons the upload."""
+    def get_session(self, upload_id):
+        return get_object_or_404(PhotoUploadSession, pk=upload_id)
+
+    def session_response(self, session, status_code=status.HTTP_200_OK):
+        response = Response(PhotoUploadSessionSerializer(session).data, status=status_code)
+        response['Upload-Offset'] = session.offset
+        return response
+
+    def get(self, request, upload_id, *args, **kwargs):
+        return self.session_response(self.get_session(upload_id))
+
+    def put(self, request, upload_id, *args, **kwargs):
+        session = self.get_session(upload_id)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response({"detail": "Upload-Offset and Content-Length headers are required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # request.stream reads the body straight from the connection; request.data would buffer it.
+            append_chunk(session, offset, request.stream, length)
+        except UploadOffsetMismatch:
+            return self.session_response(session, status.HTTP_409_CONFLICT)
+        return self.session_response(session)
+
+    def delete(self, request, upload_id, *args, **kwargs):
+        discard_upload(self.get_session(upload_id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class PhotoUploadCommitView(APIView):
+    """Attach a fully uploaded file to the employee's profile_photo and close the session."""
+    def post(self, request, upload_id, *args, **kwargs):
+        session = get_object_or_404(PhotoUploadSession.objects.select_related('employee'), pk=upload_id)
+        if session.offset < session.size:
+            response = Response(
+                {"detail": f"Upload incomplete: {session.offset} of {session.size} bytes received."},
+                status=status.HTTP_409_CONFLICT,
+            )
+            response['Upload-Offset'] = session.offset
+            return response
+        with uploaded_file(session) as photo:
+            serializer = EmployeePhotoSerializer(session.employee, data={'profile_photo': photo}, context={'request': request})
+            valid = serializer.is_valid()
+            if valid:
+                serializer.save()
+        discard_upload(session)
+        if not valid:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class MainTrainingListCreateView(ReferenceCacheMixin, generics.ListCreateAPIView):
     queryset = MainTraining.objects.all()
     serializer_class = MainTrainingCreateUpdateSerializer
+    reference_models = (MainTraining,)
 
 class MainTrainingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = MainTraining.objects.all()
@@ -95,6 +229,25 @@ class EmployeeSubTrainingListCreateView(generics.ListCreateAPIView):
     queryset = EmployeeSubTraining.objects.all()
     serializer_class = EmployeeSubTrainingSerializer
 
+class EmployeeSubTrainingBulkAssignView(APIView):
+    def post(self, request, *args, **kwargs):
+        serializer = BulkSubTrainingAssignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        employees = serializer.get_employees()
+        requested = serializer.validated_data.get('employees', [])
+
+        created_ids = assign_sub_training(
+            serializer.validated_data['sub_training'], employees, serializer.validated_data['start_date']
+        )
+        # Ids outside the company/project filter exist, they just aren't selected; only missing ids are unknown.
+        unknown = sorted(set(requested) - set(Employee.objects.filter(id__in=requested).values_list('id', flat=True)))
+        return Response({
+            "sub_training": serializer.validated_data['sub_training'].id,
+            "created": len(created_ids),
+            "employees": created_ids,
+            "unknown_employees": unknown,
+        }, status=status.HTTP_201_CREATED)
+
 class EmployeeSubTrainingDeleteView(generics.DestroyAPIView):
     serializer_class = EmployeeSubTrainingSerializer
     lookup_url_kwarg = 'subtraining_id'
@@ -122,7 +275,7 @@ class EmployeeSubTrainingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestro
 
 # Retrieve a single employee by ID
 class EmployeeDetailView(generics.RetrieveAPIView):
-    queryset = Employee.objects.all()
+    queryset = Employee.objects.select_related('company', 'project')
     serializer_class = EmployeeSerializer
 
 # List all companies with their names and IDs
@@ -155,42 +308,56 @@ class MainTrainingWithSubTrainingsListView(generics.ListAPIView):
 class EmployeeSubTrainingListCreateView(generics.ListCreateAPIView):
     queryset = EmployeeSubTraining.objects.all()
     serializer_class = EmployeeSubTrainingSerializer
+    pagination_class = OptionalCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EmployeeSubTrainingFilter
+
+def average_completion_payload(summary):
+    """Body and status for an employee's compliance summary, shared with the async view."""
+    if summary is None:
+        return {"detail": "Not found."}, status.HTTP_404_NOT_FOUND
+    if not summary.total_trainings:
+        return {"detail": "No sub-trainings found for this employee."}, status.HTTP_404_NOT_FOUND
+
+    serializer = AverageCompletionPercentageSerializer(data={
+        'employee_id': summary.employee_id,
+        'average_completion_percentage': summary.average_completion_percentage,
+        'total_trainings': summary.total_trainings,
+        'valid_trainings': summary.valid_trainings,
+        'warning_trainings': summary.warning_trainings,
+        'expired_trainings': summary.expired_trainings,
+    })
+    if serializer.is_valid():
+        return serializer.data, status.HTTP_200_OK
+    return serializer.errors, status.HTTP_400_BAD_REQUEST
+
 
 class AverageCompletionPercentageView(APIView):
     def get(self, request, employee_id):
-        employee = get_object_or_404(Employee, id=employee_id)
-        sub_trainings = EmployeeSubTraining.objects.filter(employee=employee)
-
-        if not sub_trainings.exists():
-            return Response({"detail": "No sub-trainings found for this employee."}, status=status.HTTP_404_NOT_FOUND)
-
-        total_percentage = sum([sub_training.calculate_completion() for sub_training in sub_trainings])
-        average_percentage = total_percentage / sub_trainings.count()
-
-        data = {
-            'employee_id': employee.id,
-            'average_completion_percentage': round(average_percentage, 2)
-        }
-
-        serializer = AverageCompletionPercentageSerializer(data=data)
-        if serializer.is_valid():
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data, status_code = average_completion_payload(get_compliance_summary(employee_id))
+        return Response(data, status=status_code)
 
 # Retrieve, update, or delete a single employee sub-training by ID
 class EmployeeSubTrainingRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = EmployeeSubTraining.objects.all()
     serializer_class = EmployeeSubTrainingSerializer
 
-class EmployeeSubTrainingListView(generics.ListAPIView):
+class EmployeeSubTrainingListView(FastListMixin, generics.ListAPIView):
     serializer_class = EmployeePercentageSubTrainingSerializer
+    pagination_class = OptionalCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    fast_values = EMPLOYEE_TRAINING_VALUES
+    fast_mapper = staticmethod(employee_training_mapper)
 
     def get_queryset(self):
         employee_id = self.kwargs['employee_id']
-        return EmployeeSubTraining.objects.filter(employee__id=employee_id)
+        return EmployeeSubTraining.objects.filter(employee__id=employee_id).select_related(
+            'employee', 'sub_training__main_training'
+        ).with_completion()
 
 class EmployeeMainTrainingDetailView(generics.ListAPIView):
     serializer_class = EmployeeMainTrainingSerializer
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         employee_id = self.kwargs['employee_id']
@@ -198,31 +365,105 @@ class EmployeeMainTrainingDetailView(generics.ListAPIView):
         return EmployeeSubTraining.objects.filter(
             employee__id=employee_id,
             sub_training__main_training__id=main_training_id
-        )
+        ).select_related('employee', 'sub_training__main_training').with_completion()
 
 class EmployeeMainTrainingAverageView(APIView):
 
     def get(self, request, employee_id, main_training_id):
-        sub_trainings = EmployeeSubTraining.objects.filter(
+        totals = EmployeeSubTraining.objects.filter(
             employee__id=employee_id,
             sub_training__main_training__id=main_training_id
+        ).with_completion().aggregate(
+            count=Count('id'),
+            average_percentage=Avg('completion_percentage'),
+            main_training_name=Max('sub_training__main_training__name'),
         )
 
-        if not sub_trainings.exists():
+        if not totals['count']:
             return Response({'error': 'No sub-trainings found for the given employee and main training'}, status=status.HTTP_404_NOT_FOUND)
 
-        total_percentage = sum(sub_training.calculate_completion() for sub_training in sub_trainings)
-        average_percentage = total_percentage / sub_trainings.count()
-
         data = {
-            'main_training_name': sub_trainings.first().sub_training.main_training.name,
-            'average_percentage': round(average_percentage, 2)
+            'main_training_name': totals['main_training_name'],
+            'average_percentage': round(totals['average_percentage'], 2)
         }
         serializer = AveragePercentageSerializer(data=data)
         if serializer.is_valid():
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class ComplianceRollupView(APIView):
+    def get(self, request):
+        filters = ComplianceFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filter_trainings(EmployeeSubTraining.objects.all(), **filters.validated_data)
+
+        rollup = compliance_rollup(queryset)
+        return Response({
+            group: ComplianceGroupSerializer(rows, many=True).data
+            for group, rows in rollup.items()
+        }, status=status.HTTP_200_OK)
+
+class ComplianceAnalyticsView(APIView):
+    """Compliance snapshots for one or more as-of dates (repeat ``as_of``), past or future."""
+    def get(self, request):
+        filters = ComplianceAnalyticsFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        dates = filters.validated_data.pop('as_of', None) or [date.today()]
+        queryset = filter_trainings(EmployeeSubTraining.objects.all(), **filters.validated_data)
+        return Response({'snapshots': compliance_trend(dates, queryset)}, status=status.HTTP_200_OK)
+
+class ExpiryTimelineView(APIView):
+    """Upcoming expirations per week or month and main training, with drill-down links into
+    employee-sub-trainings/ (cursor-paginated by ``page_size``) for every non-empty count."""
+    def get(self, request):
+        filters = ExpiryTimelineFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        options = dict(filters.validated_data)
+        interval, start, end, page_size = (options.pop(key) for key in ('interval', 'start', 'end', 'page_size'))
+        timeline = expiry_timeline(filter_trainings(EmployeeSubTraining.objects.all(), **options), start, end, interval)
+
+        list_url = request.build_absolute_uri(reverse('employee-sub-training-list-create'))
+
+        def drill_down(bucket, count, **extra):
+            if not count:
+                return None
+            params = {**options, **extra, 'expiration_date_after': bucket['start'],
+                      'expiration_date_before': bucket['end'], 'page_size': page_size}
+            return f"{list_url}?{urlencode(params)}"
+
+        for bucket in timeline:
+            bucket['trainings'] = drill_down(bucket, bucket['total'])
+            for row in bucket['main_trainings']:
+                row['trainings'] = drill_down(bucket, row['count'], main_training=row['id'])
+        return Response({
+            'interval': interval,
+            'start': start,
+            'end': end,
+            'total': sum(bucket['total'] for bucket in timeline),
+            'buckets': timeline,
+        }, status=status.HTTP_200_OK)
+
+class ComplianceReportExportView(APIView):
+    def get(self, request):
+        filters = ComplianceFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filter_trainings(EmployeeSubTraining.objects.all(), **filters.validated_data)
+
+        export = request.query_params.get('export', 'csv')
+        if export == 'csv':
+            response = StreamingHttpResponse(csv_report(queryset), content_type='text/csv')
+        elif export == 'xlsx':
+            try:
+                report = xlsx_report(queryset)
+            except ImportError:
+                return Response({"detail": "XLSX export requires the openpyxl package."}, status=status.HTTP_501_NOT_IMPLEMENTED)
+            response = FileResponse(report, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        else:
+            return Response({"detail": "export must be 'csv' or 'xlsx'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        response['Content-Disposition'] = f'attachment; filename="compliance-report.{export}"'
+        return response
+
 class AdminLoginView(APIView):
     authentication_classes = []
     permission_classes = []
@@ -262,12 +503,16 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Project.objects.all()
     serializer_class = ProjectsSerializer
 
-class EmployeeListView(generics.ListCreateAPIView):
-    queryset = Employee.objects.all()
+class EmployeeListView(FastListMixin, generics.ListCreateAPIView):
+    queryset = Employee.objects.select_related('company', 'project')
     serializer_class = EmployeeSerializer
+    pagination_class = OptionalCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    fast_values = EMPLOYEE_VALUES
+    fast_mapper = staticmethod(employee_mapper)
 
 class AcceptRejectEmployeeView(generics.UpdateAPIView):
-    queryset = Employee.objects.all()
+    queryset = Employee.objects.select_related('company', 'project')
     serializer_class = AcceptRejectEmployeeSerializer
 
     def update(self, request, *args, **kwargs):
@@ -288,13 +533,15 @@ class AcceptRejectEmployeeView(generics.UpdateAPIView):
 
 # List all accepted employees
 class AcceptedEmployeeListView(generics.ListAPIView):
-    queryset = Employee.objects.filter(is_accepted=True)
+    queryset = Employee.objects.select_related('company', 'project').filter(is_accepted=True)
     serializer_class = EmployeeSerializer
+    pagination_class = OptionalCursorPagination
 
 # List all not accepted employees
 class NotAcceptedEmployeeListView(generics.ListAPIView):
-    queryset = Employee.objects.filter(is_accepted=False)
+    queryset = Employee.objects.select_related('company', 'project').filter(is_accepted=False)
     serializer_class = EmployeeSerializer
+    pagination_class = OptionalCursorPagination
 
 
 class OnDutyOffDutyToggleView(generics.UpdateAPIView):
@@ -312,68 +559,188 @@ class OnDutyOffDutyToggleView(generics.UpdateAPIView):
 class OnDutyEmployeeListView(generics.ListAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
+    pagination_class = OptionalCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = EmployeeFilter
 
     def get_queryset(self):
-        return Employee.objects.filter(on_duty=True)
+        return Employee.objects.select_related('company', 'project').filter(on_duty=True)
     
 
 class OfDutyEmployeeListView(generics.ListAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
+    pagination_class = OptionalCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = EmployeeFilter
 
     def get_queryset(self):
-        return Employee.objects.filter(on_duty=False)
+        return Employee.objects.select_related('company', 'project').filter(on_duty=False)
 
 class EmployeeSearchAPIView(generics.ListAPIView):
     serializer_class = EmployeeSearchSerializer
 
     def get_queryset(self):
+        queryset = Employee.objects.select_related('company', 'project').filter(is_accepted=True)
+        terms = {field: self.request.query_params.get(field) for field in SEARCH_FIELDS}
+        terms[None] = self.request.query_params.get('q')
+        return search_employees(queryset, terms)
+
+class EmployeeAutocompleteView(APIView):
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
         queryset = Employee.objects.filter(is_accepted=True)
-        fullname = self.request.query_params.get('fullname', None)
-        gate_pass_no = self.request.query_params.get('gate_pass_no', None)
-        designation = self.request.query_params.get('designation', None)
-        company_name = self.request.query_params.get('company_name', None)
-        project_name = self.request.query_params.get('project_name', None)
-
-        if fullname:
-            queryset = queryset.filter(fullname__icontains=fullname)
-        if gate_pass_no:
-            queryset = queryset.filter(gate_pass_no__icontains=gate_pass_no)
-        if designation:
-            queryset = queryset.filter(designation__icontains=designation)
-        if company_name:
-            queryset = queryset.filter(company__name__icontains=company_name)
-        if project_name:
-            queryset = queryset.filter(project__name__icontains=project_name)
-
-        return queryset
+        matches = autocomplete_employees(queryset, request.query_params.get('q', ''), max(limit, 1))
+        return Response(EmployeeAutocompleteSerializer(matches, many=True).data)
     
-class ProjectListView(generics.ListAPIView):
+class ProjectListView(ReferenceCacheMixin, generics.ListAPIView):
     queryset = Project.objects.all()
     serializer_class = ProjectsSerializer
+    reference_models = (Project,)
 
-class CompanyListView(generics.ListAPIView):
+class CompanyListView(ReferenceCacheMixin, generics.ListAPIView):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
+    reference_models = (Company,)
 
-class SubTrainingListView(generics.ListAPIView):
-    queryset = SubTraining.objects.all()
+class SubTrainingListView(ReferenceCacheMixin, generics.ListAPIView):
+    queryset = SubTraining.objects.select_related('main_training')
     serializer_class = SubTrainingWithMainNameSerializer
+    reference_models = (SubTraining, MainTraining)
 
 
 
-class MainTrainingListView(generics.ListAPIView):
-    queryset = MainTraining.objects.all()
+class MainTrainingListView(ReferenceCacheMixin, generics.ListAPIView):
+    queryset = MainTraining.objects.prefetch_related('subtraining_set')
     serializer_class = MainTrainingWithSubSerializer
+    reference_models = (MainTraining, SubTraining)
+
+
+def notifications_since(params, limit):
+    """The first ``limit`` notifications after ``since_id`` in id order, or None when no since_id is given.
+
+    That feed is already bounded and ordered, so the notification list views never cursor-paginate it.
+    """
+    if 'since_id' not in params:
+        return None
+    feed = NotificationFeedSerializer(data=params)
+    feed.is_valid(raise_exception=True)
+    return Notification.objects.filter(id__gt=feed.validated_data['since_id']).order_by('id')[:limit]
 
 
 class NotificationListView(generics.ListAPIView):
-    queryset = Notification.objects.all().order_by('-created_at')
+    queryset = Notification.objects.all().order_by('-created_at', '-id')
     serializer_class = NotificationSerializer
+    pagination_class = NotificationCursorPagination
+    since_limit = 500
+
+    @property
+    def paginator(self):
+        if 'since_id' in self.request.query_params:
+            return None
+        return super().paginator
+
+    def get_queryset(self):
+        since = notifications_since(self.request.query_params, self.since_limit)
+        return super().get_queryset() if since is None else since
+
+
+def notification_event(row):
+    return f"id: {row['id']}\nevent: notification\ndata: {json.dumps(row)}\n\n"
+
+
+async def NotificationStreamView(request):
+    """Server-sent events stream of new notifications.
+
+    Under ASGI the stream stays open for up to NOTIFICATION_STREAM_MAX_AGE seconds. A WSGI server would
+    tie up a worker (and buffer the whole response) for that long, so there it answers with the rows
+    available now and closes; EventSource reconnects after ``retry`` ms, which turns it into polling.
+    """
+    feed = NotificationFeedSerializer(data={'since_id': request.headers.get('Last-Event-ID', request.GET.get('since_id'))})
+    resuming = feed.is_valid()
+    last_id = feed.validated_data['since_id'] if resuming else await latest_notification_id()
+    # An id-only event sets the client's Last-Event-ID, so a reconnect resumes from here even if nothing arrived.
+    preamble = f"retry: {int(NOTIFICATION_STREAM_POLL_INTERVAL * 1000)}\nid: {last_id}\n\n"
+
+    async def events():
+        nonlocal last_id
+        yield preamble
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + NOTIFICATION_STREAM_MAX_AGE
+        idle = 0.0
+        while loop.time() < deadline:
+            rows = await notifications_after(last_id)
+            for row in rows:
+                last_id = row['id']
+                yield notification_event(row)
+            if rows:
+                idle = 0.0
+                continue
+            if idle >= NOTIFICATION_STREAM_HEARTBEAT:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(NOTIFICATION_STREAM_POLL_INTERVAL)
+            idle += NOTIFICATION_STREAM_POLL_INTERVAL
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    else:
+        rows = await notifications_after(last_id) if resuming else []
+        response = HttpResponse(preamble + ''.join(notification_event(row) for row in rows), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def MediaFileView(request, path):
+    """Serve MEDIA_ROOT with validators and caching headers, optionally handing the bytes to the web server."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    content_addressed = CONTENT_ADDRESSED_NAME.search(path)
+    if content_addressed:
+        etag_value = f'"{content_addressed.group(1)}"'
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        stat = os.stat(full_path)
+        etag_value = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        cache_control = 'public, no-cache'
+
+    # Weak comparison, so W/"..." and * revalidate too (and a failed If-Match gets a 412).
+    response = get_conditional_response(request, etag=etag_value)
+    if response is None:
+        if getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', None):
+            response = HttpResponse(content_type=mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+        elif getattr(settings, 'MEDIA_SENDFILE_HEADER', None):
+            response = HttpResponse(content_type=mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+            response[settings.MEDIA_SENDFILE_HEADER] = full_path
+        else:
+            # FileResponse goes through wsgi.file_wrapper, which uses sendfile() where the server supports it.
+            response = FileResponse(open(full_path, 'rb'))
+
+    response['ETag'] = etag_value
+    response['Cache-Control'] = cache_control
+    return response
+
+
+async def latest_notification_id():
+    return await Notification.objects.order_by('-id').values_list('id', flat=True).afirst() or 0
+
+
+async def notifications_after(last_id, limit=100):
+    rows = [row async for row in Notification.objects.filter(id__gt=last_id).order_by('id')[:limit]]
+    return NotificationSerializer(rows, many=True).data
 
 class NotificationDetailView(generics.RetrieveDestroyAPIView):
     queryset = Notification.objects.all()